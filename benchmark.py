@@ -0,0 +1,522 @@
+import os
+import sys
+import time
+import tempfile
+
+# Usage: python benchmark.py [name ...]   (no names = run everything)
+
+def make_tree(root: str, dirs: int = 40, depth: int = 3, files_per_dir: int = 20, file_size: int = 4096):
+    """Build a synthetic AppData-like tree: `dirs` top folders, each `depth` levels deep."""
+    payload = b"x" * file_size
+    count = 0
+    for d in range(dirs):
+        # One folder is much bigger than the rest, like a browser cache next to small apps
+        fanout = 6 if d == 0 else 2
+        level = [os.path.join(root, f"app_{d}")]
+        for _ in range(depth):
+            level = [os.path.join(p, f"sub_{i}") for p in level for i in range(fanout)]
+        for leaf in level:
+            os.makedirs(leaf, exist_ok=True)
+            for f in range(files_per_dir):
+                with open(os.path.join(leaf, f"f{f}.bin"), "wb") as fh:
+                    fh.write(payload)
+                count += 1
+    return count
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def bench_sizing():
+    print("\n--- Folder sizing: os.walk vs SizeIndex (1-16 threads) ---")
+    from sizing import SizeIndex
+
+    def walk_size(path):
+        total = 0
+        for dirpath, _, filenames in os.walk(path):
+            for f in filenames:
+                fp = os.path.join(dirpath, f)
+                if not os.path.islink(fp):
+                    total += os.path.getsize(fp)
+        return total
+
+    with tempfile.TemporaryDirectory() as root:
+        files = make_tree(root)
+        candidates = [e.path for e in os.scandir(root)]
+        print(f"Tree: {files} files in {len(candidates)} top-level folders")
+
+        expected, base = timed(lambda: {p: walk_size(p) for p in candidates})
+        print(f"os.walk per folder : {base:.3f}s")
+        for workers in (1, 2, 4, 8, 16):
+            sizes, elapsed = timed(SizeIndex(workers=workers).size_many, candidates)
+            assert sizes == expected, "size mismatch"
+            print(f"SizeIndex {workers:2d} threads: {elapsed:.3f}s  ({base / elapsed:.2f}x)")
+
+def bench_size_cache():
+    print("\n--- Incremental rescan with the persistent size cache ---")
+    import storage as storage_mod
+    from sizing import SizeIndex
+
+    with tempfile.TemporaryDirectory() as root:
+        # Keep the benchmark away from the real safemove.db
+        storage_mod.DB_FILE = os.path.join(root, "bench.db")
+        store = storage_mod.Storage()
+        tree = os.path.join(root, "tree")
+        files = make_tree(tree, files_per_dir=50, file_size=512)
+        candidates = [e.path for e in os.scandir(tree)]
+        print(f"Tree: {files} files in {len(candidates)} top-level folders")
+
+        first, cold = timed(SizeIndex(store=store).size_many, candidates)
+        second, warm = timed(SizeIndex(store=store).size_many, candidates)
+        assert first == second, "size mismatch"
+        print(f"First scan : {cold:.3f}s")
+        print(f"Rescan     : {warm:.3f}s  ({cold / warm:.1f}x faster)")
+
+        with open(os.path.join(candidates[0], "new.bin"), "wb") as fh:
+            fh.write(b"x" * 1000)
+        third, changed = timed(SizeIndex(store=store).size_many, candidates)
+        assert third[candidates[0]] == first[candidates[0]] + 1000
+        print(f"Rescan after one change: {changed:.3f}s")
+
+def synthetic_paths(count: int, seed: int = 7):
+    """Windows-style paths mixing user data, Program Files, system folders and vendor names."""
+    import random
+    rng = random.Random(seed)
+    heads = [
+        "C:\\Users\\bob\\AppData\\Local", "C:\\Users\\bob\\AppData\\Roaming", "C:\\Users\\bob",
+        "C:\\Program Files", "C:\\Program Files (x86)", "C:\\Windows", "C:\\ProgramData", "D:\\Games",
+    ]
+    parts = [
+        "Google", "Chrome", "User Data", "NVIDIA Corporation", "Intel", "IntelliJ", "Steam", "steamapps",
+        "common", "Microsoft", "VisualStudio", "vscode", ".gradle", ".minecraft", "Discord", "Spotify",
+        "dotnet", "Common Files", "Cache", "System32", "Avast Software", "Zoë", "Program Files",
+    ]
+    return [
+        "\\".join([rng.choice(heads)] + [rng.choice(parts) for _ in range(rng.randint(1, 5))])
+        for _ in range(count)
+    ]
+
+def bench_rules():
+    print("\n--- Path classification: per-pattern re.search vs compiled, memoized matcher ---")
+    import re
+    import rules
+    from models import FolderItem
+
+    def legacy_is_forbidden(path):
+        norm_path = os.path.normpath(path)
+        for pattern in rules.FORBIDDEN_PATTERNS:
+            if re.search(pattern, norm_path, re.IGNORECASE):
+                return f"Matches forbidden pattern: {pattern}"
+        if "system32" in norm_path.lower():
+            return "System directory"
+        return None
+
+    def legacy_classify(item):
+        # Uncached: junction syscall and every rule evaluated for every item
+        path = os.path.normpath(item.path)
+        return rules._classify_path.__wrapped__(path, rules.is_junction(item.path), None)
+
+    def compare(items):
+        compiled_is_forbidden = rules.is_forbidden
+        rules.is_forbidden = legacy_is_forbidden
+        try:
+            expected, base = timed(lambda: [legacy_classify(i) for i in items])
+        finally:
+            rules.is_forbidden = compiled_is_forbidden
+
+        rules.clear_classification_cache()
+        results, elapsed = timed(rules.classify_items, items)
+        info = rules.classification_cache_info()
+        assert [(c.category, c.reason) for c in results] == expected, "classification mismatch"
+        print(f"  Legacy classify_item : {base:.2f}s  ({len(items) / base:,.0f} paths/s)")
+        print(f"  classify_items       : {elapsed:.2f}s  ({len(items) / elapsed:,.0f} paths/s, {base / elapsed:.1f}x)"
+              f"  hits={info.hits:,} misses={info.misses:,}")
+        return expected, base
+
+    # Every path new: the compiled matcher itself, the memo never hits
+    print("1M distinct paths (compiled matcher):")
+    distinct = list(dict.fromkeys(synthetic_paths(3_000_000)))[:1_000_000] # The generator repeats short paths
+    compare([FolderItem(path=p, size_gb=0.0) for p in distinct])
+
+    # A rescan sees mostly the same paths again, so 1M lookups over 100k distinct paths
+    paths = synthetic_paths(100_000)
+    items = [FolderItem(path=paths[i % len(paths)], size_gb=0.0) for i in range(1_000_000)]
+    print(f"1M lookups over {len(paths):,} distinct paths (rescan, memo hits):")
+    expected, base = compare(items)
+
+    # Junction state already known from the scanner's lstat data: no syscall per item
+    for item in items:
+        item.is_junction = False
+    warm, elapsed = timed(rules.classify_items, items)
+    assert [(c.category, c.reason) for c in warm] == expected, "classification mismatch"
+    print(f"  classify_items (warm, scanner junction data): {elapsed:.2f}s  ({base / elapsed:.1f}x)")
+
+def bench_copy():
+    print("\n--- Tree copy: shutil.copytree vs copier.copy_tree (1-16 threads), both unverified ---")
+    import shutil
+    from copier import copy_tree
+
+    with tempfile.TemporaryDirectory() as root:
+        src = os.path.join(root, "src")
+        files = make_tree(src, dirs=20, files_per_dir=20, file_size=64 * 1024)
+        size_mb = files * 64 / 1024
+        print(f"Tree: {files} files, {size_mb:.0f} MB")
+
+        _, base = timed(shutil.copytree, src, os.path.join(root, "ref"), symlinks=True)
+        print(f"shutil.copytree     : {base:.3f}s  ({size_mb / base:.0f} MB/s)")
+        for workers in (1, 4, 8, 16):
+            dst = os.path.join(root, f"dst_{workers}")
+            stats, elapsed = timed(copy_tree, src, dst, workers, verify=None)
+            assert not stats.failures and stats.files == files, "copy incomplete"
+            print(f"copy_tree {workers:2d} threads: {elapsed:.3f}s  ({size_mb / elapsed:.0f} MB/s, {base / elapsed:.2f}x)")
+        # What a move actually runs: every file hashed on both sides (see bench_verify)
+        stats, elapsed = timed(copy_tree, src, os.path.join(root, "dst_verified"), 8)
+        assert not stats.failures and stats.verified == files, "copy incomplete"
+        print(f"copy_tree  8 threads, verified: {elapsed:.3f}s  ({size_mb / elapsed:.0f} MB/s, {base / elapsed:.2f}x)")
+
+def bench_ring(size_mb: int = 256):
+    print(f"\n--- {size_mb} MB file, buffered path: shutil.copyfileobj vs BufferRing (readinto + reader thread) ---")
+    import hashlib
+    import shutil
+    import tracemalloc
+    from copier import COPY_BUFSIZE, BufferRing, hash_file
+
+    class CountingReader:
+        """Counts the chunk objects read() hands out (each one a fresh bytes)."""
+        def __init__(self, f):
+            self.f, self.chunks = f, 0
+        def read(self, n=-1):
+            self.chunks += 1
+            return self.f.read(n)
+
+    def copyfileobj(src, dst, hashed):
+        with open(src, "rb", buffering=0) as fsrc, open(dst, "wb", buffering=0) as fdst:
+            reader = CountingReader(fsrc)
+            shutil.copyfileobj(reader, fdst, COPY_BUFSIZE)
+        if hashed:
+            hash_file(src) # What verification then has to read again
+        return reader.chunks
+
+    ring = BufferRing()
+    def ring_copy(src, dst, hashed):
+        with open(src, "rb", buffering=0) as fsrc, open(dst, "wb", buffering=0) as fdst:
+            ring.copy(fsrc, fdst.fileno(), size_mb << 20, hasher=hashlib.blake2b() if hashed else None)
+        return 0
+
+    with tempfile.TemporaryDirectory() as root:
+        src = os.path.join(root, "big.bin")
+        with open(src, "wb") as f:
+            block = os.urandom(1 << 20)
+            for _ in range(size_mb):
+                f.write(block)
+        for hashed in (False, True):
+            label = "copy + source hash" if hashed else "copy only"
+            for name, fn in (("copyfileobj", copyfileobj), ("BufferRing ", ring_copy)):
+                tracemalloc.start()
+                chunks, elapsed = timed(fn, src, os.path.join(root, "out.bin"), hashed)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                os.remove(os.path.join(root, "out.bin"))
+                print(f"{label:18s} {name}: {elapsed:.3f}s ({size_mb / elapsed:.0f} MB/s), "
+                      f"{chunks} chunk objects allocated, peak traced {peak / 1024:.0f} KB")
+
+def extents_of(path: str) -> str:
+    """Extent count from filefrag (Linux, e2fsprogs), '?' where it is unavailable."""
+    import subprocess
+    try:
+        out = subprocess.run(["filefrag", path], capture_output=True, text=True).stdout
+        return out.rsplit(":", 1)[1].split()[0]
+    except (OSError, IndexError):
+        return "?"
+
+def bench_large(size_mb: int = 1024):
+    print(f"\n--- {size_mb} MB file: copy as it was vs preallocated parallel ranges; sparse image ---")
+    import shutil
+    import copier
+    from copier import copy_file, hash_file
+
+    with tempfile.TemporaryDirectory() as root:
+        src = os.path.join(root, "big.bin")
+        with open(src, "wb") as f:
+            block = os.urandom(1 << 20)
+            for _ in range(size_mb):
+                f.write(block)
+
+        def grown(dst):
+            # Old engine: one sequential stream, file grows write by write
+            saved = copier.PREALLOCATE_MIN, copier.LARGE_FILE
+            copier.PREALLOCATE_MIN = copier.LARGE_FILE = float("inf")
+            try:
+                copy_file(src, dst)
+            finally:
+                copier.PREALLOCATE_MIN, copier.LARGE_FILE = saved
+
+        for name, fn in (("sequential, grown  ", grown), ("preallocated ranges", lambda dst: copy_file(src, dst))):
+            dst = os.path.join(root, "out.bin")
+            _, elapsed = timed(fn, dst)
+            print(f"{name}: {elapsed:.3f}s ({size_mb / elapsed:.0f} MB/s), {extents_of(dst)} extents")
+            os.remove(dst)
+
+        sparse = os.path.join(root, "disk.img")
+        with open(sparse, "wb") as f:
+            f.truncate(size_mb << 20)
+            for n in range(0, size_mb, max(1, size_mb // 16)):
+                f.seek(n << 20)
+                f.write(block)
+        for name, fn in (("shutil.copyfile", shutil.copyfile), ("copy_file      ", copy_file)):
+            dst = os.path.join(root, "disk.out")
+            _, elapsed = timed(fn, sparse, dst)
+            assert hash_file(dst) == hash_file(sparse)
+            print(f"sparse {size_mb} MB image, {name}: {elapsed:.3f}s, "
+                  f"{os.stat(dst).st_blocks * 512 / 1024**2:.0f} MB allocated on target")
+            os.remove(dst)
+
+def bench_throttle():
+    print("\n--- Throttle accuracy: achieved vs configured MB/s and IOPS (8 copy threads) ---")
+    from copier import copy_tree
+    from throttle import throttle
+
+    with tempfile.TemporaryDirectory() as root:
+        big = os.path.join(root, "big")
+        os.makedirs(big)
+        block = os.urandom(1 << 20)
+        for n in range(8):
+            with open(os.path.join(big, f"{n}.bin"), "wb") as f:
+                for _ in range(16):
+                    f.write(block)
+        small = os.path.join(root, "small")
+        files = make_tree(small, dirs=10, depth=1, files_per_dir=60, file_size=4096)
+
+        try:
+            for mbps in (20, 50):
+                throttle.configure(mbps * 1024**2)
+                _, elapsed = timed(copy_tree, big, os.path.join(root, f"mb{mbps}"), 8, verify=None)
+                achieved = 128 / elapsed
+                print(f"{mbps:4d} MB/s cap : {achieved:6.1f} MB/s achieved ({(achieved / mbps - 1) * 100:+.1f}%)")
+            for iops in (200, 500):
+                throttle.configure(iops=iops)
+                _, elapsed = timed(copy_tree, small, os.path.join(root, f"io{iops}"), 8, verify=None)
+                achieved = files / elapsed
+                print(f"{iops:4d} IOPS cap : {achieved:6.1f} IOPS achieved ({(achieved / iops - 1) * 100:+.1f}%)")
+
+            # Raised mid-copy from another thread, as the Plan tab does
+            import threading
+            throttle.configure(10 * 1024**2)
+            threading.Timer(2.0, throttle.configure, (100 * 1024**2,)).start()
+            _, elapsed = timed(copy_tree, big, os.path.join(root, "live"), 8, verify=None)
+            expected = 2.0 + (128 - 2.0 * 10) / 100
+            print(f"10 -> 100 MB/s after 2s: {elapsed:.2f}s (ideal {expected:.2f}s)")
+        finally:
+            throttle.configure()
+
+def bench_junk():
+    print("\n--- Junk scan: folders sized one at a time (old NvidiaCleaner) vs JunkCleaner (concurrent, streamed) ---")
+    from cleaner import JunkCleaner, JunkProfile
+    from sizing import SizeIndex
+
+    with tempfile.TemporaryDirectory() as root:
+        profiles = []
+        for n in range(8):
+            base = os.path.join(root, f"profile{n}")
+            for cache in range(4):
+                make_tree(os.path.join(base, f"user{cache}", "Cache"), dirs=6, depth=2, files_per_dir=20, file_size=1024)
+            profiles.append(JunkProfile(f"profile{n}", [os.path.join(base, "*", "Cache")]))
+        paths = [m.path for m in JunkCleaner(profiles, SizeIndex()).find()]
+
+        def one_at_a_time():
+            index = SizeIndex()
+            return sum(index.size_of(path) for path in paths)
+        total, base = timed(one_at_a_time)
+        print(f"Sequential size_of : {base:.3f}s  ({len(paths)} folders)")
+
+        first = []
+        def streamed():
+            start = time.perf_counter()
+            found = 0
+            for m in JunkCleaner(profiles, SizeIndex()).iter_scan():
+                if not first:
+                    first.append(time.perf_counter() - start)
+                found += m.size
+            return found
+        found, elapsed = timed(streamed)
+        assert found == total
+        print(f"JunkCleaner        : {elapsed:.3f}s  ({base / elapsed:.2f}x), first result after {first[0] * 1000:.0f} ms")
+
+def make_tiny_tree(root: str, files: int, per_dir: int = 500, file_size: int = 2048):
+    """Cache-like tree: `files` tiny files, per_dir to a folder, folders two levels deep."""
+    payload = b"x" * file_size
+    for n in range(files):
+        d = os.path.join(root, f"c{n // (per_dir * 50)}", f"d{n // per_dir}")
+        if n % per_dir == 0:
+            os.makedirs(d, exist_ok=True)
+        fd = os.open(os.path.join(d, f"{n}.tmp"), os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0))
+        os.write(fd, payload)
+        os.close(fd)
+
+def bench_small_files(count: int = 500_000):
+    print(f"\n--- {count:,} tiny files: naive per-file copy vs copy_tree (skeleton + batches + inline copy) ---")
+    import shutil
+    from copier import copy_tree
+
+    def naive_copy(src, dst):
+        for dirpath, _, filenames in os.walk(src):
+            target = os.path.join(dst, os.path.relpath(dirpath, src))
+            os.makedirs(target, exist_ok=True)
+            for f in filenames:
+                shutil.copy2(os.path.join(dirpath, f), os.path.join(target, f))
+
+    with tempfile.TemporaryDirectory() as root:
+        src = os.path.join(root, "src")
+        _, made = timed(make_tiny_tree, src, count)
+        print(f"Built tree in {made:.1f}s")
+
+        _, base = timed(naive_copy, src, os.path.join(root, "naive"))
+        print(f"Naive copy2 per file : {base:.1f}s  ({count / base:,.0f} files/s)")
+        for workers in (1, 8):
+            stats, elapsed = timed(copy_tree, src, os.path.join(root, f"tree_{workers}"), workers, verify=None)
+            assert stats.files == count and not stats.failures
+            print(f"copy_tree {workers} threads  : {elapsed:.1f}s  ({count / elapsed:,.0f} files/s, {base / elapsed:.2f}x)")
+
+def bench_delete(count: int = 500_000):
+    print(f"\n--- Deleting a {count:,}-file synthetic cache: shutil.rmtree vs delete_tree ---")
+    import shutil
+    from deleter import delete_tree
+
+    with tempfile.TemporaryDirectory() as root:
+        def build(name):
+            src = os.path.join(root, name)
+            make_tiny_tree(src, count)
+            if hasattr(os, "sync"):
+                os.sync() # Don't time the writeback of the tree we just built
+            return src
+
+        src, made = timed(build, "rmtree")
+        print(f"Built tree in {made:.1f}s")
+        _, base = timed(shutil.rmtree, src)
+        print(f"shutil.rmtree        : {base:.1f}s  ({count / base:,.0f} files/s)")
+        for workers in (1, 8):
+            src = build(f"delete_{workers}")
+            stats, elapsed = timed(delete_tree, src, workers)
+            assert stats.complete and stats.files == count and stats.bytes_freed == count * 2048
+            print(f"delete_tree {workers} threads: {elapsed:.1f}s  ({count / elapsed:,.0f} files/s, {base / elapsed:.2f}x), "
+                  f"{stats.bytes_freed / 1024**2:.0f} MB freed")
+
+def bench_verify():
+    print("\n--- Verification: after the copy vs pipelined with it, and by level ---")
+    from concurrent.futures import ThreadPoolExecutor
+    import copier
+    from copier import VERIFY_LEVELS, Verifier, copy_tree, scan_tree, verify_hash
+
+    with tempfile.TemporaryDirectory() as root:
+        src = os.path.join(root, "src")
+        files = make_tree(src, dirs=10, files_per_dir=20, file_size=256 * 1024)
+        print(f"Tree: {files} files, {files // 4} MB")
+
+        _, copy_only = timed(copy_tree, src, os.path.join(root, "a"), verify=None)
+        print(f"Copy only             : {copy_only:.3f}s")
+
+        def copy_then_verify():
+            dst = os.path.join(root, "b")
+            copy_tree(src, dst, verify=None)
+            with ThreadPoolExecutor(8) as pool:
+                list(pool.map(lambda f: verify_hash(os.path.join(src, f[0]), os.path.join(dst, f[0]), f[1]),
+                              scan_tree(src).files))
+        _, sequential = timed(copy_then_verify)
+        print(f"Copy, then verify     : {sequential:.3f}s  (+{(sequential / copy_only - 1) * 100:.0f}%)")
+
+        stats, pipelined = timed(copy_tree, src, os.path.join(root, "c"))
+        assert stats.verified == files and not stats.failures
+        print(f"Copy + pipelined verify: {pipelined:.3f}s  (+{(pipelined / copy_only - 1) * 100:.0f}%)")
+
+        print("Verification levels (pipelined):")
+        for level in VERIFY_LEVELS:
+            verifier = Verifier(level, seed=1)
+            _, elapsed = timed(copy_tree, src, os.path.join(root, f"lvl_{level}"), verify=verifier)
+            print(f"  {level:8s}: {elapsed:.3f}s  (+{(elapsed / copy_only - 1) * 100:.0f}%, "
+                  f"{verifier.bytes_read / 1024**2:.0f} MB read to verify)")
+
+        # "full" either hashes the source in the copy buffers (across devices) or keeps the
+        # kernel copy and reads both files back (same device); both ways on this disk
+        print("Full verification, source digest:")
+        saved = copier._same_device
+        for name, same in (("hashed while copying", False), ("kernel copy, re-read", True)):
+            copier._same_device = lambda a, b, same=same: same
+            try:
+                verifier = Verifier("full")
+                _, elapsed = timed(copy_tree, src, os.path.join(root, f"full_{same}"), verify=verifier)
+            finally:
+                copier._same_device = saved
+            print(f"  {name}: {elapsed:.3f}s  (+{(elapsed / copy_only - 1) * 100:.0f}%, "
+                  f"{verifier.bytes_read / 1024**2:.0f} MB read to verify)")
+
+def bench_scheduler():
+    print("\n--- Moving 8 items: sequential move_item loop vs MoveScheduler ---")
+    import types
+    import storage as storage_mod
+    import mover
+    from models import FolderItem
+    from scheduler import MoveScheduler
+
+    def link(cmd, shell=True):
+        # Stand-in for mklink /J off Windows
+        source, target = cmd.split('"')[1], cmd.split('"')[3]
+        os.symlink(target, source)
+        return types.SimpleNamespace(returncode=0, stdout="", stderr="")
+
+    def make_items(root):
+        items = []
+        for n in range(8):
+            path = os.path.join(root, f"item_{n}")
+            # A couple of big folders among small ones
+            files = make_tree(path, dirs=4 if n % 4 else 12, depth=2, files_per_dir=25, file_size=32 * 1024)
+            items.append(FolderItem(path=path, size_gb=files * 32 * 1024 / 1024 ** 3))
+        return items
+
+    saved = mover.run_command, mover.same_device
+    mover.run_command, mover.same_device = link, lambda a, b: False # Force the copy path
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            storage_mod.DB_FILE = os.path.join(root, "bench.db")
+            storage_mod.Storage()
+
+            items = make_items(os.path.join(root, "seq"))
+            def sequential():
+                for item in items:
+                    mover.move_item(item, os.path.join(root, "seq_target"))
+            _, base = timed(sequential)
+            print(f"Sequential loop     : {base:.3f}s")
+
+            for jobs in (2, 4, 8):
+                items = make_items(os.path.join(root, f"par{jobs}"))
+                scheduler = MoveScheduler(os.path.join(root, f"par{jobs}_target"), max_jobs=jobs,
+                                          device_limit=lambda dev, path, jobs=jobs: jobs)
+                results, elapsed = timed(scheduler.run, items)
+                assert all(error is None for _, error in results), results
+                print(f"MoveScheduler {jobs} jobs: {elapsed:.3f}s  ({base / elapsed:.2f}x)")
+    finally:
+        mover.run_command, mover.same_device = saved
+
+BENCHMARKS = {
+    "sizing": bench_sizing,
+    "size_cache": bench_size_cache,
+    "rules": bench_rules,
+    "copy": bench_copy,
+    "small_files": bench_small_files,
+    "ring": bench_ring,
+    "large": bench_large,
+    "throttle": bench_throttle,
+    "junk": bench_junk,
+    "delete": bench_delete,
+    "verify": bench_verify,
+    "scheduler": bench_scheduler,
+}
+
+def main():
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
+    print("\nBenchmarks Finished.")
+
+if __name__ == "__main__":
+    main()
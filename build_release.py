@@ -32,7 +32,7 @@ a = Analysis(
     hiddenimports=[
         'ui_main', 'scanner', 'rules', 'mover', 'storage', 
         'config', 'ai_client', 'models', 'logger', 'themes',
-        'cleaner'
+        'cleaner', 'sizing', 'copier', 'scheduler', 'planner', 'locks', 'dedup', 'throttle', 'deleter'
     ],
     hookspath=[],
     hooksconfig={{}},
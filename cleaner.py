@@ -1,100 +1,224 @@
+import glob
+import json
 import os
-import shutil
-from typing import List, Tuple
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+from deleter import DEFAULT_DELETE_WORKERS, delete_tree
 from logger import get_logger
+from rules import is_junction
+from sizing import ScanBudget, SizeIndex, size_index
 
 log = get_logger("Cleaner")
 
-class NvidiaCleaner:
-    TARGET_PATHS = [
+PROFILES_FILE = "junk_profiles.json" # Optional, next to config.json: extra profiles, or built-in ones overridden by name
+DAY = 24 * 3600
+
+# Built-in junk profiles. patterns are globs (env vars and ~ expanded, / or \);
+# min_age_days keeps matches modified more recently than that.
+DEFAULT_PROFILES = [
+    {"name": "NVIDIA", "description": "Old driver installers and shader caches", "patterns": [
         r"C:\ProgramData\NVIDIA Corporation\NVIDIA App\UpdateFramework\ota-artifacts",
         r"C:\ProgramData\NVIDIA Corporation\NVIDIA App\UpdateFramework\grd",
         r"C:\ProgramData\NVIDIA Corporation\NVIDIA App\post-processing",
         r"C:\ProgramData\NVIDIA Corporation\Downloader",
         r"%LOCALAPPDATA%\NVIDIA Corporation\NV_Cache",
         r"%LOCALAPPDATA%\NVIDIA\DXCache",
-        r"%LOCALAPPDATA%\NVIDIA\GLCache"
-    ]
+        r"%LOCALAPPDATA%\NVIDIA\GLCache",
+    ]},
+    {"name": "Browser caches", "description": "Chrome, Edge and Firefox disk caches", "patterns": [
+        r"%LOCALAPPDATA%\Google\Chrome\User Data\*\Cache",
+        r"%LOCALAPPDATA%\Google\Chrome\User Data\*\Code Cache",
+        r"%LOCALAPPDATA%\Google\Chrome\User Data\*\GPUCache",
+        r"%LOCALAPPDATA%\Microsoft\Edge\User Data\*\Cache",
+        r"%LOCALAPPDATA%\Microsoft\Edge\User Data\*\Code Cache",
+        r"%LOCALAPPDATA%\Microsoft\Edge\User Data\*\GPUCache",
+        r"%LOCALAPPDATA%\Mozilla\Firefox\Profiles\*\cache2",
+        "~/.cache/google-chrome/*/Cache",
+        "~/.cache/mozilla/firefox/*/cache2",
+    ]},
+    {"name": "pip cache", "patterns": [r"%LOCALAPPDATA%\pip\Cache", "~/.cache/pip"]},
+    {"name": "npm cache", "patterns": [r"%LOCALAPPDATA%\npm-cache\_cacache", "~/.npm/_cacache"]},
+    {"name": "Gradle caches", "description": "Unused for a month", "min_age_days": 30, "patterns": [
+        "~/.gradle/caches/*",
+    ]},
+    {"name": "Maven repository", "description": "Downloaded artifacts; rebuilt on the next build", "patterns": [
+        "~/.m2/repository",
+    ]},
+    {"name": "Temp folders", "description": "Older than a week", "min_age_days": 7, "patterns": [
+        r"%TEMP%\*",
+        r"%WINDIR%\Temp\*",
+    ]},
+    {"name": "Crash dumps", "patterns": [
+        r"%LOCALAPPDATA%\CrashDumps\*.dmp",
+        r"%WINDIR%\Minidump\*.dmp",
+        r"%WINDIR%\MEMORY.DMP",
+        r"%PROGRAMDATA%\Microsoft\Windows\WER\ReportArchive\*",
+    ]},
+]
+
+@dataclass
+class JunkProfile:
+    name: str
+    patterns: List[str]
+    min_age_days: float = 0 # Matches (files or folders) modified more recently are kept
+    description: str = ""
+    enabled: bool = True
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "JunkProfile":
+        return cls(data["name"], list(data.get("patterns", [])), float(data.get("min_age_days", 0)),
+                   data.get("description", ""), bool(data.get("enabled", True)))
 
-    @staticmethod
-    def _expand_path(path: str) -> str:
-        return os.path.expandvars(path)
+@dataclass
+class JunkMatch:
+    profile: str
+    path: str
+    size: int = 0
+    is_dir: bool = False
+    exact: bool = True # False if the walk was cut short (size is a lower bound)
 
-    @staticmethod
-    def get_folder_size(folder_path: str) -> int:
-        total_size = 0
+def load_profiles(path: str = PROFILES_FILE) -> List[JunkProfile]:
+    """Built-in profiles merged with the user's file (same name replaces, "enabled": false hides)."""
+    profiles = {p["name"]: p for p in DEFAULT_PROFILES}
+    if os.path.exists(path):
         try:
-            for dirpath, _, filenames in os.walk(folder_path):
-                for f in filenames:
-                    fp = os.path.join(dirpath, f)
-                    if not os.path.islink(fp):
-                        total_size += os.path.getsize(fp)
+            with open(path, "r") as f:
+                for p in json.load(f):
+                    profiles[p["name"]] = p
         except Exception as e:
-            log.error(f"Error calculating size for {folder_path}: {e}")
-        return total_size
+            log.error(f"Error loading junk profiles from {path}: {e}")
+    return [p for p in map(JunkProfile.from_dict, profiles.values()) if p.enabled]
 
-    def scan(self) -> Tuple[List[dict], int]:
-        """
-        Scans for NVIDIA junk folders.
-        Returns:
-            List[dict]: List of found folders with 'path' and 'size' keys.
-            int: Total size in bytes.
-        """
-        found_folders = []
-        total_size = 0
-
-        for raw_path in self.TARGET_PATHS:
-            path = self._expand_path(raw_path)
-            if os.path.exists(path) and os.path.isdir(path):
-                size = self.get_folder_size(path)
-                found_folders.append({
-                    "path": path,
-                    "size": size,
-                    "original_path": raw_path
-                })
-                total_size += size
-                log.info(f"Found junk folder: {path} ({size} bytes)")
+def expand_pattern(pattern: str) -> List[str]:
+    """Existing paths matching one profile pattern. Patterns with an unset variable match nothing."""
+    expanded = os.path.expanduser(os.path.expandvars(pattern))
+    if "%" in expanded or "$" in expanded:
+        return []
+    return glob.glob(expanded.replace("\\", "/")) # Both separators work on Windows
+
+class JunkCleaner:
+    """
+    Finds and deletes junk described by profiles (load_profiles() by default).
+
+    Profiles are globbed side by side, then every matched folder is sized in one
+    SizeIndex walk (work-stealing, like the app scan), so results stream in as
+    each folder finishes. Links and junctions are never matched, and a match
+    inside another match (of any profile) is dropped: the outer one covers it.
+    """
+
+    def __init__(self, profiles: Optional[List[JunkProfile]] = None, index: Optional[SizeIndex] = None,
+                 workers: int = DEFAULT_DELETE_WORKERS):
+        self.profiles = profiles if profiles is not None else load_profiles()
+        self.index = index or size_index
+        self.workers = workers # Delete threads
+
+    def _find(self, profile: JunkProfile, now: float) -> List[JunkMatch]:
+        matches = []
+        for pattern in profile.patterns:
+            for path in expand_pattern(pattern):
+                try:
+                    st = os.lstat(path)
+                except OSError:
+                    continue
+                if os.path.islink(path) or is_junction(path):
+                    continue # Data lives elsewhere
+                if profile.min_age_days and now - st.st_mtime < profile.min_age_days * DAY:
+                    continue
+                is_dir = os.path.isdir(path)
+                matches.append(JunkMatch(profile.name, os.path.normpath(path), 0 if is_dir else st.st_size, is_dir))
+        return matches
+
+    def find(self) -> List[JunkMatch]:
+        """Every match of every profile, unsized, outermost only."""
+        now = time.time()
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(self.profiles)))) as pool:
+            found = [m for matches in pool.map(lambda p: self._find(p, now), self.profiles) for m in matches]
+        kept, seen = [], set()
+        for m in sorted(found, key=lambda m: len(m.path)):
+            key = os.path.normcase(m.path)
+            parts = key.split(os.sep)
+            if any(os.sep.join(parts[:i]) in seen for i in range(1, len(parts) + 1)):
+                continue
+            seen.add(key)
+            kept.append(m)
+        return kept
+
+    def iter_scan(self, budget: Optional[ScanBudget] = None) -> Iterator[JunkMatch]:
+        """Sized matches, files first, then folders as soon as each one is walked."""
+        matches = self.find()
+        folders: Dict[str, JunkMatch] = {}
+        for m in matches:
+            if m.is_dir:
+                folders[m.path] = m
             else:
-                log.debug(f"Path not found or not a directory: {path}")
+                yield m
+        for path, size, exact in self.index.iter_sizes(list(folders), budget=budget):
+            m = folders[path]
+            m.size, m.exact = size, exact
+            log.info(f"Found junk ({m.profile}): {path} ({size} bytes)")
+            yield m
 
-        return found_folders, total_size
+    def scan(self) -> Tuple[List[JunkMatch], int]:
+        """All matches and their total size in bytes."""
+        matches = list(self.iter_scan())
+        return matches, sum(m.size for m in matches)
 
-    def clean(self, folders: List[dict], progress_callback=None) -> Tuple[int, int, int]:
+    def clean(self, matches: List[JunkMatch], progress_callback=None) -> Tuple[int, int, int]:
         """
-        Deletes the specified folders.
+        Deletes the given matches (deleter.delete_tree: parallel, locked files retried).
         Args:
-            folders: List of dicts with 'path' key.
+            matches: JunkMatch list (from scan / iter_scan).
             progress_callback: Optional callable(str) for status updates.
         Returns:
-            Tuple[count_deleted, count_failed, bytes_freed]
+            Tuple[count_deleted, count_failed, bytes_freed]; a match counts as failed
+            if anything under it is left, and bytes_freed is what was really removed.
         """
         deleted_count = 0
         failed_count = 0
         bytes_freed = 0
 
-        for item in folders:
-            path = item["path"]
-            size = item.get("size", 0)
-            
+        for m in matches:
+            path = m.path
+
             if progress_callback:
                 progress_callback(f"Cleaning {path}...")
 
+            def report(stats, path=path):
+                if progress_callback:
+                    progress_callback(f"Cleaning {path}: {stats.files} files, {stats.bytes_freed / 1024**2:.1f} MB freed")
+
             try:
-                # shutil.rmtree might fail on some files if they are in use or readonly
-                # We can implement a more robust retry or error handling mechanism
-                if os.path.exists(path):
-                    shutil.rmtree(path)
+                if not os.path.lexists(path):
+                    log.warning(f"Path disappeared: {path}")
+                    continue
+                stats = delete_tree(path, self.workers, report)
+                bytes_freed += stats.bytes_freed
+                if stats.complete:
                     deleted_count += 1
-                    bytes_freed += size
-                    log.info(f"Deleted: {path}")
+                    log.info(f"Deleted: {path} ({stats.bytes_freed} bytes)")
                     if progress_callback:
                         progress_callback(f"Deleted: {path}")
                 else:
-                    log.warning(f"Path disappeared: {path}")
+                    failed_count += 1
+                    first, error = stats.failures[0]
+                    log.error(f"Could not delete {len(stats.failures)} entries under {path}, e.g. {first}: {error}")
+                    if progress_callback:
+                        progress_callback(f"Partly deleted {path}: {len(stats.failures)} entries in use or protected")
             except Exception as e:
                 failed_count += 1
-                log.error(f"Failed to delete {path}: {e}")
+                log.error(f"Failed to clean {path}: {e}")
                 if progress_callback:
-                    progress_callback(f"Failed to delete {path}: {e}")
+                    progress_callback(f"Failed to clean {path}: {e}")
+            finally:
+                # Cached sizes no longer match disk, even after a partial delete
+                self.index.invalidate(path)
 
         return deleted_count, failed_count, bytes_freed
+
+class NvidiaCleaner(JunkCleaner):
+    """The NVIDIA profile only."""
+
+    def __init__(self, index: Optional[SizeIndex] = None):
+        super().__init__([p for p in load_profiles() if p.name == "NVIDIA"], index)
@@ -1,14 +1,28 @@
 import json
 import os
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 CONFIG_FILE = "config.json"
 
 DEFAULT_CONFIG = {
     "target_root": "D:\\APPLICATIONs",
+    "target_roots": [], # Several target roots (first = target_root); items are spread over them. Empty = target_root only
     "size_unit": "GB", # GB or MB
     "theme": "Standard",
+    "scan_workers": 8, # Threads used to size folders during a scan
+    "scan_time_budget": 0, # Seconds before a scan stops walking (0 = no limit)
+    "scan_file_budget": 0, # Files counted before a scan stops walking (0 = no limit)
+    "copy_backend": "native", # native (built-in parallel copy) or robocopy
+    "copy_workers": 8, # Threads used to copy files during a move
+    "verify_level": "full", # Check before deleting a moved file: fast (size+mtime), sampled, full (BLAKE2b)
+    "move_jobs": 4, # Items moved at the same time
+    "move_jobs_per_device": 2, # Concurrent moves touching one SSD (hard disks always get 1)
+    "dedup": False, # Store identical files once per target root (hardlinks); see dedup.py
+    "locked_files": "reject", # Files in use under a source: reject the move, defer it (retry later) or ignore (check nothing)
+    "throttle_mbps": 0, # Copy bandwidth cap in MB/s (0 = no limit); adjustable from the Plan tab while moving
+    "throttle_iops": 0, # Copy I/O operations per second cap (0 = no limit)
+    "throttle_idle_only": False, # Caps only apply while the machine is in use; full speed when idle
     "llm_mode": "none",  # none, cloud, local
     "cloud": {
         "provider": "openai", # openai, gemini
@@ -71,6 +85,18 @@ class Config:
         self._data["target_root"] = value
         self.save()
 
+    @property
+    def target_roots(self) -> List[str]:
+        return [r for r in self._data.get("target_roots") or [] if r] or [self.target_root]
+
+    @target_roots.setter
+    def target_roots(self, value: List[str]):
+        roots = [r.strip() for r in value if r.strip()]
+        self._data["target_roots"] = roots
+        if roots:
+            self._data["target_root"] = roots[0]
+        self.save()
+
     @property
     def size_unit(self) -> str:
         return self._data.get("size_unit", "GB")
@@ -89,6 +115,123 @@ class Config:
         self._data["theme"] = value
         self.save()
 
+    @property
+    def scan_workers(self) -> int:
+        return max(1, int(self._data.get("scan_workers", 8)))
+
+    @scan_workers.setter
+    def scan_workers(self, value: int):
+        self._data["scan_workers"] = max(1, int(value))
+        self.save()
+
+    @property
+    def scan_time_budget(self) -> int:
+        return max(0, int(self._data.get("scan_time_budget", 0)))
+
+    @scan_time_budget.setter
+    def scan_time_budget(self, value: int):
+        self._data["scan_time_budget"] = max(0, int(value))
+        self.save()
+
+    @property
+    def scan_file_budget(self) -> int:
+        return max(0, int(self._data.get("scan_file_budget", 0)))
+
+    @scan_file_budget.setter
+    def scan_file_budget(self, value: int):
+        self._data["scan_file_budget"] = max(0, int(value))
+        self.save()
+
+    @property
+    def copy_backend(self) -> str:
+        return self._data.get("copy_backend", "native")
+
+    @copy_backend.setter
+    def copy_backend(self, value: str):
+        self._data["copy_backend"] = value
+        self.save()
+
+    @property
+    def copy_workers(self) -> int:
+        return max(1, int(self._data.get("copy_workers", 8)))
+
+    @copy_workers.setter
+    def copy_workers(self, value: int):
+        self._data["copy_workers"] = max(1, int(value))
+        self.save()
+
+    @property
+    def verify_level(self) -> str:
+        return self._data.get("verify_level", "full")
+
+    @verify_level.setter
+    def verify_level(self, value: str):
+        self._data["verify_level"] = value
+        self.save()
+
+    @property
+    def move_jobs(self) -> int:
+        return max(1, int(self._data.get("move_jobs", 4)))
+
+    @move_jobs.setter
+    def move_jobs(self, value: int):
+        self._data["move_jobs"] = max(1, int(value))
+        self.save()
+
+    @property
+    def move_jobs_per_device(self) -> int:
+        return max(1, int(self._data.get("move_jobs_per_device", 2)))
+
+    @move_jobs_per_device.setter
+    def move_jobs_per_device(self, value: int):
+        self._data["move_jobs_per_device"] = max(1, int(value))
+        self.save()
+
+    @property
+    def dedup(self) -> bool:
+        return bool(self._data.get("dedup", False))
+
+    @dedup.setter
+    def dedup(self, value: bool):
+        self._data["dedup"] = bool(value)
+        self.save()
+
+    @property
+    def locked_files(self) -> str:
+        return self._data.get("locked_files", "reject")
+
+    @locked_files.setter
+    def locked_files(self, value: str):
+        self._data["locked_files"] = value
+        self.save()
+
+    @property
+    def throttle_mbps(self) -> int:
+        return max(0, int(self._data.get("throttle_mbps", 0)))
+
+    @throttle_mbps.setter
+    def throttle_mbps(self, value: int):
+        self._data["throttle_mbps"] = max(0, int(value))
+        self.save()
+
+    @property
+    def throttle_iops(self) -> int:
+        return max(0, int(self._data.get("throttle_iops", 0)))
+
+    @throttle_iops.setter
+    def throttle_iops(self, value: int):
+        self._data["throttle_iops"] = max(0, int(value))
+        self.save()
+
+    @property
+    def throttle_idle_only(self) -> bool:
+        return bool(self._data.get("throttle_idle_only", False))
+
+    @throttle_idle_only.setter
+    def throttle_idle_only(self, value: bool):
+        self._data["throttle_idle_only"] = bool(value)
+        self.save()
+
     @property
     def llm_mode(self) -> str:
         return self._data.get("llm_mode", "none")
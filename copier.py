@@ -0,0 +1,861 @@
+import errno
+import hashlib
+import os
+import queue
+import random
+import shutil
+import stat
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+from logger import get_logger
+from rules import entry_is_junction
+from throttle import throttle
+
+log = get_logger("copier")
+
+DEFAULT_COPY_WORKERS = 8
+BATCH_FILES = 64 # Small files are handed to workers in groups to keep task overhead down
+BATCH_BYTES = 8 * 1024 * 1024
+TINY_FILE = 64 * 1024 # Up to this size a file is copied with one read and one write, metadata from the listing
+COPY_BUFSIZE = 1024 * 1024 # Buffered fallback; large enough to keep disks streaming
+RING_BUFFERS = 4 # Buffers in each copy thread's ring: at most RING_BUFFERS * COPY_BUFSIZE in flight per thread
+PIPELINE_MIN = 2 * COPY_BUFSIZE # Smaller files are read and written in turn, without a reader thread
+PREALLOCATE_MIN = 1024 * 1024 # Target files from this size are allocated to full size before writing
+LARGE_FILE = 256 * 1024 * 1024 # Files this big are copied as byte ranges by several threads...
+RANGE_CHUNK = 64 * 1024 * 1024 # ...RANGE_CHUNK bytes per task...
+RANGE_WORKERS = 4 # ...on a pool shared by all copy threads
+FAST_CHUNK = 8 * 1024 * 1024 # Bytes per copy_file_range / sendfile call (also the progress granularity)
+HASH_CHUNK = 4 * 1024 * 1024 # Read size for hashing; hashlib drops the GIL on big updates
+PARALLEL_HASH_MIN = 64 * 1024 * 1024 # Files this big get source and target hashed at the same time
+SAMPLE_BLOCK = 16 * 1024 # "sampled" verification hashes this much at the start, middle and end
+SAMPLE_FRACTION = 0.05 # ...and fully hashes this share of files, picked at random
+MTIME_TOLERANCE_NS = 2 * 10**9 # FAT/exFAT targets keep 2 s timestamps
+VERIFY_LEVELS = ("fast", "sampled", "full")
+PROGRESS_INTERVAL = 0.25 # Minimum seconds between progress callbacks
+RATE_WINDOW = 3.0 # Seconds of history behind the reported transfer rate
+
+# Errors meaning "this fast path does not work here", not "the copy failed"
+_UNSUPPORTED = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF, errno.EPERM}
+
+# Disabled process-wide after the first unsupported error, like shutil does for sendfile
+_fast_paths = {
+    "copy_file_range": hasattr(os, "copy_file_range"),
+    "sendfile": hasattr(os, "sendfile") and os.name == "posix",
+}
+
+class CopyError(Exception):
+    """Some entries could not be copied. failures holds (path, error) pairs."""
+    def __init__(self, failures: List[Tuple[str, str]]):
+        self.failures = failures
+        shown = "; ".join(f"{p}: {e}" for p, e in failures[:5])
+        more = f" (+{len(failures) - 5} more)" if len(failures) > 5 else ""
+        super().__init__(f"{len(failures)} entries failed to copy: {shown}{more}")
+
+class VerifyError(OSError):
+    """A copied file does not match its source."""
+
+@dataclass
+class CopyStats:
+    files: int = 0
+    bytes: int = 0
+    dirs: int = 0
+    links: int = 0
+    verified: int = 0
+    failures: List[Tuple[str, str]] = field(default_factory=list)
+
+@dataclass
+class TransferProgress:
+    bytes_done: int
+    files_done: int
+    total_bytes: int # Expected total (e.g. the scanned size); 0 if unknown
+    rate: float # Bytes/s over the last RATE_WINDOW seconds
+
+    @property
+    def fraction(self) -> float:
+        return min(1.0, self.bytes_done / self.total_bytes) if self.total_bytes else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Seconds left at the current rate, or None if it cannot be estimated."""
+        if not self.total_bytes or self.rate <= 0:
+            return None
+        return max(0, self.total_bytes - self.bytes_done) / self.rate
+
+class ProgressMeter:
+    """
+    Thread-safe byte/file counter shared by the copy threads.
+
+    callback gets a TransferProgress at most every `interval` seconds (plus once
+    from finish()), on whichever copy thread crossed the interval. Keep it cheap,
+    e.g. emit a Qt signal.
+    """
+
+    def __init__(self, total_bytes: int = 0, callback: Callable[[TransferProgress], None] = None,
+                 interval: float = PROGRESS_INTERVAL):
+        self.total_bytes = total_bytes
+        self.callback = callback
+        self.interval = interval
+        self.bytes_done = 0
+        self.files_done = 0
+        self._lock = threading.Lock()
+        self._samples = deque([(time.monotonic(), 0)]) # (time, bytes_done) over the rate window
+        self._last_report = 0.0
+
+    def add(self, nbytes: int = 0, files: int = 0):
+        now = time.monotonic()
+        with self._lock:
+            self.bytes_done += nbytes
+            self.files_done += files
+            due = self.callback is not None and now - self._last_report >= self.interval
+            if due:
+                self._last_report = now
+                self._samples.append((now, self.bytes_done))
+                while len(self._samples) > 2 and now - self._samples[1][0] >= RATE_WINDOW:
+                    self._samples.popleft()
+                progress = self._snapshot(now)
+        if due:
+            self.callback(progress)
+
+    def _snapshot(self, now: float) -> TransferProgress:
+        t0, b0 = self._samples[0]
+        rate = (self.bytes_done - b0) / (now - t0) if now > t0 else 0.0
+        return TransferProgress(self.bytes_done, self.files_done, self.total_bytes, rate)
+
+    def snapshot(self) -> TransferProgress:
+        with self._lock:
+            return self._snapshot(time.monotonic())
+
+    def finish(self):
+        """Report the final state regardless of the throttle."""
+        if self.callback is not None:
+            self.callback(self.snapshot())
+
+def _kernel_copy(name: str, infd: int, outfd: int, on_bytes: Callable[[int], None] = None) -> Optional[int]:
+    """Copy infd to outfd in the kernel. Returns bytes copied; None if this path is unsupported (nothing written yet)."""
+    copied = 0
+    try:
+        while True:
+            if name == "copy_file_range":
+                n = os.copy_file_range(infd, outfd, throttle.chunk(FAST_CHUNK))
+            else:
+                n = os.sendfile(outfd, infd, copied, throttle.chunk(FAST_CHUNK))
+            if n == 0:
+                return copied
+            copied += n
+            throttle.consume(n)
+            if on_bytes:
+                on_bytes(n)
+    except OSError as e:
+        if copied == 0 and e.errno in _UNSUPPORTED:
+            if e.errno != errno.EXDEV: # Cross-device only fails for this pair of files
+                _fast_paths[name] = False
+            return None
+        raise
+
+class BufferRing:
+    """
+    A fixed set of preallocated buffers passed from a reader to a writer and back
+    (free -> readinto -> filled -> write/hash through a memoryview -> free), so a copy
+    allocates no chunk objects and never holds more than the ring, whatever the file size.
+    """
+
+    def __init__(self, count: int = RING_BUFFERS, size: int = COPY_BUFSIZE):
+        self.buffers = [bytearray(size) for _ in range(count)]
+        self.views = [memoryview(b) for b in self.buffers]
+
+    def copy(self, fsrc, outfd: int, size_hint: int, on_bytes: Callable[[int], None] = None, hasher=None) -> int:
+        """Copy the rest of fsrc (a raw/buffered binary file) to outfd. Returns bytes copied."""
+        if size_hint < PIPELINE_MIN:
+            return self._copy_inline(fsrc, outfd, on_bytes, hasher)
+        free, filled = queue.SimpleQueue(), queue.SimpleQueue()
+        for i in range(len(self.buffers)):
+            free.put(i)
+
+        def read():
+            try:
+                while (i := free.get()) is not None:
+                    n = fsrc.readinto(self.buffers[i])
+                    filled.put((i, n))
+                    if not n:
+                        return
+            except BaseException as e:
+                filled.put((None, e))
+
+        reader = threading.Thread(target=read, name="copy-reader", daemon=True)
+        reader.start()
+        copied = 0
+        try:
+            while True:
+                i, n = filled.get()
+                if i is None:
+                    raise n
+                if not n:
+                    return copied
+                self._write(self.views[i][:n], outfd, hasher)
+                copied += n
+                throttle.consume(n)
+                if on_bytes:
+                    on_bytes(n)
+                free.put(i)
+        finally:
+            free.put(None) # Stops the reader if the write side failed
+            reader.join()
+
+    def _copy_inline(self, fsrc, outfd: int, on_bytes, hasher) -> int:
+        buf, view = self.buffers[0], self.views[0]
+        copied = 0
+        while n := fsrc.readinto(buf):
+            self._write(view[:n], outfd, hasher)
+            copied += n
+            throttle.consume(n)
+            if on_bytes:
+                on_bytes(n)
+        return copied
+
+    @staticmethod
+    def _write(view: memoryview, outfd: int, hasher):
+        if hasher is not None:
+            hasher.update(view)
+        while view:
+            view = view[os.write(outfd, view):]
+
+_rings = threading.local()
+
+def _ring(count: int = RING_BUFFERS) -> BufferRing:
+    """This thread's buffer ring, allocated (count buffers) on first use and reused for every file it copies."""
+    ring = getattr(_rings, "ring", None)
+    if ring is None:
+        ring = _rings.ring = BufferRing(count)
+    return ring
+
+def preallocate(fd: int, size: int) -> bool:
+    """
+    Reserve size bytes for a new file up front, so the filesystem can give it a few
+    contiguous extents instead of growing it write by write. posix_fallocate where
+    the OS has it; elsewhere setting the end of file (on NTFS that reserves the
+    clusters). False if the filesystem refused; the copy then just grows the file.
+    """
+    try:
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(fd, 0, size)
+        else:
+            os.ftruncate(fd, size)
+        return True
+    except OSError:
+        return False
+
+def _looks_sparse(st: os.stat_result) -> bool:
+    # Fewer blocks than bytes: holes (or compression, which the extent walk copes with too)
+    return (hasattr(os, "SEEK_DATA") and st.st_size >= PREALLOCATE_MIN
+            and getattr(st, "st_blocks", None) is not None and st.st_blocks * 512 < st.st_size)
+
+def _data_extents(fd: int, size: int) -> Optional[List[Tuple[int, int]]]:
+    """(offset, length) of the data regions of a file (SEEK_DATA/SEEK_HOLE). None if the filesystem can't say."""
+    extents, pos = [], 0
+    try:
+        while pos < size:
+            try:
+                start = os.lseek(fd, pos, os.SEEK_DATA)
+            except OSError as e:
+                if e.errno == errno.ENXIO: # Nothing but a hole up to the end
+                    break
+                raise
+            end = min(os.lseek(fd, start, os.SEEK_HOLE), size)
+            extents.append((start, end - start))
+            pos = end
+    except OSError:
+        return None
+    finally:
+        os.lseek(fd, 0, os.SEEK_SET)
+    return extents
+
+_ZEROS = memoryview(bytes(COPY_BUFSIZE)) # Holes, as far as a hasher is concerned
+
+def _copy_span(fsrc, fdst, offset: int, length: int, on_bytes: Callable[[int], None] = None, hasher=None) -> int:
+    """Copy length bytes at offset, to the same offset in fdst (raw files). Returns bytes copied."""
+    done = 0
+    if hasher is None and _fast_paths["copy_file_range"]:
+        try:
+            while done < length:
+                n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), min(throttle.chunk(FAST_CHUNK), length - done),
+                                       offset + done, offset + done)
+                if n == 0:
+                    break
+                done += n
+                throttle.consume(n)
+                if on_bytes:
+                    on_bytes(n)
+            return done
+        except OSError as e:
+            if done or e.errno not in _UNSUPPORTED:
+                raise
+            if e.errno != errno.EXDEV:
+                _fast_paths["copy_file_range"] = False
+    view = _ring(1).views[0]
+    fsrc.seek(offset)
+    fdst.seek(offset)
+    while done < length:
+        n = fsrc.readinto(view[:min(len(view), length - done)])
+        if not n:
+            break
+        BufferRing._write(view[:n], fdst.fileno(), hasher)
+        done += n
+        throttle.consume(n)
+        if on_bytes:
+            on_bytes(n)
+    return done
+
+_range_pool = None
+_range_pool_lock = threading.Lock()
+
+def _copy_range(src: str, dst: str, offset: int, length: int, on_bytes: Callable[[int], None] = None) -> int:
+    # Own descriptors: ranges of one file are copied side by side
+    with open(src, "rb", buffering=0) as fsrc, open(dst, "r+b", buffering=0) as fdst:
+        return _copy_span(fsrc, fdst, offset, length, on_bytes)
+
+def _copy_parallel(src: str, dst: str, spans: List[Tuple[int, int]], on_bytes: Callable[[int], None] = None) -> int:
+    """Copy the (offset, length) spans of src into the existing dst in RANGE_CHUNK pieces on the shared range pool."""
+    global _range_pool
+    with _range_pool_lock:
+        if _range_pool is None:
+            _range_pool = ThreadPoolExecutor(max_workers=RANGE_WORKERS, thread_name_prefix="copy-range")
+    pieces = [(offset + at, min(RANGE_CHUNK, length - at)) for offset, length in spans for at in range(0, length, RANGE_CHUNK)]
+    futures = [_range_pool.submit(_copy_range, src, dst, offset, length, on_bytes) for offset, length in pieces]
+    return sum(f.result() for f in futures)
+
+def _copy_sparse(fsrc, fdst, src: str, dst: str, extents: List[Tuple[int, int]], size: int,
+                 on_bytes: Callable[[int], None] = None, hasher=None) -> int:
+    """Copy only the data extents, so holes stay holes. A hasher is fed zeros for the holes."""
+    if hasher is None and sum(length for _, length in extents) >= LARGE_FILE:
+        return _copy_parallel(src, dst, extents, on_bytes)
+    pos = copied = 0
+    for offset, length in extents + [(size, 0)]:
+        while hasher is not None and pos < offset:
+            n = min(len(_ZEROS), offset - pos)
+            hasher.update(_ZEROS[:n])
+            pos += n
+        n = _copy_span(fsrc, fdst, offset, length, on_bytes, hasher)
+        copied += n
+        pos = offset + n
+    return copied
+
+def copy_file(src: str, dst: str, on_bytes: Callable[[int], None] = None, hasher=None) -> int:
+    """
+    Copy one file's data, permissions (ACLs too on Windows) and timestamps. Returns bytes copied.
+
+    The target is preallocated to its final size (preallocate). Files of LARGE_FILE
+    and up are copied as parallel byte ranges; sparse files (SEEK_DATA/SEEK_HOLE) only
+    have their data extents copied, keeping the holes. Otherwise copy_file_range
+    (reflinks / server-side copy) or sendfile when the OS has them, else the calling
+    thread's BufferRing (a reader thread feeding this one).
+    on_bytes(n) is called as chunks land (from several threads for ranged copies).
+    Every chunk passes through throttle.throttle (the user's MB/s and IOPS caps).
+    With hasher (a hashlib object) the copy is sequential through this thread's buffers
+    and hashed there, so verification does not have to read the source again.
+    """
+    with open(src, "rb", buffering=0) as fsrc, open(dst, "wb", buffering=0) as fdst:
+        infd, outfd = fsrc.fileno(), fdst.fileno()
+        st = os.fstat(infd)
+        extents = _data_extents(infd, st.st_size) if _looks_sparse(st) else None
+        if extents is not None:
+            _copy_sparse(fsrc, fdst, src, dst, extents, st.st_size, on_bytes, hasher)
+            os.ftruncate(outfd, st.st_size) # Trailing hole
+        else:
+            preallocated = st.st_size >= PREALLOCATE_MIN and preallocate(outfd, st.st_size)
+            copied = None
+            if hasher is None and st.st_size >= LARGE_FILE:
+                copied = _copy_parallel(src, dst, [(0, st.st_size)], on_bytes)
+            elif hasher is None:
+                for name in ("copy_file_range", "sendfile"):
+                    if _fast_paths[name]:
+                        copied = _kernel_copy(name, infd, outfd, on_bytes)
+                        if copied is not None:
+                            break
+            if copied is None:
+                copied = _ring().copy(fsrc, outfd, st.st_size, on_bytes, hasher)
+            if preallocated and copied != st.st_size: # Shrank since it was opened
+                os.ftruncate(outfd, copied)
+        size = os.fstat(outfd).st_size
+    shutil.copystat(src, dst)
+    copy_security(src, dst)
+    return size
+
+_hash_buffers = threading.local()
+
+def hash_file(path: str) -> str:
+    """
+    BLAKE2b of a file's contents, read in large chunks into a per-thread reused buffer.
+    Reads are throttled like copies: verification is disk traffic too.
+    """
+    h = hashlib.blake2b()
+    buf = getattr(_hash_buffers, "buf", None)
+    if buf is None:
+        buf = _hash_buffers.buf = bytearray(HASH_CHUNK)
+    view = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
+        while n := f.readinto(view[:throttle.chunk(HASH_CHUNK)]):
+            h.update(view[:n])
+            throttle.consume(n)
+    return h.hexdigest()
+
+def verify_hash(src: str, dst: str, size: int, src_digest: Optional[str] = None) -> str:
+    """
+    Hash source and copy (side by side for big files). Returns the digest; VerifyError on mismatch.
+    src_digest (hashed from the copy buffers, see copy_file) spares reading the source again.
+    """
+    if src_digest is not None:
+        src_hash, dst_hash = src_digest, hash_file(dst)
+    elif size >= PARALLEL_HASH_MIN:
+        result = {}
+        t = threading.Thread(target=lambda: result.update(src=hash_file(src)), daemon=True)
+        t.start()
+        dst_hash = hash_file(dst)
+        t.join()
+        if "src" not in result:
+            raise OSError(errno.EIO, "could not hash source", src)
+        src_hash = result["src"]
+    else:
+        src_hash, dst_hash = hash_file(src), hash_file(dst)
+    if src_hash != dst_hash:
+        raise VerifyError(errno.EIO, "copy does not match source (BLAKE2b)", dst)
+    return dst_hash
+
+def _sample_hash(path: str, size: int) -> str:
+    h = hashlib.blake2b()
+    with open(path, "rb", buffering=0) as f:
+        for offset in sorted({0, max(0, size // 2 - SAMPLE_BLOCK // 2), max(0, size - SAMPLE_BLOCK)}):
+            f.seek(offset)
+            block = f.read(SAMPLE_BLOCK)
+            h.update(block)
+            throttle.consume(len(block))
+    return h.hexdigest()
+
+class Verifier:
+    """
+    Checks a copied file at one of VERIFY_LEVELS, and keeps count of what that cost:
+        fast    - size and mtime of every file (no data read)
+        sampled - fast, plus start/middle/end blocks of every file, plus a full
+                  BLAKE2b of a random SAMPLE_FRACTION of files
+        full    - BLAKE2b of every file (verify_hash)
+    Callable as copy_tree's verify; returns the digest for fully hashed files.
+    At "full", copy_tree hashes the source while copying (uses_source_digest) and
+    passes that digest in, so only the copy is read back; on a single device it keeps
+    the kernel copy instead and both files are read back.
+    """
+
+    def __init__(self, level: str = "full", sample_fraction: float = SAMPLE_FRACTION, seed=None):
+        if level not in VERIFY_LEVELS:
+            raise ValueError(f"Unknown verification level: {level}")
+        self.level = level
+        self.sample_fraction = sample_fraction
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.files = 0
+        self.bytes_read = 0 # source + copy
+        self.seconds = 0.0 # summed over the verify threads
+
+    @property
+    def uses_source_digest(self) -> bool:
+        return self.level == "full"
+
+    def __call__(self, src: str, dst: str, size: int, src_digest: Optional[str] = None) -> Optional[str]:
+        start = time.perf_counter()
+        digest, read = None, 0
+        s_st, d_st = os.stat(src), os.stat(dst)
+        if s_st.st_size != d_st.st_size or abs(s_st.st_mtime_ns - d_st.st_mtime_ns) > MTIME_TOLERANCE_NS:
+            raise VerifyError(errno.EIO, "copy differs from source in size or mtime", dst)
+        if self.level == "full" or (self.level == "sampled" and self._rng.random() < self.sample_fraction):
+            digest = verify_hash(src, dst, size, src_digest if self.level == "full" else None)
+            read = size if src_digest is not None and self.level == "full" else 2 * size
+        elif self.level == "sampled":
+            if _sample_hash(src, size) != _sample_hash(dst, size):
+                raise VerifyError(errno.EIO, "copy does not match source (sampled blocks)", dst)
+            read = 2 * min(size, 3 * SAMPLE_BLOCK)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.files += 1
+            self.bytes_read += read
+            self.seconds += elapsed
+        return digest
+
+def remove_file(path: str):
+    try:
+        os.remove(path)
+    except PermissionError:
+        if os.name != "nt":
+            raise # The folder is read-only: the file's own mode has nothing to do with it
+        os.chmod(path, stat.S_IWRITE) # Windows refuses to delete read-only files
+        os.remove(path)
+
+_O_BINARY = getattr(os, "O_BINARY", 0) # Windows text-mode translation off
+_FD_UTIME = os.utime in os.supports_fd
+_umask = os.umask(0)
+os.umask(_umask)
+_NEW_FILE_MODE = 0o666 & ~_umask # What a freshly created file gets anyway
+
+# Windows security descriptor parts copied along with the data (what robocopy /COPYALL keeps, minus auditing)
+_OWNER, _GROUP, _DACL = 0x1, 0x2, 0x4
+_PROTECTED_DACL, _UNPROTECTED_DACL = 0x80000000, 0x20000000
+_SE_DACL_PROTECTED = 0x1000
+_OWNER_REFUSED = {5, 1307, 1314} # Access denied, invalid owner, privilege not held (needs admin)
+
+def copy_security(src: str, dst: str):
+    """
+    Windows: give dst the owner, group and ACLs of src. chmod only carries the
+    read-only flag there, so without this every native copy would fall back to the
+    target folder's inherited permissions. Where the owner can't be set (not elevated)
+    the ACLs are still copied. No-op on other platforms (mode bits are copied by chmod).
+    """
+    if os.name != "nt":
+        return
+    import ctypes
+    from ctypes import wintypes
+    advapi32 = ctypes.windll.advapi32
+    owner, group, dacl, sacl, sd = (ctypes.c_void_p() for _ in range(5))
+    err = advapi32.GetNamedSecurityInfoW(src, 1, _OWNER | _GROUP | _DACL, ctypes.byref(owner), # SE_FILE_OBJECT
+                                         ctypes.byref(group), ctypes.byref(dacl), None, ctypes.byref(sd))
+    if err:
+        raise ctypes.WinError(err)
+    try:
+        control, revision = wintypes.WORD(), wintypes.DWORD()
+        advapi32.GetSecurityDescriptorControl(sd, ctypes.byref(control), ctypes.byref(revision))
+        # Keep inheritance as it was: a protected DACL stays cut off from the new parent's ACEs
+        inherit = _PROTECTED_DACL if control.value & _SE_DACL_PROTECTED else _UNPROTECTED_DACL
+        err = advapi32.SetNamedSecurityInfoW(dst, 1, _OWNER | _GROUP | _DACL | inherit, owner, group, dacl, None)
+        if err in _OWNER_REFUSED:
+            err = advapi32.SetNamedSecurityInfoW(dst, 1, _DACL | inherit, None, None, dacl, None)
+        if err:
+            raise ctypes.WinError(err)
+    finally:
+        ctypes.windll.kernel32.LocalFree(sd)
+
+def copy_small_file(src: str, dst: str, atime_ns: int, mtime_ns: int, mode: int, hasher=None) -> int:
+    """
+    Copy a tiny file with one read and one write on raw descriptors, taking times and
+    mode from the directory listing instead of stat-ing the source again (no copystat).
+    chmod only runs if the mode differs from what a new file gets. Returns bytes copied.
+    hasher, if given, is fed the data.
+    """
+    fd = os.open(src, os.O_RDONLY | _O_BINARY)
+    try:
+        data = os.read(fd, TINY_FILE + 1)
+        if len(data) > TINY_FILE: # Grew since it was listed
+            chunks = [data]
+            while chunk := os.read(fd, COPY_BUFSIZE):
+                chunks.append(chunk)
+            data = b"".join(chunks)
+    finally:
+        os.close(fd)
+    if hasher is not None:
+        hasher.update(data)
+    out = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | _O_BINARY, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(out, view):]
+        if _FD_UTIME:
+            os.utime(out, ns=(atime_ns, mtime_ns))
+    finally:
+        os.close(out)
+    if not _FD_UTIME:
+        os.utime(dst, ns=(atime_ns, mtime_ns))
+    if stat.S_IMODE(mode) != _NEW_FILE_MODE:
+        os.chmod(dst, stat.S_IMODE(mode))
+    copy_security(src, dst)
+    throttle.consume(len(data))
+    return len(data)
+
+def _copy_link(src: str, dst: str):
+    os.symlink(os.readlink(src), dst, target_is_directory=os.path.isdir(src))
+
+@dataclass
+class TreePlan:
+    """Everything under a source root, as paths relative to it. Directories parents-first."""
+    dirs: List[str] = field(default_factory=list)
+    files: List[Tuple[str, int, int]] = field(default_factory=list) # (rel_path, size, mtime_ns)
+    file_meta: List[Tuple[int, int]] = field(default_factory=list) # (atime_ns, mode), parallel to files
+    dir_stats: dict = field(default_factory=dict) # rel_dir -> stat_result, taken while listing
+    links: List[str] = field(default_factory=list) # symlinks and junctions, recreated not followed
+    failures: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(size for _, size, _ in self.files)
+
+def scan_tree(src: str) -> TreePlan:
+    """List src once (DirEntry stat data, no per-file syscalls on Windows)."""
+    plan = TreePlan()
+    try:
+        plan.dir_stats[""] = os.stat(src)
+    except OSError as e:
+        plan.failures.append((src, str(e)))
+        return plan
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        plan.dirs.append(rel_dir)
+        try:
+            with os.scandir(os.path.join(src, rel_dir) if rel_dir else src) as it:
+                entries = list(it)
+        except OSError as e:
+            plan.failures.append((os.path.join(src, rel_dir), str(e)))
+            continue
+        for entry in entries:
+            rel = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+            try:
+                if entry.is_symlink() or (entry.is_dir(follow_symlinks=False) and entry_is_junction(entry)):
+                    plan.links.append(rel)
+                elif entry.is_dir(follow_symlinks=False):
+                    plan.dir_stats[rel] = entry.stat(follow_symlinks=False)
+                    stack.append(rel)
+                else:
+                    st = entry.stat(follow_symlinks=False)
+                    plan.files.append((rel, st.st_size, st.st_mtime_ns))
+                    plan.file_meta.append((st.st_atime_ns, st.st_mode))
+            except OSError as e:
+                plan.failures.append((entry.path, str(e)))
+    return plan
+
+def _already_copied(journal, dst: str, rel: str, size: int, mtime: int) -> bool:
+    # Trust the journal only if the copy is still there, whole
+    if not journal.is_done(rel, size, mtime):
+        return False
+    try:
+        return os.stat(dst).st_size == size
+    except OSError:
+        return False
+
+def copy_tree(src: str, dst: str, workers: int = DEFAULT_COPY_WORKERS,
+              progress: Optional[ProgressMeter] = None, journal=None,
+              verify: Optional[Callable[[str, str, int], Optional[str]]] = verify_hash,
+              move: bool = False, dedup=None) -> CopyStats:
+    """
+    Copy the tree at src into dst (created if missing) with a pool of copy threads.
+
+    The tree is listed first (scan_tree) and all directories are created before any
+    file is queued, so workers never wait on a missing parent. Symlinks and junctions are
+    recreated as links rather than followed. Directory timestamps are restored last,
+    deepest first, since writing files into a directory changes its mtime.
+    Never raises for individual entries; check stats.failures (which also gets any
+    error a copy or verify task died of).
+    progress, if given, is fed bytes and file counts as the copy goes.
+
+    verify(src, dst, size) checks each copied file and returns its digest (or None);
+    it raises on a mismatch. It runs on a second pool, pipelined with the copy: a
+    file is verified while the next ones are still copying. With move=True each
+    source file is deleted as soon as its copy verified, each source link once it
+    is recreated, and source folders at the end if that left them empty. Nothing
+    else is deleted: entries that appeared after the listing stay in src.
+
+    journal makes the copy resumable. It needs plan(files), is_done(rel, size, mtime)
+    and done(rel, size, mtime, digest) (called once a file is copied and verified);
+    see mover.MoveJournal. Files it reports done, unchanged and still present in dst are skipped.
+
+    dedup, if given, gets add(rel, dst_path, size, digest) for every verified copy of at
+    least dedup.min_size bytes (see dedup.DedupStore).
+    """
+    stats = CopyStats()
+    lock = threading.Lock()
+
+    def fail(path: str, e):
+        log.warning(f"Copy failed for {path}: {e}")
+        with lock:
+            stats.failures.append((path, str(e)))
+
+    plan = scan_tree(src)
+    for path, e in plan.failures:
+        fail(path, e)
+    if journal is not None:
+        journal.plan(plan.files)
+
+    # Whole skeleton first, parents before children, so a plain mkdir per directory will do.
+    # Directory times come from the listing: deleting moved files would change the source's.
+    reused = set() # Directories that were already there; only these can hold stale copies
+    for rel in plan.dirs:
+        try:
+            if rel:
+                os.mkdir(os.path.join(dst, rel))
+            else:
+                os.makedirs(dst)
+        except FileExistsError:
+            reused.add(rel) # Resumed copy, or an empty target folder
+        except OSError as e:
+            fail(os.path.join(src, rel), e)
+            continue
+        stats.dirs += 1
+    for rel in plan.links:
+        d = os.path.join(dst, rel)
+        try:
+            if not os.path.lexists(d): # Resumed copy: made last time
+                _copy_link(os.path.join(src, rel), d)
+            stats.links += 1
+        except OSError as e:
+            fail(os.path.join(src, rel), e)
+            continue
+        if move:
+            try:
+                remove_link(os.path.join(src, rel))
+            except OSError:
+                pass # Left for the caller to report
+
+    on_bytes = progress.add if progress else None
+
+    # The verifier can take the source's digest from the copy buffers instead of re-reading it,
+    # but that copies through user space. Only worth it across devices: on the same one
+    # copy_file_range may clone or copy server-side, which beats saving a read (bench_verify).
+    hash_copies = getattr(verify, "uses_source_digest", False) and not _same_device(src, dst)
+
+    def commit(rel: str, size: int, mtime: int, s: str, d: str, src_digest: Optional[str] = None):
+        """Copy landed (and, with verify, checked out): record it and release the source."""
+        digest = None
+        if verify is not None:
+            try:
+                digest = verify(s, d, size, src_digest) if src_digest else verify(s, d, size)
+            except OSError as e:
+                fail(s, e)
+                return
+            with lock:
+                stats.verified += 1
+        try:
+            if dedup is not None and size >= dedup.min_size:
+                dedup.add(rel, d, size, digest)
+            if journal is not None:
+                journal.done(rel, size, mtime, digest)
+        except Exception as e: # sqlite3.Error and the like: not recorded, so the source stays
+            fail(s, e)
+            return
+        if move:
+            try:
+                remove_file(s)
+            except OSError:
+                pass # In use; left for the caller to report
+
+    tasks = [] # (path, future) of every pool task; checked once both pools are done
+
+    def submit(pool, path: str, fn, *args):
+        future = pool.submit(fn, *args)
+        with lock:
+            tasks.append((path, future))
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="verify") as verify_pool:
+        def copy_batch(batch: list):
+            files = copied = 0
+            for (rel, size, mtime), (atime, mode) in batch:
+                s, d = os.path.join(src, rel), os.path.join(dst, rel)
+                # Big files are copied in parallel ranges; the verifier hashes those itself
+                hasher = hashlib.blake2b() if hash_copies and size < LARGE_FILE else None
+                try:
+                    if os.path.dirname(rel) in reused:
+                        # A copy the journal never recorded may be read-only, or a dedup
+                        # hardlink: replace it rather than write into it
+                        try:
+                            remove_file(d)
+                        except FileNotFoundError:
+                            pass
+                    if size <= TINY_FILE:
+                        n = copy_small_file(s, d, atime, mtime, mode, hasher)
+                        if on_bytes:
+                            on_bytes(n)
+                    else:
+                        n = copy_file(s, d, on_bytes, hasher)
+                    copied += n
+                    files += 1
+                except OSError as e:
+                    fail(s, e)
+                    continue
+                src_digest = hasher.hexdigest() if hasher is not None else None
+                if verify is not None:
+                    submit(verify_pool, s, commit, rel, size, mtime, s, d, src_digest)
+                else:
+                    commit(rel, size, mtime, s, d)
+                if progress:
+                    progress.add(files=1)
+            with lock:
+                stats.files += files
+                stats.bytes += copied
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="copy") as pool:
+            batch, batch_bytes = [], 0
+            for (rel, size, mtime), meta in zip(plan.files, plan.file_meta):
+                if journal is not None and _already_copied(journal, os.path.join(dst, rel), rel, size, mtime):
+                    if move: # Copied and checked last time; the source just wasn't removed yet
+                        try:
+                            remove_file(os.path.join(src, rel))
+                        except OSError:
+                            pass
+                    continue
+                batch.append(((rel, size, mtime), meta))
+                batch_bytes += size
+                if len(batch) >= BATCH_FILES or batch_bytes >= BATCH_BYTES:
+                    submit(pool, os.path.join(src, batch[0][0][0]), copy_batch, batch)
+                    batch, batch_bytes = [], 0
+            if batch:
+                submit(pool, os.path.join(src, batch[0][0][0]), copy_batch, batch)
+    for path, future in tasks:
+        if future.exception() is not None:
+            fail(path, future.exception())
+
+    for rel in reversed(plan.dirs):
+        st = plan.dir_stats.get(rel)
+        if st is None:
+            continue
+        try:
+            d_dir = os.path.join(dst, rel) if rel else dst
+            os.chmod(d_dir, stat.S_IMODE(st.st_mode))
+            copy_security(os.path.join(src, rel) if rel else src, d_dir)
+            os.utime(d_dir, ns=(st.st_atime_ns, st.st_mtime_ns))
+        except OSError as e:
+            fail(os.path.join(src, rel), e)
+    if move and not stats.failures:
+        for rel in reversed(plan.dirs): # Children first
+            try:
+                os.rmdir(os.path.join(src, rel) if rel else src)
+            except OSError:
+                pass # Not empty: something that was not moved is still in it
+    return stats
+
+def _same_device(src: str, dst: str) -> bool:
+    try:
+        return os.stat(src).st_dev == os.stat(dst).st_dev
+    except OSError:
+        return False
+
+def remove_link(path: str):
+    # The link itself, never its target; directory links and junctions need rmdir on Windows
+    try:
+        os.unlink(path)
+    except (IsADirectoryError, PermissionError):
+        os.rmdir(path)
+
+def _left_behind(src: str) -> List[str]:
+    """Files and links still under src (folders only count if nothing is inside them)."""
+    if not os.path.lexists(src):
+        return []
+    left = []
+    for dirpath, dirnames, filenames in os.walk(src):
+        left.extend(os.path.join(dirpath, n) for n in filenames)
+        left.extend(os.path.join(dirpath, n) for n in dirnames if os.path.islink(os.path.join(dirpath, n)))
+    return left or [src]
+
+def move_tree(src: str, dst: str, workers: int = DEFAULT_COPY_WORKERS,
+              progress: Optional[ProgressMeter] = None, journal=None,
+              verify: Optional[Callable[[str, str, int], Optional[str]]] = verify_hash, dedup=None) -> CopyStats:
+    """
+    Copy src to dst and delete src. A source file is only deleted once its copy
+    verified; on any failure CopyError is raised and whatever did not make it stays in src.
+    Only what was listed and moved is deleted: files created during the move, or
+    that could not be deleted (in use), stay in src and are reported as a CopyError.
+    With a journal, running it again after an interruption only copies what is left.
+    """
+    stats = copy_tree(src, dst, workers, progress, journal, verify, move=True, dedup=dedup)
+    if stats.failures:
+        raise CopyError(stats.failures)
+    left = _left_behind(src)
+    if left:
+        raise CopyError([(path, "still in the source after the move (in use, or created during it)")
+                         for path in left])
+    return stats
@@ -0,0 +1,137 @@
+import os
+import shutil
+import stat
+import threading
+import time
+from typing import Optional
+from copier import hash_file
+from logger import get_logger
+from storage import storage
+
+log = get_logger("dedup")
+
+DEDUP_DIR = ".safemove-dedup" # Blob store folder, directly under a target root
+DEDUP_MIN_SIZE = 128 * 1024 # Smaller files are not worth an index row and a link
+
+def blob_path(store: str, digest: str) -> str:
+    return os.path.join(store, digest[:2], digest)
+
+def _replace(src: str, dst: str):
+    try:
+        os.replace(src, dst)
+    except PermissionError:
+        if os.name != "nt":
+            raise # Read-only folder; chmod'ing dst would only leave it unreadable
+        os.chmod(dst, stat.S_IWRITE) # Windows refuses to replace read-only files
+        os.replace(src, dst)
+
+def _holds(blob: str, digest: str, size: int) -> bool:
+    """True if blob still has this content. It shares its data with an earlier move's file, which may have been rewritten in place."""
+    try:
+        return os.stat(blob).st_size == size and hash_file(blob) == digest
+    except OSError:
+        return False
+
+class DedupStore:
+    """
+    Content-addressed store under a target root: each distinct file content (BLAKE2b
+    plus size) is kept once, as a hardlink at DEDUP_DIR/<digest[:2]>/<digest>, and
+    later copies of the same content are replaced by hardlinks to it.
+
+    Plugs into copier.copy_tree (add() is called once a file is copied and verified).
+    The index lives in storage (dedup_blobs, dedup_files) and is written in batches
+    like mover.MoveJournal. Any error just leaves that file as an independent copy.
+    Hardlinked files share one set of timestamps and attributes.
+    A blob is re-hashed before each link, and one that no longer matches its digest
+    is replaced by the new copy, so a verified copy is never swapped for other bytes.
+    """
+    FLUSH_FILES = 500
+    FLUSH_SECONDS = 1.0
+    min_size = DEDUP_MIN_SIZE
+
+    def __init__(self, target_root: str, move_id: int):
+        self.store = os.path.join(os.path.normpath(target_root), DEDUP_DIR)
+        self.move_id = move_id
+        self._blobs = storage.get_dedup_blobs(self.store)
+        self._new_blobs = []
+        self._files = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.linked_files = 0
+        self.saved_bytes = 0
+
+    def add(self, rel: str, path: str, size: int, digest: Optional[str] = None):
+        """Deduplicate the copied file at path. digest is its BLAKE2b if the verifier already has it."""
+        try:
+            digest = digest or hash_file(path)
+            blob = blob_path(self.store, digest)
+            # Read outside the lock: the check costs a full read of the blob
+            known = self._blobs.get(digest) == size and _holds(blob, digest, size)
+            with self._lock:
+                if known and self._link(blob, path):
+                    self.linked_files += 1
+                    self.saved_bytes += size
+                else:
+                    # First of its kind, or the blob went stale: the copy itself becomes the blob
+                    os.makedirs(os.path.dirname(blob), exist_ok=True)
+                    tmp = blob + ".new"
+                    os.link(path, tmp)
+                    _replace(tmp, blob)
+                    self._blobs[digest] = size
+                    self._new_blobs.append((digest, size))
+                self._files.append((rel, digest, size))
+                if len(self._files) < self.FLUSH_FILES and time.monotonic() - self._last_flush < self.FLUSH_SECONDS:
+                    return
+                blobs, files = self._take()
+            storage.save_dedup(self.store, self.move_id, blobs, files)
+        except OSError as e:
+            log.warning(f"Dedup skipped {path}: {e}")
+
+    @staticmethod
+    def _link(blob: str, path: str) -> bool:
+        """Replace path with a hardlink to blob. False if the blob is gone (or can't take another link)."""
+        tmp = path + ".dedup"
+        try:
+            os.link(blob, tmp)
+        except OSError:
+            return False
+        try:
+            _replace(tmp, path)
+        except OSError:
+            os.remove(tmp)
+            raise
+        return True
+
+    def _take(self):
+        blobs, files = self._new_blobs, self._files
+        self._new_blobs, self._files = [], []
+        self._last_flush = time.monotonic()
+        return blobs, files
+
+    def flush(self):
+        with self._lock:
+            blobs, files = self._take()
+        if blobs or files:
+            storage.save_dedup(self.store, self.move_id, blobs, files)
+
+def restore_independent(move_id: int, path: str):
+    """
+    After a rollback put a move's data back at path: give each of its deduplicated
+    files its own copy again, forget them, and delete blobs no file uses any more.
+    """
+    for rel, _, _ in storage.get_dedup_files(move_id):
+        f = os.path.join(path, rel)
+        try:
+            if os.stat(f).st_nlink > 1: # A same-drive rollback renamed the links back
+                tmp = f + ".dedup"
+                shutil.copy2(f, tmp)
+                _replace(tmp, f)
+        except OSError as e:
+            log.warning(f"Could not unshare {f}: {e}")
+    for store, digest in storage.release_dedup(move_id):
+        blob = blob_path(store, digest)
+        try:
+            if os.stat(blob).st_nlink == 1: # Only the store still has it
+                os.remove(blob)
+        except OSError:
+            pass
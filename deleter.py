@@ -0,0 +1,224 @@
+import os
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from copier import PROGRESS_INTERVAL, remove_file, remove_link
+from logger import get_logger
+from rules import entry_is_junction, is_junction
+
+log = get_logger("deleter")
+
+DEFAULT_DELETE_WORKERS = 8
+DELETE_BATCH = 256 # Files unlinked per task, so one huge folder is spread over the threads
+RETRY_ROUNDS = 3 # Passes over entries that could not be removed (locked files)...
+RETRY_DELAY = 0.5 # ...the first after this many seconds, each later one twice as long
+
+@dataclass
+class DeleteStats:
+    files: int = 0
+    dirs: int = 0
+    links: int = 0
+    bytes_freed: int = 0 # Sizes of the files actually removed; a file with other hardlinks frees nothing
+    retried: int = 0 # Entries only removed by a retry pass
+    failures: List[Tuple[str, str]] = field(default_factory=list) # (path, error) still there at the end
+
+    @property
+    def complete(self) -> bool:
+        return not self.failures
+
+class _Dir:
+    __slots__ = ("path", "parent", "pending")
+
+    def __init__(self, path: str, parent: Optional["_Dir"]):
+        self.path = path
+        self.parent = parent
+        self.pending = 1 # Its own listing; +1 per subfolder and per extra file batch
+
+class _Deleter:
+    """
+    One delete_tree run. Folders are listed by pool tasks, their files unlinked in
+    DELETE_BATCH batches, and a folder is removed as soon as everything under it is
+    (pending drops to 0), then its parent is checked: bottom-up, no second walk.
+    """
+
+    def __init__(self, workers: int, progress: Optional[Callable[[DeleteStats], None]]):
+        self.workers = workers
+        self.pool = None
+        self.lock = threading.Lock()
+        self.stats = DeleteStats()
+        self.retry: Dict[str, Tuple[int, str]] = {} # path -> (bytes it frees, 'file' | 'link' | 'dir')
+        self.errors: Dict[str, str] = {} # path -> last error
+        self.finished = threading.Event()
+        self.progress = progress
+        self._last_progress = 0.0
+
+    def run(self, root: str) -> DeleteStats:
+        self.pool = ThreadPoolExecutor(max_workers=max(1, self.workers), thread_name_prefix="delete")
+        try:
+            self.pool.submit(self._clear, _Dir(root, None))
+            self.finished.wait()
+        finally:
+            self.pool.shutdown()
+        return self.finish()
+
+    def run_single(self, path: str, size: int, kind: str) -> DeleteStats:
+        try:
+            self._remove(path, size, kind)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self._defer(path, size, kind, e)
+        return self.finish()
+
+    def finish(self) -> DeleteStats:
+        self._retry()
+        if self.stats.failures:
+            path, error = self.stats.failures[0]
+            log.warning(f"{len(self.stats.failures)} entries could not be deleted, e.g. {path}: {error}")
+        self._report(force=True)
+        return self.stats
+
+    def _report(self, force: bool = False):
+        if self.progress is None:
+            return
+        now = time.monotonic()
+        if force or now - self._last_progress >= PROGRESS_INTERVAL:
+            self._last_progress = now
+            self.progress(self.stats)
+
+    def _defer(self, path: str, size: int, kind: str, error: OSError):
+        with self.lock:
+            self.retry[path] = (size, kind)
+            self.errors[path] = str(error)
+
+    def _clear(self, node: _Dir):
+        files, links = [], []
+        try:
+            with os.scandir(node.path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_symlink() or (entry.is_dir(follow_symlinks=False) and entry_is_junction(entry)):
+                            links.append(entry.path)
+                        elif entry.is_dir(follow_symlinks=False):
+                            child = _Dir(entry.path, node)
+                            with self.lock:
+                                node.pending += 1
+                            self.pool.submit(self._clear, child)
+                        else:
+                            st = entry.stat(follow_symlinks=False)
+                            files.append((entry.path, st.st_size if st.st_nlink <= 1 else 0))
+                    except OSError as e:
+                        self._defer(entry.path, 0, "file", e)
+        except OSError as e:
+            self._defer(node.path, 0, "dir", e)
+        finally:
+            batches = [files[i:i + DELETE_BATCH] for i in range(0, len(files), DELETE_BATCH)]
+            with self.lock:
+                node.pending += max(0, len(batches) - 1)
+            for batch in batches[1:]:
+                self.pool.submit(self._unlink_batch, node, batch)
+            self._unlink_batch(node, batches[0] if batches else [], links)
+
+    def _unlink_batch(self, node: _Dir, batch: List[Tuple[str, int]], links: List[str] = ()):
+        files = freed = removed_links = 0
+        try:
+            for path, size in batch:
+                try:
+                    remove_file(path)
+                    files += 1
+                    freed += size
+                except FileNotFoundError:
+                    pass # Someone else removed it; it frees nothing we did
+                except OSError as e:
+                    self._defer(path, size, "file", e)
+            for path in links:
+                try:
+                    remove_link(path)
+                    removed_links += 1
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    self._defer(path, 0, "link", e)
+            with self.lock:
+                self.stats.files += files
+                self.stats.bytes_freed += freed
+                self.stats.links += removed_links
+            self._report()
+        finally:
+            self._release(node)
+
+    def _release(self, node: _Dir):
+        # Walk up while each folder has nothing left pending
+        while True:
+            with self.lock:
+                node.pending -= 1
+                if node.pending:
+                    return
+            try:
+                os.rmdir(node.path)
+                with self.lock:
+                    self.stats.dirs += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self._defer(node.path, 0, "dir", e) # Something below is still there (or the folder is locked)
+            if node.parent is None:
+                self.finished.set()
+                return
+            node = node.parent
+
+    def _remove(self, path: str, size: int, kind: str):
+        # Single-threaded use only (retries), hence no lock
+        if kind == "dir":
+            os.rmdir(path)
+            self.stats.dirs += 1
+        elif kind == "link":
+            remove_link(path)
+            self.stats.links += 1
+        else:
+            remove_file(path)
+            self.stats.files += 1
+            self.stats.bytes_freed += size
+
+    def _retry(self):
+        """Retry what failed, files and links before folders, deepest folders first."""
+        for attempt in range(RETRY_ROUNDS):
+            if not self.retry:
+                break
+            time.sleep(RETRY_DELAY * 2 ** attempt)
+            todo = sorted(self.retry.items(), key=lambda r: (r[1][1] == "dir", -r[0].count(os.sep)))
+            self.retry = {}
+            for path, (size, kind) in todo:
+                try:
+                    self._remove(path, size, kind)
+                    self.stats.retried += 1
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    self.retry[path] = (size, kind)
+                    self.errors[path] = str(e)
+        self.stats.failures = [(path, self.errors[path]) for path in self.retry]
+
+def delete_tree(path: str, workers: int = DEFAULT_DELETE_WORKERS,
+                progress: Optional[Callable[[DeleteStats], None]] = None) -> DeleteStats:
+    """
+    Delete path (a folder with everything under it, a file, or a link) and count
+    what was actually freed. Files are unlinked by `workers` threads and folders
+    removed bottom-up as they empty. Read-only files are made writable; entries
+    that still can't go (in use) are retried RETRY_ROUNDS times, and whatever is
+    left ends up in stats.failures instead of stopping the rest of the delete.
+    Links and junctions are removed, never followed.
+    progress(DeleteStats) is called periodically from the worker threads.
+    """
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return DeleteStats()
+    if stat.S_ISLNK(st.st_mode) or is_junction(path):
+        return _Deleter(1, progress).run_single(path, 0, "link")
+    if not stat.S_ISDIR(st.st_mode):
+        return _Deleter(1, progress).run_single(path, st.st_size if st.st_nlink <= 1 else 0, "file")
+    return _Deleter(workers, progress).run(path)
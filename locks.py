@@ -0,0 +1,163 @@
+import os
+import sys
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+from logger import get_logger
+from rules import entry_is_junction
+
+log = get_logger("locks")
+
+RM_CHUNK = 1000 # Files registered per Restart Manager query
+
+@dataclass(frozen=True)
+class FileHolder:
+    pid: int
+    process: str # Executable / application name
+    path: str # File (or folder) it holds under the checked tree; the tree itself if the backend can't tell
+
+    def __str__(self):
+        return f"{self.process} (PID {self.pid})"
+
+def _under(path: str, root: str, prefix: str) -> bool:
+    return path == root or path.startswith(prefix)
+
+def proc_holders(root: str) -> List[FileHolder]:
+    """
+    Linux backend: every process whose open descriptors (/proc/<pid>/fd) or working
+    directory point under root. Processes we may not inspect are skipped.
+    """
+    root = os.path.realpath(root)
+    prefix = os.path.join(root, "")
+    holders = []
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        base = os.path.join("/proc", pid)
+        try:
+            fds = os.listdir(os.path.join(base, "fd"))
+        except OSError:
+            continue # Gone, or not ours to look at
+        held = set()
+        for link in [os.path.join(base, "fd", fd) for fd in fds] + [os.path.join(base, "cwd")]:
+            try:
+                target = os.readlink(link)
+            except OSError:
+                continue
+            if _under(target, root, prefix):
+                held.add(target)
+        if held:
+            try:
+                with open(os.path.join(base, "comm")) as f:
+                    name = f.read().strip()
+            except OSError:
+                name = "?"
+            holders.extend(FileHolder(int(pid), name, path) for path in sorted(held))
+    return holders
+
+def _iter_files(root: str) -> Iterator[str]:
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_symlink() or entry_is_junction(entry):
+                        continue # Not part of the tree; the move recreates the link
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        yield entry.path
+        except OSError:
+            continue
+
+def restart_manager_holders(root: str) -> List[FileHolder]:
+    """
+    Windows backend: asks the Restart Manager which processes use the files under
+    root, RM_CHUNK files per query. It names processes, not files, so path is the
+    first file of the chunk a process was found in.
+    """
+    import ctypes
+    from ctypes import wintypes
+
+    class RM_UNIQUE_PROCESS(ctypes.Structure):
+        _fields_ = [("dwProcessId", wintypes.DWORD), ("ProcessStartTime", wintypes.FILETIME)]
+
+    class RM_PROCESS_INFO(ctypes.Structure):
+        _fields_ = [("Process", RM_UNIQUE_PROCESS),
+                    ("strAppName", wintypes.WCHAR * 256), # CCH_RM_MAX_APP_NAME + 1
+                    ("strServiceShortName", wintypes.WCHAR * 64), # CCH_RM_MAX_SVC_NAME + 1
+                    ("ApplicationType", ctypes.c_int),
+                    ("AppStatus", wintypes.ULONG),
+                    ("TSSessionId", wintypes.DWORD),
+                    ("bRestartable", wintypes.BOOL)]
+
+    ERROR_MORE_DATA = 234
+    rm = ctypes.WinDLL("rstrtmgr")
+    holders: Dict[int, FileHolder] = {}
+
+    def query(files: List[str]):
+        session = wintypes.DWORD()
+        key = ctypes.create_unicode_buffer(33) # CCH_RM_SESSION_KEY + 1
+        if rm.RmStartSession(ctypes.byref(session), 0, key):
+            raise OSError("RmStartSession failed")
+        try:
+            names = (wintypes.LPCWSTR * len(files))(*files)
+            if rm.RmRegisterResources(session, len(files), names, 0, None, 0, None):
+                raise OSError("RmRegisterResources failed")
+            needed, count, reasons = wintypes.UINT(0), wintypes.UINT(0), wintypes.DWORD()
+            infos = None
+            rc = rm.RmGetList(session, ctypes.byref(needed), ctypes.byref(count), None, ctypes.byref(reasons))
+            while rc == ERROR_MORE_DATA: # Processes can appear between the two calls
+                infos = (RM_PROCESS_INFO * needed.value)()
+                count.value = needed.value
+                rc = rm.RmGetList(session, ctypes.byref(needed), ctypes.byref(count), infos, ctypes.byref(reasons))
+            if rc:
+                raise OSError(f"RmGetList failed ({rc})")
+            for info in (infos[:count.value] if infos is not None else []):
+                pid = info.Process.dwProcessId
+                holders.setdefault(pid, FileHolder(pid, info.strAppName or info.strServiceShortName, files[0]))
+        finally:
+            rm.RmEndSession(session)
+
+    chunk = []
+    for path in _iter_files(root):
+        chunk.append(path)
+        if len(chunk) >= RM_CHUNK:
+            query(chunk)
+            chunk = []
+    if chunk:
+        query(chunk)
+    return list(holders.values())
+
+# Interchangeable ways to find who holds files open; default_lock_backend picks one
+LOCK_BACKENDS: Dict[str, Callable[[str], List[FileHolder]]] = {
+    "proc": proc_holders,
+    "restart_manager": restart_manager_holders,
+}
+
+def default_lock_backend() -> Optional[str]:
+    if os.name == "nt":
+        return "restart_manager"
+    if sys.platform.startswith("linux") and os.path.isdir("/proc/self/fd"):
+        return "proc"
+    return None
+
+def find_holders(root: str, backend: Optional[str] = None) -> List[FileHolder]:
+    """
+    Processes holding files under root open (one entry per process and path).
+    Empty if nothing is held, or if the platform has no backend or the backend
+    fails: the move itself still catches files in use, only later.
+    """
+    name = backend or default_lock_backend()
+    if name is None:
+        return []
+    try:
+        return LOCK_BACKENDS[name](root)
+    except Exception as e:
+        log.warning(f"Locked-file check ({name}) failed for {root}: {e}")
+        return []
+
+def describe_holders(holders: List[FileHolder], limit: int = 5) -> str:
+    """'chrome.exe (PID 412), Steam (PID 88) +2 more' - each process once."""
+    procs = list(dict.fromkeys(str(h) for h in holders))
+    more = f" +{len(procs) - limit} more" if len(procs) > limit else ""
+    return ", ".join(procs[:limit]) + more
@@ -8,6 +8,8 @@ class AppItem:
     size_gb: float
     type: str  # 'AppData', 'Program Files', 'User', etc.
     source: str = 'registry'  # 'registry' or 'scan'
+    size_is_lower_bound: bool = False  # True if sizing was cut short by a scan budget
+    is_junction: Optional[bool] = None  # From the scanner's lstat data; None = not checked
     
     @property
     def key(self):
@@ -31,6 +33,8 @@ class FolderItem:
     path: str
     size_gb: float
     source: str = 'scan'
+    size_is_lower_bound: bool = False  # True if sizing was cut short by a scan budget
+    is_junction: Optional[bool] = None  # From the scanner's lstat data; None = not checked
 
     @property
     def name(self):
@@ -1,14 +1,32 @@
 import subprocess
 import os
 import shutil
+import threading
+import time
 from pathlib import Path
+from typing import Callable, List, Optional
 from models import AppItem, FolderItem
-from rules import classify_item
+from rules import classify_item, is_junction
 from storage import storage
+from sizing import size_index
+from config import cfg
+from copier import CopyError, ProgressMeter, TransferProgress, Verifier, move_tree
+from locks import FileHolder, describe_holders, find_holders
+from dedup import DedupStore, restore_independent
+
+GB = 1024 ** 3
 
 class MoverError(Exception):
     pass
 
+class LockedFilesError(MoverError):
+    """Files under the source are open in other processes; nothing was copied."""
+    def __init__(self, path: str, holders: List[FileHolder]):
+        self.path = path
+        self.holders = holders
+        super().__init__(f"Files in {path} are in use by {describe_holders(holders)}. "
+                         f"Close the application (check System Tray) and try again.")
+
 def run_command(cmd_args, shell=True):
     """Run a system command and return output. Raises MoverError on failure."""
     try:
@@ -27,40 +45,14 @@ def run_command(cmd_args, shell=True):
     except Exception as e:
         raise MoverError(f"Command execution failed: {e}")
 
-def move_item(item: AppItem | FolderItem, target_root: str):
-    """Move an item to target_root and link back."""
-    
-    # 1. Safety Check (Redundant but necessary)
-    classification = classify_item(item)
-    if classification.category == "FORBIDDEN":
-        raise MoverError(f"Safety Block: {classification.reason}")
-    
-    source_path = os.path.normpath(item.path)
-    if not os.path.exists(source_path):
-        raise MoverError(f"Source not found: {source_path}")
-
-    # Determine target path
-    # Preserve folder name
-    folder_name = os.path.basename(source_path)
-    target_path = os.path.join(target_root, folder_name)
-    target_path = os.path.normpath(target_path)
-
-    # Collision Handling
-    if os.path.exists(target_path):
-        # Auto-rename if target exists and is not empty
-        if os.listdir(target_path):
-            base_name = folder_name
-            counter = 1
-            while os.path.exists(target_path) and os.listdir(target_path):
-                new_name = f"{base_name}_{counter}"
-                target_path = os.path.join(target_root, new_name)
-                counter += 1
-            print(f"Target Collision: Renamed to {target_path}")
-
-    # Log start (optional, we log success at end)
-    print(f"Moving {source_path} -> {target_path}")
-
-    # 2. Robocopy Move
+def robocopy_move(source_path: str, target_path: str, label: str = "Robocopy",
+                  meter: Optional[ProgressMeter] = None, journal=None, verifier: Optional[Verifier] = None,
+                  dedup: Optional[DedupStore] = None):
+    """
+    Move a tree with robocopy (Windows only). No byte-level progress; meter only sees the end.
+    No journal either: robocopy skips files it already copied when run again.
+    No verifier: robocopy deletes each source file itself. No dedup either.
+    """
     # /E = recursive, including empty
     # /COPYALL = copy info, timestamps, permissions
     # /MOVE = move files AND dirs (delete from source)
@@ -82,13 +74,269 @@ def move_item(item: AppItem | FolderItem, target_root: str):
     
     # Robocopy return codes: < 8 is success
     if result.returncode >= 8:
-         raise MoverError(f"Robocopy failed (Code {result.returncode}): {result.stdout}\n{result.stderr}")
-         
+         raise MoverError(f"{label} failed (Code {result.returncode}): {result.stdout}\n{result.stderr}")
+
+def native_move(source_path: str, target_path: str, label: str = "Copy",
+                meter: Optional[ProgressMeter] = None, journal=None, verifier: Optional[Verifier] = None,
+                dedup: Optional[DedupStore] = None):
+    """Move a tree with the built-in parallel copy engine (see copier.py)."""
+    try:
+        stats = move_tree(source_path, target_path, workers=cfg.copy_workers, progress=meter, journal=journal,
+                          verify=verifier or Verifier(cfg.verify_level), dedup=dedup)
+    except CopyError as e:
+        raise MoverError(f"{label} failed: {e}")
+    print(f"Copied {stats.files} files ({stats.bytes / 1024**3:.2f} GB)")
+    if dedup is not None and dedup.linked_files:
+        print(f"Dedup: {dedup.linked_files} files linked to existing copies, {dedup.saved_bytes / 1024**3:.2f} GB saved")
+
+# Interchangeable ways to move a directory tree; cfg.copy_backend picks one
+BACKENDS = {
+    "native": native_move,
+    "robocopy": robocopy_move,
+}
+
+class MoveJournal:
+    """
+    Per-file checkpoint of a move, kept in storage (move_files) so an interrupted
+    move can be resumed, plus the hash manifest of verified files (move_manifest).
+    Plugs into copier.copy_tree. Files are marked done in batches; a file done just
+    before a crash may be copied again, never skipped wrongly.
+    """
+    FLUSH_FILES = 500
+    FLUSH_SECONDS = 1.0
+
+    def __init__(self, move_id: int):
+        self.move_id = move_id
+        self._done = storage.get_done_files(move_id)
+        self._pending = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def plan(self, files: list):
+        storage.save_move_plan(self.move_id, files)
+
+    def is_done(self, rel: str, size: int, mtime: int) -> bool:
+        # Changed since it was copied? Then it is not done.
+        return self._done.get(rel) == (size, mtime)
+
+    def done(self, rel: str, size: int, mtime: int, digest: Optional[str] = None):
+        with self._lock:
+            self._pending.append((rel, size, mtime, digest))
+            if len(self._pending) < self.FLUSH_FILES and time.monotonic() - self._last_flush < self.FLUSH_SECONDS:
+                return
+            batch, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+            storage.mark_files_done(self.move_id, batch)
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            storage.mark_files_done(self.move_id, batch)
+
+def _existing_ancestor(path: str) -> str:
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+def device_of(path: str) -> Optional[int]:
+    """st_dev of path, or of the folder it would be created in. None if unknown."""
+    try:
+        return os.stat(_existing_ancestor(path)).st_dev
+    except OSError:
+        return None
+
+def free_bytes_of(path: str) -> Optional[int]:
+    """Free space on the volume path is (or would be created) on. None if unknown."""
+    try:
+        return shutil.disk_usage(_existing_ancestor(path)).free
+    except OSError:
+        return None
+
+def same_device(source_path: str, target_path: str) -> bool:
+    """True if target_path (or the folder it will be created in) is on the same volume as source_path."""
+    source_dev = device_of(source_path)
+    return source_dev is not None and source_dev == device_of(target_path)
+
+def rename_move(source_path: str, target_path: str) -> bool:
+    """
+    Same-volume fast path: one directory rename, instant whatever the size.
+    Returns False (nothing changed) if the rename is refused, e.g. files in use on Windows.
+    """
+    try:
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        if os.path.isdir(target_path) and not os.listdir(target_path):
+            os.rmdir(target_path) # Windows won't rename onto an existing (even empty) folder
+        os.rename(source_path, target_path)
+        return True
+    except OSError as e:
+        print(f"Rename failed ({e}), falling back to copy")
+        return False
+
+def transfer(source_path: str, target_path: str, label: str = "Copy",
+             progress: Optional[Callable[[TransferProgress], None]] = None, expected_bytes: int = 0,
+             journal: Optional[MoveJournal] = None, verifier: Optional[Verifier] = None,
+             dedup: Optional[DedupStore] = None):
+    """
+    Move source_path to target_path: a rename when both are on the same volume,
+    otherwise copy-then-delete with the configured backend.
+    progress(TransferProgress) is called periodically (throttled) and once at the end.
+    journal records copied files so the copy can be resumed (see resume_move).
+    verifier checks each copy before its source is deleted (default: cfg.verify_level).
+    dedup hardlinks copies to identical content already on the target (native backend).
+    Returns (method, final TransferProgress); method is "rename" or the copy backend used.
+    """
+    meter = ProgressMeter(expected_bytes, progress)
+    if same_device(source_path, target_path) and rename_move(source_path, target_path):
+        method = "rename"
+        meter.add(expected_bytes)
+    else:
+        method = cfg.copy_backend if cfg.copy_backend in BACKENDS else "native"
+        try:
+            BACKENDS[method](source_path, target_path, label, meter, journal, verifier, dedup)
+        finally:
+            if journal is not None:
+                journal.flush()
+            if dedup is not None:
+                dedup.flush()
+    meter.finish()
+    return method, meter.snapshot()
+
+def _occupied(path: str, taken: set) -> bool:
+    return os.path.normcase(path) in taken or (os.path.exists(path) and bool(os.listdir(path)))
+
+def target_path_for(source_path: str, target_root: str, taken: Optional[set] = None) -> str:
+    """
+    Where source_path goes under target_root: same folder name, or Name_1, Name_2...
+    if that exists and is not empty. taken holds normcased paths already claimed
+    by other items of the same plan (see planner.plan_moves).
+    """
+    taken = taken or set()
+
+    # Preserve folder name
+    folder_name = os.path.basename(source_path)
+    target_path = os.path.normpath(os.path.join(target_root, folder_name))
+    counter = 1
+    while _occupied(target_path, taken):
+        target_path = os.path.normpath(os.path.join(target_root, f"{folder_name}_{counter}"))
+        counter += 1
+    return target_path
+
+# Targets of moves in progress: nothing is written there yet when a concurrent move picks its name
+_reserved_targets = set()
+_reserved_lock = threading.Lock()
+
+def reserve_target(source_path: str, target_root: str, wanted: Optional[str] = None) -> str:
+    """
+    Claim a target path for this process's moves: wanted (the planner's choice) if it
+    is still free, else the next free name from target_path_for. release_target when done.
+    """
+    with _reserved_lock:
+        if wanted and not _occupied(os.path.normpath(wanted), _reserved_targets):
+            target_path = os.path.normpath(wanted)
+        else:
+            target_path = target_path_for(source_path, target_root, _reserved_targets)
+        _reserved_targets.add(os.path.normcase(target_path))
+    return target_path
+
+def release_target(target_path: str):
+    with _reserved_lock:
+        _reserved_targets.discard(os.path.normcase(target_path))
+
+def check_locks(source_path: str):
+    """Raise LockedFilesError if another process holds files under source_path (unless cfg.locked_files is "ignore")."""
+    if cfg.locked_files == "ignore":
+        return
+    holders = find_holders(source_path)
+    if holders:
+        raise LockedFilesError(source_path, holders)
+
+def move_item(item: AppItem | FolderItem, target_root: str,
+              progress: Optional[Callable[[TransferProgress], None]] = None, verify: Optional[str] = None,
+              target_path: Optional[str] = None):
+    """
+    Move an item to target_root and link back.
+    progress gets bytes/files copied, rate and ETA (against the scanned size_gb) while copying.
+    verify is the copier.VERIFY_LEVELS level ("fast", "sampled", "full"); default cfg.verify_level.
+    target_path is the planner's collision-free target; it is reserved (see reserve_target)
+    so concurrent moves never share a target folder.
+    """
+    
+    # 1. Safety Check (Redundant but necessary)
+    # Fresh junction check: the scanner's lstat data may be stale by now
+    classification = classify_item(item, junction=is_junction(item.path) if item.path else None)
+    if classification.category == "FORBIDDEN":
+        raise MoverError(f"Safety Block: {classification.reason}")
+    
+    source_path = os.path.normpath(item.path)
+    if not os.path.exists(source_path):
+        raise MoverError(f"Source not found: {source_path}")
+
+    # Picking up where an interrupted move of this folder left off beats starting over in Name_1
+    for record in storage.get_interrupted_moves():
+        if os.path.normcase(record[1]) == os.path.normcase(source_path):
+            print(f"Resuming interrupted move #{record[0]}")
+            return resume_move(record[0], progress, verify)
+
+    target_path = reserve_target(source_path, target_root, target_path)
+    try:
+        _move_to(item, classification.category, source_path, target_root, target_path, progress, verify)
+    finally:
+        release_target(target_path)
+    return True
+
+def _move_to(item: AppItem | FolderItem, category: str, source_path: str, target_root: str, target_path: str,
+             progress: Optional[Callable[[TransferProgress], None]], verify: Optional[str]):
+    if os.path.basename(target_path) != os.path.basename(source_path):
+        print(f"Target Collision: Renamed to {target_path}")
+
+    # Files in use would otherwise only show up after everything was copied
+    check_locks(source_path)
+
+    # Log start as IN_PROGRESS; the file journal lets an interrupted move be resumed
+    print(f"Moving {source_path} -> {target_path}")
+    move_id = storage.log_move(source_path, target_path, "IN_PROGRESS", category)
+
+    # 2. Move (rename on the same volume, else copy everything and delete the source)
+    verifier = Verifier(verify or cfg.verify_level)
+    try:
+        _timed_transfer(move_id, verifier, source_path, target_path, progress=progress,
+                        expected_bytes=int(item.size_gb * GB), journal=MoveJournal(move_id),
+                        dedup=DedupStore(target_root, move_id) if cfg.dedup else None)
+        _link_back(source_path, target_path)
+    except Exception:
+        storage.update_status(move_id, "INTERRUPTED")
+        size_index.invalidate(source_path) # Partly moved
+        raise
+
+    # 5. Log Success
+    _finish_move(move_id)
+    size_index.invalidate(source_path)
+
+def _timed_transfer(move_id: int, verifier: Verifier, source_path: str, target_path: str, label: str = "Copy", **kwargs):
+    """transfer(), recording how long it took and what verification cost for this move."""
+    start = time.perf_counter()
+    try:
+        method, done = transfer(source_path, target_path, label, verifier=verifier, **kwargs)
+        # Calibrates planner.ThroughputModel
+        storage.log_transfer(move_id, method, verifier.level, done.files_done, done.bytes_done,
+                             time.perf_counter() - start)
+    finally:
+        if verifier.files:
+            storage.log_verify_cost(move_id, verifier.level, verifier.files, verifier.bytes_read,
+                                    verifier.seconds, time.perf_counter() - start)
+
+def _link_back(source_path: str, target_path: str):
+    """Check the data landed in target_path and put a junction at source_path pointing to it."""
     # 3. Verify
     if not os.path.exists(target_path) or not os.listdir(target_path):
         raise MoverError("Move appeared to finish but target is empty or missing.")
         
-    # Check if source is truly gone (Robocopy /MOVE should do it)
+    # Check if source is truly gone (the move should have deleted it)
     if os.path.exists(source_path):
         # Sometimes root folder is left if it was locked, but empty
         try:
@@ -108,16 +356,66 @@ def move_item(item: AppItem | FolderItem, target_root: str):
         # Log this strictly.
         raise MoverError(f"Junction creation failed: {link_res.stdout} {link_res.stderr}")
 
-    # 5. Log Success
-    storage.log_move(source_path, target_path, "OK", classification.category)
+def _finish_move(move_id: int):
+    storage.update_status(move_id, "OK")
+    storage.clear_move_journal(move_id)
+
+def resume_move(move_id: int, progress: Optional[Callable[[TransferProgress], None]] = None,
+                verify: Optional[str] = None):
+    """
+    Finish an interrupted move: copy only the files its journal has not seen copied
+    (plus any that changed since), then delete the source, verify and link.
+    """
+    record = storage.get_move(move_id)
+    if not record:
+        raise MoverError("Move ID not found")
+    row_id, source_path, target_path, _, status, _ = record
+    if status not in ("INTERRUPTED", "IN_PROGRESS"):
+        raise MoverError("Only interrupted moves can be resumed")
+
+    if is_junction(source_path):
+        # Linked before the interruption; only the bookkeeping is missing
+        _finish_move(row_id)
+        return True
+
+    if os.path.exists(source_path):
+        check_locks(source_path)
+    storage.update_status(row_id, "IN_PROGRESS")
+    try:
+        if os.path.exists(source_path):
+            files_done, files_total, bytes_done, bytes_total = storage.get_move_progress(row_id)
+            print(f"Resuming {source_path} -> {target_path} ({files_done}/{files_total} files already copied)")
+            _timed_transfer(row_id, Verifier(verify or cfg.verify_level), source_path, target_path, "Resume copy",
+                            progress=progress, expected_bytes=bytes_total - bytes_done, journal=MoveJournal(row_id),
+                            dedup=DedupStore(os.path.dirname(target_path), row_id) if cfg.dedup else None)
+        _link_back(source_path, target_path)
+    except Exception:
+        storage.update_status(row_id, "INTERRUPTED")
+        size_index.invalidate(source_path) # Partly moved
+        raise
+
+    _finish_move(row_id)
+    size_index.invalidate(source_path)
     return True
 
-def rollback_move(move_id: int):
+def rollback_move(move_id: int, progress: Optional[Callable[[TransferProgress], None]] = None):
     """Rollback a move by ID."""
     record = storage.get_move(move_id)
     if not record:
         raise MoverError("Move ID not found")
-        
+    undo_move(record, progress)
+
+    # 4. Update DB
+    storage.update_status(move_id, "ROLLED_BACK")
+    return True
+
+def undo_move(record: tuple, progress: Optional[Callable[[TransferProgress], None]] = None,
+              expected_bytes: int = 0):
+    """
+    Put the data of a moves row back where it came from (remove the junction, move back,
+    clean up the target). Leaves the row's status to the caller, so a batch can record
+    all results at once (see scheduler.rollback_moves).
+    """
     # Unpack record (id, src, tgt, time, status, output...)
     # Schema: id, source_path, target_path, timestamp, status, category
     row_id, source_path, target_path, _, status, _ = record
@@ -139,20 +437,19 @@ def rollback_move(move_id: int):
          except OSError as e:
              raise MoverError(f"Failed to remove junction '{source_path}': {e}. Is it a real folder?")
     
-    # 2. Move Back
-    robocopy_cmd = f'robocopy "{target_path}" "{source_path}" /E /COPYALL /MOVE /R:3 /W:1'
-    result = run_command(robocopy_cmd)
-    
-    if result.returncode >= 8:
-        raise MoverError(f"Rollback copy failed: {result.stdout}")
-        
+    # 2. Move Back (a rename when the target is on the source's drive)
+    try:
+        transfer(target_path, source_path, "Rollback copy", progress, expected_bytes)
+        # Deduplicated files must not stay hardlinked to the store (or each other)
+        restore_independent(row_id, source_path)
+    except Exception:
+        size_index.invalidate(source_path) # Partly back
+        raise
+    size_index.invalidate(source_path)
+
     # 3. Cleanup Target
     if os.path.exists(target_path):
         try:
             os.rmdir(target_path)
         except OSError:
              pass # Might be minor leftovers
-             
-    # 4. Update DB
-    storage.update_status(row_id, "ROLLED_BACK")
-    return True
@@ -0,0 +1,265 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from config import cfg
+from copier import scan_tree
+from locks import FileHolder, find_holders
+from logger import get_logger
+from models import AppItem, FolderItem
+from mover import GB, device_of, free_bytes_of, same_device, target_path_for
+from rules import classify_item, is_junction
+from storage import storage
+
+log = get_logger("planner")
+
+class ThroughputModel:
+    """
+    Move duration as seconds = files * per_file + bytes / bytes_per_sec.
+
+    Fitted (least squares) on the copies recorded in storage.move_transfers, which
+    include verification, so the estimate matches what the user will wait for.
+    Defaults are used until MIN_SAMPLES copies have been recorded.
+    """
+    DEFAULT_BYTES_PER_SEC = 100 * 1024 ** 2
+    DEFAULT_PER_FILE = 0.002
+    MIN_SAMPLES = 3
+
+    def __init__(self, bytes_per_sec: float = DEFAULT_BYTES_PER_SEC, per_file: float = DEFAULT_PER_FILE,
+                 samples: int = 0):
+        self.bytes_per_sec = bytes_per_sec
+        self.per_file = per_file
+        self.samples = samples
+
+    @classmethod
+    def fit(cls, samples: List[Tuple[int, int, float]]) -> "ThroughputModel":
+        """Model from (files, bytes, seconds) samples; the defaults if there are too few."""
+        samples = [(f, b, s) for f, b, s in samples if b > 0 and s > 0]
+        if len(samples) < cls.MIN_SAMPLES:
+            return cls(samples=len(samples))
+        # Normal equations of seconds ~ x * files + y * bytes (no intercept)
+        ff = sum(f * f for f, _, _ in samples)
+        fb = sum(f * b for f, b, _ in samples)
+        bb = sum(b * b for _, b, _ in samples)
+        fs = sum(f * s for f, _, s in samples)
+        bs = sum(b * s for _, b, s in samples)
+        det = ff * bb - fb * fb
+        if det > 1e-9 * ff * bb:
+            per_file = (fs * bb - bs * fb) / det
+            per_byte = (bs * ff - fs * fb) / det
+            if per_file >= 0 and per_byte > 0:
+                return cls(1 / per_byte, per_file, len(samples))
+        # Collinear or a negative term: put all the time on the bytes
+        return cls(bb / bs, 0.0, len(samples))
+
+    @classmethod
+    def calibrate(cls, level: Optional[str] = None, root: Optional[str] = None,
+                  history: Optional[List[Tuple]] = None) -> "ThroughputModel":
+        """
+        Model fitted on recent copies, preferring those made to `root` (each drive has
+        its own speed) and at verify level `level` (default cfg.verify_level), when
+        there are enough of them.
+        """
+        level = level or cfg.verify_level
+        history = storage.get_transfer_history() if history is None else history
+        if root is not None:
+            prefix = os.path.normcase(os.path.join(os.path.normpath(root), ""))
+            on_root = [row for row in history if os.path.normcase(row[0]).startswith(prefix)]
+            if len(on_root) >= cls.MIN_SAMPLES:
+                history = on_root
+        same_level = [(f, b, s) for _, _, lvl, f, b, s in history if lvl == level]
+        if len(same_level) >= cls.MIN_SAMPLES:
+            return cls.fit(same_level)
+        return cls.fit([(f, b, s) for _, _, _, f, b, s in history])
+
+    def estimate(self, files: int, nbytes: int) -> float:
+        """Seconds to copy files/nbytes."""
+        return files * self.per_file + nbytes / self.bytes_per_sec
+
+@dataclass
+class ItemPlan:
+    item: AppItem | FolderItem
+    target_root: str = ""
+    target_path: str = ""
+    method: str = "copy" # 'copy', 'rename' (same volume) or 'resume' (interrupted move)
+    files: int = 0
+    bytes: int = 0
+    bytes_to_copy: int = 0 # What lands on the target; 0 for a rename, less for a resume
+    seconds: float = 0.0
+    collision: bool = False # Target name was taken; target_path is Name_N
+    blocked: Optional[str] = None # Why the item will not be moved at all
+    resume_of: Optional[int] = None # Interrupted move this one would finish
+    unreadable: int = 0 # Entries the dry run could not list (the move would fail on them)
+    holders: List[FileHolder] = field(default_factory=list) # Processes with files open under the source
+
+@dataclass
+class MovePlanReport:
+    target_roots: List[str]
+    items: List[ItemPlan] = field(default_factory=list)
+    free: Dict[str, Optional[int]] = field(default_factory=dict) # root -> free bytes, None if unknown
+    drives: Dict[str, object] = field(default_factory=dict) # root -> drive key; roots on one drive share its space
+    models: Dict[str, ThroughputModel] = field(default_factory=dict) # root -> its calibrated model
+    model: Optional[ThroughputModel] = None # Fitted on all recent copies
+
+    @property
+    def movable(self) -> List[ItemPlan]:
+        return [p for p in self.items if not p.blocked]
+
+    def required_by_root(self) -> Dict[str, int]:
+        """Bytes each root receives (roots that get nothing are left out)."""
+        need = {}
+        for p in self.movable:
+            if p.bytes_to_copy:
+                need[p.target_root] = need.get(p.target_root, 0) + p.bytes_to_copy
+        return need
+
+    @property
+    def required_bytes(self) -> int:
+        return sum(p.bytes_to_copy for p in self.movable)
+
+    def short_roots(self) -> List[str]:
+        """Roots whose drive does not have room for what is placed on it."""
+        need_by_drive: Dict[object, int] = {}
+        for root, need in self.required_by_root().items():
+            drive = self.drives.get(root, root)
+            need_by_drive[drive] = need_by_drive.get(drive, 0) + need
+        return [root for root, need in self.required_by_root().items()
+                if self.free.get(root) is not None and need_by_drive[self.drives.get(root, root)] > self.free[root]]
+
+    @property
+    def fits(self) -> bool:
+        return not self.short_roots()
+
+    @property
+    def seconds(self) -> float:
+        # Moves to one drive share its bandwidth and add up; different drives copy in parallel
+        by_drive: Dict[object, float] = {}
+        for p in self.movable:
+            drive = self.drives.get(p.target_root, p.target_root)
+            by_drive[drive] = by_drive.get(drive, 0.0) + p.seconds
+        return max(by_drive.values(), default=0.0)
+
+    @property
+    def collisions(self) -> List[ItemPlan]:
+        return [p for p in self.movable if p.collision]
+
+    @property
+    def locked(self) -> List[ItemPlan]:
+        return [p for p in self.movable if p.holders]
+
+    def summary(self) -> str:
+        movable = self.movable
+        text = (f"{len(movable)} items, {sum(p.files for p in movable):,} files, "
+                f"{sum(p.bytes for p in movable) / GB:.2f} GB")
+        needs = []
+        for root, need in self.required_by_root().items():
+            free = self.free.get(root)
+            needs.append(f"{need / GB:.2f} GB on {root}" + (f" ({free / GB:.2f} GB free)" if free is not None else ""))
+        return text + ("; needs " + ", ".join(needs) if needs else "; no copying needed")
+
+def place_items(plans: List[ItemPlan], roots: List[str], free: Dict[str, Optional[int]],
+                drives: Dict[str, object], models: Dict[str, ThroughputModel]):
+    """
+    Choose plan.target_root for every plan that has none yet (bin packing).
+
+    An item on the same drive as a root goes there: a rename costs no time or space.
+    Other items go largest first to the root where they would finish copying
+    earliest, given what is already queued on that drive and its own throughput
+    model, among roots with room left. So big items land on different drives and
+    copy in parallel, and a full drive stops receiving items. If nothing has room,
+    the root with the most space left is used (the report then does not fit).
+    """
+    left = {drives[r]: free[r] for r in roots}
+    queued = {drives[r]: 0.0 for r in roots}
+    for p in plans:
+        if p.target_root and drives.get(p.target_root) in left: # Resumes: placed already
+            drive = drives[p.target_root]
+            queued[drive] += p.seconds
+            if left[drive] is not None:
+                left[drive] -= p.bytes_to_copy
+
+    for p in sorted((p for p in plans if not p.target_root), key=lambda p: p.bytes, reverse=True):
+        source_drive = device_of(p.item.path)
+        local = [r for r in roots if source_drive is not None and drives[r] == source_drive]
+        if local:
+            p.target_root = local[0]
+            continue
+        roomy = [r for r in roots if left[drives[r]] is None or left[drives[r]] >= p.bytes]
+        if roomy:
+            p.target_root = min(roomy, key=lambda r: queued[drives[r]] + models[r].estimate(p.files, p.bytes))
+        else:
+            p.target_root = max(roots, key=lambda r: left[drives[r]])
+        drive = drives[p.target_root]
+        queued[drive] += models[p.target_root].estimate(p.files, p.bytes)
+        if left[drive] is not None:
+            left[drive] -= p.bytes
+
+def plan_moves(items: List[AppItem | FolderItem], target_roots: str | List[str],
+               model: Optional[ThroughputModel] = None, workers: Optional[int] = None) -> MovePlanReport:
+    """
+    Dry run of moving items to target_roots (one root or several): nothing is created or copied.
+
+    Walks every source like the copy would (exact files and bytes), finds files in use
+    (locks.find_holders, as move_item will before copying), spreads the items
+    over the roots (see place_items), checks each target drive's free space, resolves
+    target names the way move_item does (including collisions between items of this
+    plan) and estimates how long each move takes. model overrides the calibrated ones.
+    """
+    roots = [target_roots] if isinstance(target_roots, str) else list(target_roots)
+    history = storage.get_transfer_history()
+    report = MovePlanReport(roots, [ItemPlan(item) for item in items],
+                            model=model or ThroughputModel.calibrate(history=history))
+    for root in roots:
+        report.free[root] = free_bytes_of(root)
+        if report.free[root] is None:
+            log.warning(f"Could not read free space of {root}")
+        drive = device_of(root)
+        report.drives[root] = drive if drive is not None else os.path.normcase(root)
+        report.models[root] = model or ThroughputModel.calibrate(root=root, history=history)
+
+    interrupted = {os.path.normcase(r[1]): r for r in storage.get_interrupted_moves()}
+    for p in report.items:
+        source_path = os.path.normpath(p.item.path) if p.item.path else ""
+        classification = classify_item(p.item, junction=is_junction(source_path) if source_path else None)
+        if classification.category == "FORBIDDEN":
+            p.blocked = f"Safety Block: {classification.reason}"
+        elif not os.path.exists(source_path):
+            p.blocked = f"Source not found: {source_path}"
+        elif os.path.normcase(source_path) in interrupted:
+            # Finishes where it started, whatever the roots are now
+            record = interrupted[os.path.normcase(source_path)]
+            p.method, p.resume_of, p.target_path = "resume", record[0], record[2]
+            p.target_root = os.path.dirname(record[2])
+
+    def count(p: ItemPlan):
+        tree = scan_tree(p.item.path)
+        p.files, p.bytes, p.unreadable = len(tree.files), tree.total_bytes, len(tree.failures)
+        if cfg.locked_files != "ignore":
+            p.holders = find_holders(p.item.path)
+
+    todo = report.movable
+    with ThreadPoolExecutor(max_workers=max(1, min(workers or cfg.scan_workers, len(todo) or 1))) as pool:
+        list(pool.map(count, todo))
+
+    for p in todo:
+        if p.method == "resume":
+            files_done, _, bytes_done, _ = storage.get_move_progress(p.resume_of)
+            p.bytes_to_copy = max(0, p.bytes - bytes_done)
+            p.seconds = report.models.get(p.target_root, report.model).estimate(max(0, p.files - files_done), p.bytes_to_copy)
+
+    place_items(todo, roots, report.free, report.drives, report.models)
+
+    taken = {os.path.normcase(p.target_path) for p in todo if p.target_path}
+    for p in todo:
+        if p.method == "resume":
+            continue
+        source_path = os.path.normpath(p.item.path)
+        p.target_path = target_path_for(source_path, p.target_root, taken)
+        taken.add(os.path.normcase(p.target_path))
+        p.collision = os.path.basename(p.target_path) != os.path.basename(source_path)
+        if same_device(source_path, p.target_path):
+            p.method = "rename" # Instant, and takes no space
+            continue
+        p.bytes_to_copy = p.bytes
+        p.seconds = report.models[p.target_root].estimate(p.files, p.bytes)
+    return report
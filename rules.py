@@ -1,5 +1,8 @@
 import re
 import os
+import stat
+from functools import lru_cache
+from typing import Tuple
 from models import AppItem, FolderItem, ClassifiedItem
 
 # Hard-coded rules for FORBIDDEN paths
@@ -38,12 +41,139 @@ SAFE_PATTERNS = [
     # We will be conservative: If it looks like user data or standalone app content
 ]
 
+# A pattern that is a plain literal, optionally anchored with ^ (escapes only on punctuation)
+_LITERAL_RULE = re.compile(r"(\^?)((?:[^\\.^$*+?{}\[\]|()]|\\[^A-Za-z0-9])*)")
+
+def _trie_pattern(words: list) -> str:
+    """
+    Regex matching any of words, factored as a prefix trie: \\(?:a(?:md|vg)|intel)
+    instead of \\amd|\\avg|\\intel. re tries far fewer branches per position.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        if "" in node:
+            return "" # A shorter word already matches; longer ones add nothing to a search
+        alts = [re.escape(ch) + emit(child) for ch, child in sorted(node.items())]
+        return alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+
+    return emit(trie)
+
+class RuleMatcher:
+    """
+    FORBIDDEN_PATTERNS and SAFE_PATTERNS compiled once, instead of re.search per call.
+
+    Literal patterns (optionally anchored with ^) become str.startswith / substring
+    checks on the lowercased path, behind one combined prefix-trie regex so that a
+    path matching none of them costs a single search. Anything else stays a precompiled regex.
+    The literal shortcut is only used for ASCII paths, where str.lower() agrees
+    exactly with re.IGNORECASE; other paths use the regexes. Matching returns the
+    first pattern in list order, like the old loop.
+    """
+
+    def __init__(self, forbidden: list, safe: list):
+        self.forbidden = self._compile_set(forbidden)
+        self.safe = self._compile_set(safe)
+
+    @staticmethod
+    def _compile_set(patterns: list) -> tuple:
+        rules = []
+        for pattern in patterns:
+            m = _LITERAL_RULE.fullmatch(pattern)
+            literal = re.sub(r"\\(.)", r"\1", m.group(2)).lower() if m else None
+            if literal is not None and not literal.isascii():
+                literal = None
+            rules.append((pattern, bool(m and m.group(1)), literal, re.compile(pattern, re.IGNORECASE)))
+
+        anchored = [literal for _, a, literal, _ in rules if literal is not None and a]
+        floating = [literal for _, a, literal, _ in rules if literal is not None and not a]
+        alternatives = ([f"^{_trie_pattern(anchored)}"] if anchored else []) + ([_trie_pattern(floating)] if floating else [])
+        any_literal = re.compile("|".join(alternatives)) if alternatives else None
+        regex_only = [r for r in rules if r[2] is None]
+        any_pattern = re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE) if patterns else None
+        return rules, any_literal, regex_only, any_pattern
+
+    @staticmethod
+    def _first(compiled: tuple, path: str) -> str:
+        rules, any_literal, regex_only, any_pattern = compiled
+        if any_pattern is None:
+            return None
+        if path.isascii():
+            lower = path.lower()
+            if any_literal is None or not any_literal.search(lower):
+                # No literal rule can match; only the regex ones are left to try
+                rules = regex_only
+            for pattern, anchored, literal, regex in rules:
+                if literal is None:
+                    if regex.search(path):
+                        return pattern
+                elif lower.startswith(literal) if anchored else literal in lower:
+                    return pattern
+            return None
+        if not any_pattern.search(path):
+            return None
+        for pattern, _, _, regex in rules:
+            if regex.search(path):
+                return pattern
+        return None
+
+    def first_forbidden(self, path: str) -> str:
+        """First FORBIDDEN pattern matching path, or None."""
+        return self._first(self.forbidden, path)
+
+    def first_safe(self, path: str) -> str:
+        """First SAFE pattern matching path, or None."""
+        return self._first(self.safe, path)
+
+def compile_rules(forbidden: list = None, safe: list = None) -> RuleMatcher:
+    return RuleMatcher(FORBIDDEN_PATTERNS if forbidden is None else forbidden,
+                       SAFE_PATTERNS if safe is None else safe)
+
+def rules_version() -> int:
+    """Hash of the active rule set. Compiled matchers and memoized results are tied to it."""
+    return hash((tuple(FORBIDDEN_PATTERNS), tuple(SAFE_PATTERNS)))
+
+_matchers = {}
+
+def get_matcher(version: int = None) -> RuleMatcher:
+    """Matcher for the current rules, recompiled automatically when the pattern lists change."""
+    version = rules_version() if version is None else version
+    m = _matchers.get(version)
+    if m is None:
+        _matchers.clear()
+        m = _matchers[version] = compile_rules()
+    return m
+
+_isjunction = getattr(os.path, "isjunction", None) # Python 3.12+
+
+def junction_from_stat(st: os.stat_result) -> bool:
+    """Junction check on lstat data (e.g. DirEntry.stat(follow_symlinks=False)), no extra syscall."""
+    return getattr(st, "st_reparse_tag", 0) == stat.IO_REPARSE_TAG_MOUNT_POINT
+
+def entry_is_junction(entry: os.DirEntry) -> bool:
+    """Junction check on a scandir entry. Free on Windows, where DirEntry carries the lstat data."""
+    if hasattr(entry, "is_junction"):  # Python 3.12+
+        return entry.is_junction()
+    if os.name != "nt":
+        return False
+    try:
+        return junction_from_stat(entry.stat(follow_symlinks=False))
+    except OSError:
+        return False
+
 def is_junction(path: str) -> bool:
     """Check if path is a directory junction."""
     try:
-        if hasattr(os.path, "isjunction"):
-             return os.path.isjunction(path)
-        return False # Fallback if not supported (though we know it is on 3.13)
+        if _isjunction:
+             return _isjunction(path)
+        if os.name == "nt":
+            return junction_from_stat(os.lstat(path))
+        return False # No junctions outside Windows
     except:
         return False
 
@@ -58,9 +188,9 @@ def is_forbidden(path: str) -> str:
          # If scanning D, it's not forbidden but maybe 'SKIPPED'.
          pass
 
-    for pattern in FORBIDDEN_PATTERNS:
-        if re.search(pattern, norm_path, re.IGNORECASE):
-            return f"Matches forbidden pattern: {pattern}"
+    pattern = get_matcher().first_forbidden(norm_path)
+    if pattern:
+        return f"Matches forbidden pattern: {pattern}"
             
     # Explicit system check
     if "system32" in norm_path.lower():
@@ -68,19 +198,19 @@ def is_forbidden(path: str) -> str:
         
     return None
 
-def classify_item(item: AppItem | FolderItem) -> ClassifiedItem:
-    path = item.path
-    if not path:
-        return ClassifiedItem(item, "FORBIDDEN", "No path provided")
+CLASSIFY_CACHE_SIZE = 65536
 
+@lru_cache(maxsize=CLASSIFY_CACHE_SIZE)
+def _classify_path(path: str, junction: bool, version: int) -> Tuple[str, str]:
+    """(category, reason) for a normalized path. version only keys the memo on the rule set."""
     # 0. Check MOVED (Junction)
-    if is_junction(path):
-        return ClassifiedItem(item, "MOVED", "Already moved (Junction detected)")
+    if junction:
+        return "MOVED", "Already moved (Junction detected)"
 
     # 1. Check FORBIDDEN
     forbidden_reason = is_forbidden(path)
     if forbidden_reason:
-        return ClassifiedItem(item, "FORBIDDEN", forbidden_reason)
+        return "FORBIDDEN", forbidden_reason
 
     # 2. Check REINSTALL candidates
     # Apps in Program Files that are NOT forbidden are generally REINSTALL
@@ -99,19 +229,48 @@ def classify_item(item: AppItem | FolderItem) -> ClassifiedItem:
             # Check if it is strictly Microsoft
             if "microsoft" in cmd_lower and "visualstudio" not in cmd_lower and "vscode" not in cmd_lower:
                  # Be careful with AppData/Local/Microsoft
-                 return ClassifiedItem(item, "REINSTALL", "Microsoft AppData folder - high risk")
-            return ClassifiedItem(item, "SAFE", "User AppData folder")
+                 return "REINSTALL", "Microsoft AppData folder - high risk"
+            return "SAFE", "User AppData folder"
         
         # Other user folders like .minecraft, .vscode match here
         if os.path.basename(path).startswith("."):
-             return ClassifiedItem(item, "SAFE", "Dot-folder in User profile")
+             return "SAFE", "Dot-folder in User profile"
              
     # If it's a game in a known library path (simple heuristic)
     if "steamapps\\common" in cmd_lower:
-         return ClassifiedItem(item, "SAFE", "Steam Game folder")
+         return "SAFE", "Steam Game folder"
     
     if is_program_files:
-        return ClassifiedItem(item, "REINSTALL", "Installed in Program Files - Move might break shortcuts/registry")
+        return "REINSTALL", "Installed in Program Files - Move might break shortcuts/registry"
 
     # Default to REINSTALL if unsure
-    return ClassifiedItem(item, "REINSTALL", "Unknown category - Safer to reinstall")
+    return "REINSTALL", "Unknown category - Safer to reinstall"
+
+def classify_item(item: AppItem | FolderItem, junction: bool = None) -> ClassifiedItem:
+    """
+    Classify an item. Results are memoized on (normalized path, junction state, rule set).
+    Junction state comes from `junction` if given, else from the scanner's lstat data
+    on the item, else from a fresh check.
+    """
+    return _classify(item, junction, rules_version())
+
+def _classify(item, junction: bool, version: int) -> ClassifiedItem:
+    path = item.path
+    if not path:
+        return ClassifiedItem(item, "FORBIDDEN", "No path provided")
+    if junction is None:
+        junction = item.is_junction if item.is_junction is not None else is_junction(path)
+    category, reason = _classify_path(os.path.normpath(path), junction, version)
+    return ClassifiedItem(item, category, reason)
+
+def classify_items(items: list) -> list:
+    """Classify many items at once. Same results as calling classify_item on each."""
+    version = rules_version()
+    return [_classify(item, None, version) for item in items]
+
+def classification_cache_info():
+    """Hit/miss counters of the classification memo (functools cache_info)."""
+    return _classify_path.cache_info()
+
+def clear_classification_cache():
+    _classify_path.cache_clear()
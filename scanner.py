@@ -1,33 +1,55 @@
 import os
 import winreg
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterator, List, Optional
 from models import AppItem, FolderItem
+from rules import entry_is_junction, junction_from_stat
+from sizing import ScanBudget, SizeIndex, size_index
 
-def get_folder_size_gb(path: str) -> float:
-    """Calculate folder size in GB recursively."""
-    total_size = 0
+GB = 1024 ** 3
+MIN_FOLDER_GB = 0.1 # AppData folders smaller than this are not worth listing
+
+def get_folder_size_gb(path: str, index: Optional[SizeIndex] = None, budget: Optional[ScanBudget] = None) -> float:
+    """Calculate folder size in GB recursively (served from the shared size index)."""
+    index = index or size_index
     try:
-        if not os.path.exists(path):
-            return 0.0
-        for dirpath, dirnames, filenames in os.walk(path):
-            for f in filenames:
-                fp = os.path.join(dirpath, f)
-                # skip if it is symbolic link
-                if os.path.islink(fp):
-                    continue
-                try:
-                    total_size += os.path.getsize(fp)
-                except OSError:
-                    pass
+        return index.size_of_gb(path, budget)
     except Exception:
          # Permission errors or locked files
-         pass
-    return round(total_size / (1024 ** 3), 2)
+         return 0.0
 
-def scan_installed_apps() -> List[AppItem]:
-    """Scan Registry for installed apps."""
-    apps = []
+def size_items(items: List[AppItem | FolderItem], index: Optional[SizeIndex] = None,
+               budget: Optional[ScanBudget] = None):
+    """Fill in size_gb for many items, sizing their folders concurrently. Flags lower bounds if the budget ran out."""
+    index = index or size_index
+    by_path: Dict[str, list] = {}
+    for item in items:
+        by_path.setdefault(item.path, []).append(item)
+    try:
+        for path, size, exact in index.iter_sizes(list(by_path), budget=budget):
+            for item in by_path[path]:
+                item.size_gb = round(size / GB, 2)
+                item.size_is_lower_bound = not exact
+    except Exception:
+        pass # Permission errors or locked files
+
+def _worth_listing(folder: FolderItem) -> bool:
+    # Only show substantial folders > 100MB; a cut-short folder may well be bigger than it looks
+    return folder.size_gb > MIN_FOLDER_GB or (folder.size_is_lower_bound and folder.size_gb > 0)
+
+def _probe(path: str) -> Optional[bool]:
+    """None if path does not exist, else whether it is a junction. One lstat in the common case."""
+    try:
+        junction = junction_from_stat(os.lstat(path))
+    except OSError:
+        return None
+    if junction and not os.path.exists(path):
+        return None # Dangling junction, like os.path.exists reported before
+    return junction
+
+def iter_installed_apps() -> Iterator[AppItem]:
+    """Yield registry apps installed on C: as they are found. size_gb is left at 0 (see scan_installed_apps)."""
+    seen = set()
     roots = [
         (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
         (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall"),
@@ -54,18 +76,19 @@ def scan_installed_apps() -> List[AppItem]:
                                     # Normalize
                                     install_loc = os.path.normpath(install_loc)
                                     
-                                    # Check if on C:
-                                    if install_loc.lower().startswith("c:") and os.path.exists(install_loc):
-                                        # Deduplicate by path
-                                        if not any(a.path == install_loc for a in apps):
-                                            size = get_folder_size_gb(install_loc)
-                                            apps.append(AppItem(
+                                    # Check if on C: (deduplicate by path)
+                                    if install_loc.lower().startswith("c:") and install_loc not in seen:
+                                        junction = _probe(install_loc)
+                                        if junction is not None:
+                                            seen.add(install_loc)
+                                            yield AppItem(
                                                 name=name,
                                                 path=install_loc,
-                                                size_gb=size,
+                                                size_gb=0.0,
                                                 type="Program",
-                                                source="registry"
-                                            ))
+                                                source="registry",
+                                                is_junction=junction
+                                            )
                             except FileNotFoundError:
                                 pass # Missing DisplayName
                     except OSError:
@@ -73,14 +96,22 @@ def scan_installed_apps() -> List[AppItem]:
         except OSError:
             pass # Permissions or key missing
 
+def scan_installed_apps(index: Optional[SizeIndex] = None, budget: Optional[ScanBudget] = None) -> List[AppItem]:
+    """Scan Registry for installed apps."""
+    apps = []
+    for app in iter_installed_apps():
+        if budget and budget.cancelled:
+            break
+        apps.append(app)
+    # Size every install location in one concurrent batch
+    size_items(apps, index, budget)
     return apps
 
-def scan_folders() -> List[FolderItem]:
-    """Scan specific heavy folders."""
-    items = []
+def iter_folder_candidates() -> Iterator[FolderItem]:
+    """Yield the top-level AppData folders worth sizing (size_gb left at 0)."""
     user_profile = os.environ.get("USERPROFILE")
     if not user_profile:
-        return items
+        return
 
     scan_targets = [
         os.path.join(user_profile, "AppData", "Local"),
@@ -91,18 +122,72 @@ def scan_folders() -> List[FolderItem]:
     for root_dir in scan_targets:
         if os.path.exists(root_dir):
             try:
-                # List top level directories
-                for name in os.listdir(root_dir):
-                    full_path = os.path.join(root_dir, name)
-                    if os.path.isdir(full_path) and not os.path.islink(full_path):
-                        size = get_folder_size_gb(full_path)
-                        if size > 0.1: # Only show substantial folders > 100MB
-                            items.append(FolderItem(
-                                path=full_path,
-                                size_gb=size,
-                                source="folder_scan"
-                            ))
+                # List top level directories (DirEntry carries the type and junction state, no extra stat)
+                with os.scandir(root_dir) as it:
+                    dirs = [FolderItem(path=e.path, size_gb=0.0, source="folder_scan", is_junction=entry_is_junction(e))
+                            for e in it if e.is_dir(follow_symlinks=False)]
             except PermissionError:
-                pass
+                continue
+            yield from dirs
+
+def scan_folders(index: Optional[SizeIndex] = None, budget: Optional[ScanBudget] = None) -> List[FolderItem]:
+    """Scan specific heavy folders."""
+    items = list(iter_folder_candidates())
+    size_items(items, index, budget)
+    return [f for f in items if _worth_listing(f)]
+
+def iter_scan(index: Optional[SizeIndex] = None, budget: Optional[ScanBudget] = None) -> Iterator[tuple]:
+    """
+    Streaming version of scan_installed_apps() + scan_folders().
+
+    Items are reported as soon as they are found, with a provisional size (the
+    previous scan's cached total, or 0), and their final size follows once their
+    subtree has been walked (or the budget ran out, see size_is_lower_bound). Yields:
+        ("items", [item, ...])     - newly found candidates
+        ("size", path, size_gb)    - final size of an item already reported
+        ("drop", path)             - a reported folder turned out to be below MIN_FOLDER_GB
+    Stops early, after reporting what it has, once budget is cancelled.
+    """
+    index = index or size_index
+
+    apps = []
+    for app in iter_installed_apps():
+        if budget and budget.cancelled:
+            break
+        apps.append(app)
+    cached = index.cached_sizes([a.path for a in apps])
+    for a in apps:
+        a.size_gb = round(cached.get(a.path, 0) / GB, 2)
+    if apps:
+        yield ("items", apps)
+    if budget and budget.cancelled:
+        return # Apps found so far keep their provisional (cached) size
+
+    # Folders are only listed when large enough, so hold back the ones we know nothing about
+    folders = {f.path: f for f in iter_folder_candidates()}
+    candidates = list(folders)
+    cached = index.cached_sizes(candidates)
+    for f in folders.values():
+        f.size_gb = round(cached.get(f.path, 0) / GB, 2)
+    shown = [f for f in folders.values() if f.size_gb > MIN_FOLDER_GB]
+    if shown:
+        yield ("items", shown)
+    shown = {f.path for f in shown}
 
-    return items
+    app_paths = {a.path: a for a in apps}
+    for path, size, exact in index.iter_sizes([a.path for a in apps] + candidates, budget=budget):
+        size_gb = round(size / GB, 2)
+        if path in app_paths:
+            app = app_paths.pop(path)
+            app.size_gb = size_gb
+            app.size_is_lower_bound = not exact
+            yield ("size", path, size_gb)
+        elif path in folders:
+            folder = folders.pop(path)
+            folder.size_gb = size_gb
+            folder.size_is_lower_bound = not exact
+            if path in shown:
+                yield ("size", path, size_gb) if _worth_listing(folder) else ("drop", path)
+            elif _worth_listing(folder):
+                yield ("items", [folder])
+                yield ("size", path, size_gb)
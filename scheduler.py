@@ -0,0 +1,283 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from config import cfg
+from copier import PROGRESS_INTERVAL, TransferProgress
+from logger import get_logger
+from models import AppItem, FolderItem
+from mover import GB, LockedFilesError, MoverError, device_of, move_item, undo_move
+from storage import storage
+
+log = get_logger("scheduler")
+
+LOCK_RETRIES = 3 # Times a job blocked by files in use is put back (cfg.locked_files == "defer")
+LOCK_RETRY_SECONDS = 30.0 # ...and how long it waits before each retry
+
+def seek_penalty(path: str) -> Optional[bool]:
+    """Windows: whether the disk holding path has a seek penalty (StorageDeviceSeekPenaltyProperty); None if unknown."""
+    import ctypes
+    from ctypes import wintypes
+
+    class STORAGE_PROPERTY_QUERY(ctypes.Structure):
+        _fields_ = [("PropertyId", ctypes.c_int), ("QueryType", ctypes.c_int),
+                    ("AdditionalParameters", ctypes.c_ubyte * 1)]
+
+    class DEVICE_SEEK_PENALTY_DESCRIPTOR(ctypes.Structure):
+        _fields_ = [("Version", wintypes.DWORD), ("Size", wintypes.DWORD), ("IncursSeekPenalty", wintypes.BOOLEAN)]
+
+    kernel32 = ctypes.windll.kernel32
+    volume = ctypes.create_unicode_buffer(261)
+    if not kernel32.GetVolumePathNameW(os.path.abspath(path), volume, len(volume)):
+        return None
+    # Drive letters only (C:\ -> \\.\C:); folder mount points and shares stay unknown
+    if len(volume.value) != 3 or volume.value[1] != ":":
+        return None
+    kernel32.CreateFileW.restype = wintypes.HANDLE
+    # No access rights needed for the query; share read/write; OPEN_EXISTING
+    handle = kernel32.CreateFileW(f"\\\\.\\{volume.value[:2]}", 0, 3, None, 3, 0, None)
+    if handle in (None, wintypes.HANDLE(-1).value):
+        return None
+    try:
+        query = STORAGE_PROPERTY_QUERY(7, 0) # StorageDeviceSeekPenaltyProperty, PropertyStandardQuery
+        desc = DEVICE_SEEK_PENALTY_DESCRIPTOR()
+        returned = wintypes.DWORD()
+        if not kernel32.DeviceIoControl(wintypes.HANDLE(handle), 0x2D1400, # IOCTL_STORAGE_QUERY_PROPERTY
+                                        ctypes.byref(query), ctypes.sizeof(query), ctypes.byref(desc),
+                                        ctypes.sizeof(desc), ctypes.byref(returned), None):
+            return None
+        return bool(desc.IncursSeekPenalty)
+    finally:
+        kernel32.CloseHandle(wintypes.HANDLE(handle))
+
+def is_rotational(dev: int, path: Optional[str] = None) -> Optional[bool]:
+    """
+    True for spinning disks, False for SSD/NVMe, None if we can't tell (network, ...).
+    Linux reads sysfs by st_dev; Windows asks the disk holding path (seek_penalty).
+    """
+    if os.name == "nt":
+        try:
+            return seek_penalty(path) if path else None
+        except (OSError, AttributeError, ValueError):
+            return None
+    base = f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}"
+    for queue in (os.path.join(base, "queue"), os.path.join(base, "..", "queue")): # disk, or partition's disk
+        try:
+            with open(os.path.join(queue, "rotational")) as f:
+                return f.read().strip() == "1"
+        except (OSError, ValueError):
+            continue
+    return None
+
+def default_device_limit(dev: Optional[int], path: Optional[str] = None) -> int:
+    """Concurrent jobs allowed to touch one device: 1 on a hard disk (seeks thrash), else the configured limit."""
+    if dev is not None and is_rotational(dev, path):
+        return 1
+    return cfg.move_jobs_per_device
+
+class MoveScheduler:
+    """
+    Runs several move_item jobs at once.
+
+    Jobs start smallest first (by scanned size_gb) so small items finish early. A job
+    only starts while both its source and target device are under their limit
+    (device_limit(st_dev, a path on it)), so a hard disk gets one copy at a time while fast drives
+    get several, and items sent to different target drives copy side by side. Progress of the running jobs is folded into one stream, weighted by
+    size, like MoveWorker does for a sequential run.
+
+    With defer_locked, a job refused because files are in use (LockedFilesError, raised
+    before anything is copied) goes back in the queue and is retried after
+    LOCK_RETRY_SECONDS, up to LOCK_RETRIES times, while the other jobs carry on.
+    """
+
+    def __init__(self, target_root: str, max_jobs: int = None,
+                 device_limit: Callable[[Optional[int], Optional[str]], int] = default_device_limit,
+                 progress: Optional[Callable[[TransferProgress], None]] = None,
+                 on_job_done: Optional[Callable[[AppItem | FolderItem, Optional[Exception]], None]] = None,
+                 move: Callable = move_item, verb: str = "Moved", defer_locked: Optional[bool] = None):
+        self.target_root = target_root
+        self.max_jobs = max(1, max_jobs or cfg.move_jobs)
+        self.device_limit = device_limit
+        self.progress = progress
+        self.on_job_done = on_job_done
+        self.move = move
+        self.verb = verb # For the log
+        self.defer_locked = cfg.locked_files == "defer" if defer_locked is None else defer_locked
+        self._cond = threading.Condition()
+        self._busy: Dict[Optional[int], int] = {}
+        self._limits: Dict[Optional[int], int] = {}
+        self._job_progress: Dict[int, TransferProgress] = {}
+        self._last_report = 0.0
+
+    def run(self, items: List[AppItem | FolderItem], targets: Optional[List[str]] = None,
+            target_paths: Optional[List[Optional[str]]] = None) -> List[Tuple[AppItem | FolderItem, Optional[Exception]]]:
+        """
+        Move every item. targets gives each item its own target root (e.g. from
+        planner.plan_moves), parallel to items; default is self.target_root for all.
+        target_paths, also parallel, are the planner's collision-free target folders,
+        passed on to the move as target_path.
+        Returns (item, error or None) in the order given.
+        """
+        targets = targets or [self.target_root] * len(items)
+        self._target_paths = target_paths or [None] * len(items)
+        target_devs = {root: device_of(root) for root in set(targets)}
+        jobs = sorted(
+            ((i, item, device_of(item.path), target_devs[root], root)
+             for i, (item, root) in enumerate(zip(items, targets))),
+            key=lambda job: job[1].size_gb
+        )
+        self._dev_paths: Dict[Optional[int], str] = {} # A path on each device, for device_limit
+        for _, item, src_dev, tgt_dev, root in jobs:
+            self._dev_paths.setdefault(src_dev, item.path)
+            self._dev_paths.setdefault(tgt_dev, root)
+        self._weights = {i: max(int(item.size_gb * GB), 1) for i, item, _, _, _ in jobs}
+        self._total = sum(self._weights.values()) or 1
+        self._done_bytes = 0
+        self._done_files = 0
+        self._pending = jobs
+        self._running = 0
+        self._not_before: Dict[int, float] = {} # Deferred job -> monotonic time it may start again
+        self._tries: Dict[int, int] = {}
+        results: Dict[int, Optional[Exception]] = {}
+
+        threads = [threading.Thread(target=self._worker, args=(results,), name=f"move-{n}", daemon=True)
+                   for n in range(min(self.max_jobs, len(jobs)))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self._report(force=True)
+        return [(item, results.get(i)) for i, item in enumerate(items)]
+
+    def _devices(self, job) -> set:
+        return {job[2], job[3]}
+
+    def _limit(self, dev) -> int:
+        if dev not in self._limits:
+            self._limits[dev] = max(1, self.device_limit(dev, self._dev_paths.get(dev)))
+        return self._limits[dev]
+
+    def _take(self):
+        """
+        Next job whose devices all have a free slot (and that is not deferred); None once
+        nothing is left, not even a running job that could be deferred back. Caller holds _cond.
+        """
+        while self._pending or self._running:
+            now = time.monotonic()
+            for n, job in enumerate(self._pending):
+                if self._not_before.get(job[0], 0) <= now and \
+                        all(self._busy.get(d, 0) < self._limit(d) for d in self._devices(job)):
+                    del self._pending[n]
+                    for d in self._devices(job):
+                        self._busy[d] = self._busy.get(d, 0) + 1
+                    self._running += 1
+                    return job
+            wake = [t for t in (self._not_before.get(job[0], 0) for job in self._pending) if t > now]
+            self._cond.wait(min(wake) - now if wake else None)
+        return None
+
+    def _worker(self, results: dict):
+        while True:
+            with self._cond:
+                job = self._take()
+            if job is None:
+                return
+            i, item, _, _, root = job
+            error = None
+            try:
+                extra = {"target_path": self._target_paths[i]} if self._target_paths[i] else {}
+                self.move(item, root, progress=lambda p, i=i: self._on_progress(i, p), **extra)
+                log.info(f"{self.verb} {item.name} OK")
+            except LockedFilesError as e:
+                if self.defer_locked and self._tries.get(i, 0) < LOCK_RETRIES:
+                    log.info(f"Deferring {item.name}: {e}")
+                    with self._cond:
+                        self._tries[i] = self._tries.get(i, 0) + 1
+                        self._not_before[i] = time.monotonic() + LOCK_RETRY_SECONDS
+                        self._release(job)
+                        self._pending.append(job)
+                    continue
+                log.error(f"{self.verb} {item.name} failed: {e}")
+                error = e
+            except Exception as e:
+                log.error(f"{self.verb} {item.name} failed: {e}")
+                error = e
+            with self._cond:
+                results[i] = error
+                last = self._job_progress.pop(i, None)
+                self._done_files += last.files_done if last else 0
+                self._done_bytes += self._weights[i]
+                self._release(job)
+            if self.on_job_done:
+                self.on_job_done(item, error)
+            self._report(force=True)
+
+    def _release(self, job):
+        """Give back the job's device slots. Caller holds _cond."""
+        for d in self._devices(job):
+            self._busy[d] -= 1
+        self._running -= 1
+        self._job_progress.pop(job[0], None)
+        self._cond.notify_all()
+
+    def _on_progress(self, i: int, p: TransferProgress):
+        with self._cond:
+            self._job_progress[i] = p
+        self._report()
+
+    def _report(self, force: bool = False):
+        if self.progress is None:
+            return
+        now = time.monotonic()
+        with self._cond:
+            if not force and now - self._last_report < PROGRESS_INTERVAL:
+                return
+            self._last_report = now
+            running = list(self._job_progress.items())
+            done = self._done_bytes + sum(min(p.bytes_done, self._weights[i]) for i, p in running)
+            files = self._done_files + sum(p.files_done for _, p in running)
+            rate = sum(p.rate for _, p in running)
+        self.progress(TransferProgress(done, files, self._total, rate))
+
+def rollback_moves(move_ids: List[int], max_jobs: int = None,
+                   progress: Optional[Callable[[TransferProgress], None]] = None,
+                   on_job_done: Optional[Callable[[int, Optional[Exception]], None]] = None
+                   ) -> List[Tuple[int, Optional[Exception]]]:
+    """
+    Roll back many moves at once (see storage.find_moves to pick them by filter).
+
+    Runs mover.undo_move through a MoveScheduler, data flowing from each move's target
+    back to its source, so the same per-device limits apply and a move whose target is
+    on the source's drive is undone by a rename. Statuses of the successful rollbacks
+    are written in one transaction at the end. Returns (move_id, error or None) in the
+    order given.
+    """
+    results: Dict[int, Optional[Exception]] = {}
+    records = []
+    for move_id in dict.fromkeys(move_ids):
+        record = storage.get_move(move_id)
+        if not record:
+            results[move_id] = MoverError("Move ID not found")
+        elif record[4] != "OK":
+            results[move_id] = MoverError("Cannot rollback a failed or already rolled-back move")
+        else:
+            records.append(record)
+
+    # The data now lives at target_path and goes back next to source_path
+    moved_bytes = storage.get_moved_bytes([r[0] for r in records]) if records else {}
+    items = [FolderItem(r[2], moved_bytes.get(r[0], 0) / GB) for r in records]
+    by_item = {id(item): record for item, record in zip(items, records)}
+
+    def undo(item, _root, progress=None):
+        undo_move(by_item[id(item)], progress, int(item.size_gb * GB))
+
+    def job_done(item, error):
+        if on_job_done:
+            on_job_done(by_item[id(item)][0], error)
+
+    scheduler = MoveScheduler(None, max_jobs, progress=progress, on_job_done=job_done, move=undo, verb="Rolled back")
+    for (item, error), record in zip(scheduler.run(items, [os.path.dirname(r[1]) for r in records]), records):
+        results[record[0]] = error
+
+    storage.update_statuses([(r[0], "ROLLED_BACK") for r in records if results[r[0]] is None])
+    return [(move_id, results[move_id]) for move_id in move_ids]
@@ -0,0 +1,455 @@
+import os
+import queue
+import stat
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from logger import get_logger
+from storage import storage
+
+log = get_logger("Sizing")
+
+DEFAULT_WORKERS = 8
+
+def _norm_key(path: str) -> str:
+    """Normalize a path for use as an index key (case-insensitive on Windows)."""
+    return os.path.normcase(os.path.normpath(path))
+
+def _is_reparse_point(entry: os.DirEntry) -> bool:
+    """True for symlinks and NTFS junctions. Uses cached DirEntry data where possible."""
+    if entry.is_symlink():
+        return True
+    if hasattr(entry, "is_junction"):  # Python 3.12+
+        return entry.is_junction()
+    if os.name == "nt":
+        # On Windows DirEntry.stat() is filled from FindNextFile, no extra syscall
+        st = entry.stat(follow_symlinks=False)
+        return bool(st.st_file_attributes & stat.FILE_ATTRIBUTE_REPARSE_POINT)
+    return False
+
+class ScanBudget:
+    """
+    Cooperative cancellation token with optional time and file-count limits.
+
+    Walkers check it before listing each directory. Once it is exhausted, folders
+    that were not fully walked are reported with their bytes so far as a lower bound.
+    """
+
+    def __init__(self, seconds: Optional[float] = None, max_files: Optional[int] = None):
+        self.deadline = time.monotonic() + seconds if seconds else None
+        self.max_files = max_files or None
+        self.files = 0
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def add_files(self, count: int):
+        self.files += count  # Approximate under threads, which is fine for a budget
+
+    def exhausted(self) -> bool:
+        if self._cancelled.is_set():
+            return True
+        if self.max_files is not None and self.files >= self.max_files:
+            return True
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+class SizeIndex:
+    """
+    Directory size index built with a single os.scandir pass per root.
+
+    Every directory visited gets its subtree byte total recorded, so asking for the
+    size of any folder inside an indexed root is a dict lookup. Symlinks and
+    junctions are not followed (a junction points at data that lives elsewhere).
+    Unindexed folders are walked in parallel, see size_many(). With a store, per
+    directory results are persisted so the next scan only re-lists folders whose
+    mtime changed.
+
+    One index is shared by the scan, moves, rollbacks and the cleaner, each on its
+    own threads, so _sizes and _roots are only touched under _lock (walkers read
+    _sizes with single dict lookups). A folder invalidated while a walk is running
+    (moved or cleaned meanwhile) does not get the walk's stale totals cached.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, store=None):
+        self.workers = workers
+        self.store = store  # storage.Storage for the persistent per-directory cache, or None
+        self._lock = threading.RLock()
+        self._sizes: Dict[str, int] = {}
+        self._roots: List[str] = []
+        self._walks = 0  # iter_sizes() walks in progress
+        self._dropped: List[str] = []  # Keys invalidated since the oldest of them started
+
+    def clear(self):
+        """Forget everything. Call before a fresh scan."""
+        with self._lock:
+            self._sizes.clear()
+            self._roots = []
+
+    def invalidate(self, path: str):
+        """Drop a path, its subtree and its ancestors (their totals include it)."""
+        key = _norm_key(path)
+        prefix = key.rstrip(os.sep) + os.sep
+        with self._lock:
+            if self._walks:
+                self._dropped.append(key)
+            for k in [k for k in self._sizes if k == key or k.startswith(prefix)]:
+                del self._sizes[k]
+            parent = os.path.dirname(key)
+            while parent and parent != key:
+                self._sizes.pop(parent, None)
+                key, parent = parent, os.path.dirname(parent)
+            self._roots = [r for r in self._roots if r in self._sizes]
+
+    def _covering_root(self, key: str) -> Optional[str]:
+        for root in self._roots:
+            if key.startswith(root.rstrip(os.sep) + os.sep):
+                return root
+        return None
+
+    def _known(self, key: str) -> Optional[int]:
+        """Indexed size of key (0 under an indexed root if it has none), or None if not indexed."""
+        with self._lock:
+            if key in self._sizes or self._covering_root(key):
+                # Anything not recorded is missing, not a directory, or a link we skipped
+                return self._sizes.get(key, 0)
+        return None
+
+    def size_of(self, path: str, budget: Optional[ScanBudget] = None) -> int:
+        """Return the total size in bytes of the directory at path (a lower bound if the budget ran out)."""
+        size = self._known(_norm_key(path))
+        if size is not None:
+            return size
+        return self.size_many([path], budget=budget)[path]
+
+    def size_of_gb(self, path: str, budget: Optional[ScanBudget] = None) -> float:
+        return round(self.size_of(path, budget) / (1024 ** 3), 2)
+
+    def size_many(self, paths: List[str], workers: Optional[int] = None,
+                  budget: Optional[ScanBudget] = None) -> Dict[str, int]:
+        """
+        Size several folders at once. Folders that are not indexed yet are walked
+        concurrently by a work-stealing pool of `workers` threads (default: self.workers).
+        Returns {path: bytes} keyed by the paths as given.
+        """
+        return {path: size for path, size, _ in self.iter_sizes(paths, workers, budget)}
+
+    def iter_sizes(self, paths: List[str], workers: Optional[int] = None,
+                   budget: Optional[ScanBudget] = None) -> Iterator[Tuple[str, int, bool]]:
+        """
+        Like size_many(), but yields (path, bytes, exact) for each folder as soon as
+        its subtree is done. exact is False when the budget ran out inside the folder,
+        in which case bytes is a lower bound.
+        """
+        # Only walk the outermost unindexed folders; nested ones fall out of their parents
+        pending: Dict[str, List[str]] = {}
+        for path in paths:
+            key = _norm_key(path)
+            size = self._known(key)
+            if size is not None or not os.path.isdir(path):
+                yield path, size or 0, True
+                continue
+            pending.setdefault(key, []).append(path)
+        if not pending:
+            return
+        roots = []
+        for key in sorted(pending, key=len):
+            if not any(key.startswith(r.rstrip(os.sep) + os.sep) for r, _ in roots):
+                roots.append((key, pending[key][0]))
+
+        with self._lock:
+            self._walks += 1
+            since = len(self._dropped)
+        done = queue.Queue()
+        walker = _Walker(self, workers or self.workers, self._load_cache(roots), budget,
+                         watch=set(pending), on_done=lambda key, total: done.put(key))
+
+        def run():
+            try:
+                walker.run(roots)
+            finally:
+                done.put(None)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        try:
+            while True:
+                key = done.get()
+                if key is None:
+                    break
+                for path in pending.pop(key):
+                    yield path, walker.totals[key], key not in walker.partial
+        finally:
+            thread.join()
+            self._merge(walker, roots, since)
+        # Requested folders the walk skipped (links inside a root) have no total
+        for key, rest in pending.items():
+            for path in rest:
+                yield path, walker.totals.get(key, 0), key not in walker.partial
+
+    def _merge(self, walker: "_Walker", roots: List[tuple], since: int):
+        # Lower bounds are not cached; the next query walks those folders again
+        with self._lock:
+            dropped = self._dropped[since:]
+            self._walks -= 1
+            if not self._walks:
+                self._dropped = []
+
+            def stale(k: str) -> bool:
+                # Invalidated during the walk: the folder itself, inside it, or one of its ancestors
+                return any(k == d or k.startswith(d.rstrip(os.sep) + os.sep) or d.startswith(k.rstrip(os.sep) + os.sep)
+                           for d in dropped)
+
+            self._sizes.update((k, v) for k, v in walker.totals.items()
+                               if k not in walker.partial and not (dropped and stale(k)))
+            for root, _ in roots:
+                if root in walker.partial or (dropped and stale(root)):
+                    continue
+                prefix = root.rstrip(os.sep) + os.sep
+                # A new root may swallow older, nested ones
+                self._roots = [r for r in self._roots if not r.startswith(prefix)] + [root]
+        if self.store is not None:
+            try:
+                self.store.save_dir_sizes(walker.rows, walker.removed)
+            except Exception as e:
+                log.warning(f"Could not save size cache: {e}")
+
+    def cached_sizes(self, paths: List[str]) -> Dict[str, int]:
+        """
+        Best known size for each path without walking anything: the in-memory total,
+        else the persistent cache from the previous scan. Unknown paths are left out.
+        """
+        result = {}
+        lookup = {}
+        with self._lock:
+            for path in paths:
+                key = _norm_key(path)
+                if key in self._sizes:
+                    result[path] = self._sizes[key]
+                else:
+                    lookup.setdefault(key, []).append(path)
+        if lookup and self.store is not None:
+            try:
+                totals = self.store.get_dir_totals(list(lookup))
+            except Exception as e:
+                log.warning(f"Could not read size cache: {e}")
+                totals = {}
+            for key, total in totals.items():
+                for path in lookup[key]:
+                    result[path] = total
+        return result
+
+    def _load_cache(self, roots: List[tuple]) -> Optional[Dict[str, tuple]]:
+        """Cached (parent, mtime, own_bytes, subtree_bytes) per directory under roots, or None if uncached."""
+        if self.store is None:
+            return None
+        try:
+            rows = self.store.get_dir_sizes([key for key, _ in roots])
+        except Exception as e:
+            log.warning(f"Could not read size cache: {e}")
+            rows = []
+        return {path: (parent, mtime, own, subtree) for path, parent, mtime, own, subtree in rows}
+
+class _Node:
+    __slots__ = ("key", "parent", "pending", "total", "mtime", "own", "partial")
+
+    def __init__(self, key: str, parent: Optional["_Node"]):
+        self.key = key
+        self.parent = parent
+        self.pending = 0
+        self.total = 0
+        self.mtime = 0
+        self.own = 0
+        self.partial = False
+
+class _Walker:
+    """
+    One bottom-up directory walk over a set of roots.
+
+    Each directory is a task. Worker i pushes the subdirectories it discovers onto
+    its own deque and pops from the same end (depth-first, cache friendly); an idle
+    worker steals from the opposite end of another worker's deque, which hands it
+    the largest remaining chunk of work. A directory's total is final once all its
+    children are done, and is then folded into its parent.
+
+    With a cache, a directory whose mtime is unchanged is not listed at all: its
+    own-file bytes and child folders come from the cache, and only the child
+    folders are stat'ed to check their own mtimes. (A directory's mtime moves when
+    entries are added, removed or renamed, not when a file is rewritten in place.)
+    """
+
+    def __init__(self, index: SizeIndex, workers: int, cache: Optional[Dict[str, tuple]] = None,
+                 budget: Optional[ScanBudget] = None, watch: Optional[set] = None,
+                 on_done: Optional[Callable[[str, int], None]] = None):
+        self.index = index
+        self.budget = budget
+        self.partial: set = set()  # keys whose total is only a lower bound
+        self.watch = watch or set()
+        self.on_done = on_done
+        self.workers = max(1, workers)
+        self.deques = [deque() for _ in range(self.workers)]
+        self.totals: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.outstanding = 0
+
+        self.cache = cache
+        self.cached_children: Dict[str, List[str]] = {}
+        for key, (parent, _, _, _) in (cache or {}).items():
+            self.cached_children.setdefault(parent, []).append(key)
+        self.rows: List[tuple] = []  # (path, parent, mtime, own_bytes, subtree_bytes) to persist
+        self.removed: List[str] = []  # cached folders that no longer exist
+
+    def run(self, roots: List[tuple]) -> Dict[str, int]:
+        for i, (key, path) in enumerate(roots):
+            self.deques[i % self.workers].append((_Node(key, None), path, None))
+        self.outstanding = len(roots)
+
+        if self.workers == 1:
+            self._work(0)
+        else:
+            threads = [threading.Thread(target=self._work, args=(i,), daemon=True)
+                       for i in range(self.workers)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        return self.totals
+
+    def _take(self, i: int):
+        try:
+            return self.deques[i].pop()
+        except IndexError:
+            pass
+        for offset in range(1, self.workers):
+            try:
+                return self.deques[(i + offset) % self.workers].popleft()
+            except IndexError:
+                continue
+        return None
+
+    def _work(self, i: int):
+        while True:
+            task = self._take(i)
+            if task is None:
+                with self.wakeup:
+                    if self.outstanding == 0:
+                        self.wakeup.notify_all()
+                        return
+                    self.wakeup.wait(0.01)
+                continue
+            self._scan(i, *task)
+
+    def _scan(self, i: int, node: _Node, dir_path: str, mtime: Optional[int]):
+        known = self.index._sizes
+        own = 0
+        linked = 0  # Subtrees already in the index, not part of this walk
+        children = []
+        listed = True
+
+        if self.budget is not None and self.budget.exhausted():
+            # Out of budget: leave this folder unwalked and mark the whole chain as a lower bound
+            with self.lock:
+                node.partial = True
+                self.outstanding -= 1
+                self._complete(node)
+                if self.outstanding == 0:
+                    self.wakeup.notify_all()
+            return
+
+        if self.cache is not None:
+            if mtime is None:
+                try:
+                    mtime = os.stat(dir_path, follow_symlinks=False).st_mtime_ns
+                except OSError:
+                    mtime = 0
+            node.mtime = mtime
+            hit = self.cache.get(node.key)
+            if hit and mtime and hit[1] == mtime:
+                listed = False
+                own = hit[2]
+                for child in self.cached_children.get(node.key, ()):
+                    size = known.get(child)  # One lookup: the index may drop the key in between
+                    if size is not None:
+                        linked += size
+                    else:
+                        children.append((_Node(child, node), child, None))
+
+        if listed:
+            files = 0
+            try:
+                with os.scandir(dir_path) as it:
+                    for entry in it:
+                        try:
+                            if _is_reparse_point(entry):
+                                continue
+                            if entry.is_dir(follow_symlinks=False):
+                                child = _norm_key(entry.path)
+                                size = known.get(child)
+                                if size is not None:
+                                    # Already indexed (e.g. nested registry install location)
+                                    linked += size
+                                    continue
+                                child_mtime = None
+                                if self.cache is not None:
+                                    child_mtime = entry.stat(follow_symlinks=False).st_mtime_ns
+                                children.append((_Node(child, node), entry.path, child_mtime))
+                            else:
+                                files += 1
+                                own += entry.stat(follow_symlinks=False).st_size
+                        except OSError:
+                            pass
+            except OSError as e:
+                # Permission errors or locked folders
+                log.debug(f"Cannot list {dir_path}: {e}")
+            if self.budget is not None:
+                self.budget.add_files(files)
+
+            if self.cache is not None and node.key in self.cached_children:
+                current = {c[0].key for c in children}
+                gone = [c for c in self.cached_children[node.key] if c not in current and c not in known]
+                if gone:
+                    with self.lock:
+                        self.removed.extend(gone)
+
+        with self.lock:
+            node.own = own
+            node.total += own + linked
+            node.pending += len(children)
+            self.outstanding += len(children) - 1
+            if not children:
+                self._complete(node)
+            if self.outstanding == 0:
+                self.wakeup.notify_all()
+        if children:
+            self.deques[i].extend(children)
+            with self.wakeup:
+                self.wakeup.notify_all()
+
+    def _complete(self, node: _Node):
+        """Record a finished directory and fold it into its ancestors. Caller holds the lock."""
+        while node is not None:
+            self.totals[node.key] = node.total
+            if node.partial:
+                self.partial.add(node.key)
+            if node.key in self.watch and self.on_done:
+                self.on_done(node.key, node.total)
+            if self.cache is not None and not node.partial:
+                self.rows.append((node.key, os.path.dirname(node.key), node.mtime, node.own, node.total))
+            parent = node.parent
+            if parent is None:
+                return
+            parent.total += node.total
+            parent.partial = parent.partial or node.partial
+            parent.pending -= 1
+            if parent.pending:
+                return
+            node = parent
+
+# Shared index used by the scanner and the cleaner
+size_index = SizeIndex(store=storage)
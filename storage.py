@@ -1,7 +1,7 @@
 import sqlite3
 import os
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 DB_FILE = "safemove.db"
 
@@ -19,10 +19,85 @@ class Storage:
                     source_path TEXT NOT NULL,
                     target_path TEXT NOT NULL,
                     timestamp TEXT NOT NULL,
-                    status TEXT NOT NULL, -- 'OK', 'FAILED', 'ROLLED_BACK'
+                    status TEXT NOT NULL, -- 'OK', 'FAILED', 'ROLLED_BACK', 'IN_PROGRESS', 'INTERRUPTED'
                     category TEXT NOT NULL -- 'SAFE', 'REINSTALL'
                 )
             """)
+            # Per-directory size cache for incremental rescans (see sizing.SizeIndex)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS dir_sizes (
+                    path TEXT PRIMARY KEY,
+                    parent TEXT NOT NULL,
+                    mtime INTEGER NOT NULL, -- st_mtime_ns of the directory itself
+                    own_bytes INTEGER NOT NULL, -- files directly inside
+                    subtree_bytes INTEGER NOT NULL
+                )
+            """)
+            # Per-file journal of a move in progress, so it can be resumed (see mover.MoveJournal)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS move_files (
+                    move_id INTEGER NOT NULL,
+                    rel_path TEXT NOT NULL, -- relative to the move's source
+                    size INTEGER NOT NULL,
+                    mtime INTEGER NOT NULL, -- st_mtime_ns of the source file
+                    done INTEGER NOT NULL DEFAULT 0, -- 1 once copied to the target
+                    PRIMARY KEY (move_id, rel_path)
+                )
+            """)
+            # BLAKE2b of every file a move copied and verified; kept after the move finishes
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS move_manifest (
+                    move_id INTEGER NOT NULL,
+                    rel_path TEXT NOT NULL, -- relative to the move's target
+                    size INTEGER NOT NULL,
+                    blake2b TEXT NOT NULL,
+                    PRIMARY KEY (move_id, rel_path)
+                )
+            """)
+            # What verifying each move cost, to pick a level per category (see copier.Verifier)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS move_verify_costs (
+                    move_id INTEGER NOT NULL,
+                    level TEXT NOT NULL, -- 'fast', 'sampled', 'full'
+                    files INTEGER NOT NULL,
+                    bytes_read INTEGER NOT NULL, -- source + target bytes read to verify
+                    verify_seconds REAL NOT NULL, -- summed over the verify threads
+                    transfer_seconds REAL NOT NULL -- wall clock of the whole copy, verification included
+                )
+            """)
+            # Bytes, files and wall clock of every copy, to calibrate the move time estimate (see planner.ThroughputModel)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS move_transfers (
+                    move_id INTEGER NOT NULL,
+                    method TEXT NOT NULL, -- copy backend ('native', 'robocopy') or 'rename'
+                    level TEXT NOT NULL, -- verify level in effect
+                    files INTEGER NOT NULL,
+                    bytes INTEGER NOT NULL,
+                    seconds REAL NOT NULL
+                )
+            """)
+            # Content-addressed blobs of the dedup store under each target root (see dedup.DedupStore)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS dedup_blobs (
+                    store TEXT NOT NULL, -- the store folder; blobs live at store/<digest[:2]>/<digest>
+                    digest TEXT NOT NULL, -- BLAKE2b
+                    size INTEGER NOT NULL,
+                    PRIMARY KEY (store, digest)
+                )
+            """)
+            # Moved files that are hardlinks of a blob
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS dedup_files (
+                    move_id INTEGER NOT NULL,
+                    rel_path TEXT NOT NULL, -- relative to the move's target
+                    store TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    PRIMARY KEY (move_id, rel_path)
+                )
+            """)
+            # Nothing can be running while we start up: anything left mid-move was cut short
+            cursor.execute("UPDATE moves SET status = 'INTERRUPTED' WHERE status = 'IN_PROGRESS'")
             conn.commit()
 
     def log_move(self, source_path: str, target_path: str, status: str, category: str) -> int:
@@ -58,6 +133,56 @@ class Storage:
             cursor.execute("SELECT * FROM moves ORDER BY id DESC")
             return cursor.fetchall()
             
+    def find_moves(self, status: Optional[str] = "OK", target_root: Optional[str] = None,
+                   since: Optional[str] = None, until: Optional[str] = None,
+                   category: Optional[str] = None) -> List[Tuple]:
+        """
+        Get moves matching every given filter, oldest first. target_root matches targets
+        at or below it (e.g. "D:\\"), compared after os.path.normcase, so on Windows
+        "d:\\foo" finds moves recorded as "D:\\Foo"; since/until are ISO timestamps
+        (inclusive/exclusive).
+        """
+        query, args = "SELECT * FROM moves WHERE 1 = 1", []
+        if status is not None:
+            query += " AND status = ?"
+            args.append(status)
+        if target_root:
+            root = os.path.normcase(target_root)
+            lo, hi = _subtree_range(root)
+            query += " AND (normcase(target_path) = ? OR (normcase(target_path) >= ? AND normcase(target_path) < ?))"
+            args += [root.rstrip(os.sep), lo, hi]
+        if since:
+            query += " AND timestamp >= ?"
+            args.append(since)
+        if until:
+            query += " AND timestamp < ?"
+            args.append(until)
+        if category:
+            query += " AND category = ?"
+            args.append(category)
+        with sqlite3.connect(DB_FILE) as conn:
+            conn.create_function("normcase", 1, os.path.normcase, deterministic=True)
+            cursor = conn.cursor()
+            cursor.execute(query + " ORDER BY id", args)
+            return cursor.fetchall()
+
+    def update_statuses(self, updates: List[Tuple[int, str]]):
+        """Set the status of many moves, given as (move_id, status), in one transaction."""
+        with sqlite3.connect(DB_FILE) as conn:
+            cursor = conn.cursor()
+            cursor.executemany("UPDATE moves SET status = ? WHERE id = ?", [(s, mid) for mid, s in updates])
+            conn.commit()
+
+    def get_moved_bytes(self, move_ids: List[int]) -> Dict[int, int]:
+        """Get {move_id: bytes} each move transferred (see log_transfer). Moves without a record are left out."""
+        with sqlite3.connect(DB_FILE) as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT move_id, SUM(bytes) FROM move_transfers
+                WHERE move_id IN ({",".join("?" * len(move_ids))}) GROUP BY move_id
+            """, list(move_ids))
+            return dict(cursor.fetchall())
+
     def get_active_junctions(self) -> List[Tuple]:
         """Get moves that are OK (active junctions)."""
         with sqlite3.connect(DB_FILE) as conn:
@@ -65,5 +190,207 @@ class Storage:
             cursor.execute("SELECT * FROM moves WHERE status = 'OK'")
             return cursor.fetchall()
 
+    def get_interrupted_moves(self) -> List[Tuple]:
+        """Get moves that stopped part-way and can be resumed."""
+        with sqlite3.connect(DB_FILE) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM moves WHERE status = 'INTERRUPTED' ORDER BY id DESC")
+            return cursor.fetchall()
+
+    def save_move_plan(self, move_id: int, files: List[Tuple[str, int, int]]):
+        """Record the (rel_path, size, mtime) files a move will copy, in one transaction. Keeps existing done flags."""
+        with sqlite3.connect(DB_FILE) as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT INTO move_files (move_id, rel_path, size, mtime) VALUES (?, ?, ?, ?)
+                ON CONFLICT (move_id, rel_path) DO UPDATE SET size = excluded.size, mtime = excluded.mtime
+                WHERE done = 0
+            """, [(move_id, rel, size, mtime) for rel, size, mtime in files])
+            conn.commit()
+
+    def mark_files_done(self, move_id: int, files: List[Tuple[str, int, int, Optional[str]]]):
+        """Mark (rel_path, size, mtime, digest) files of a move as copied and add their digests to the manifest, in one transaction."""
+        with sqlite3.connect(DB_FILE) as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                "UPDATE move_files SET done = 1, size = ?, mtime = ? WHERE move_id = ? AND rel_path = ?",
+                [(size, mtime, move_id, rel) for rel, size, mtime, _ in files]
+            )
+            cursor.executemany(
+                "INSERT OR REPLACE INTO move_manifest VALUES (?, ?, ?, ?)",
+                [(move_id, rel, size, digest) for rel, size, _, digest in files if digest]
+            )
+            conn.commit()
+
+    def get_manifest(self, move_id: int) -> Dict[str, Tuple[int, str]]:
+        """Get {rel_path: (size, blake2b)} recorded for a move."""
+        with sqlite3.connect(DB_FILE) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT rel_path, size, blake2b FROM move_manifest WHERE move_id = ?", (move_id,))
+            return {rel: (size, digest) for rel, size, digest in cursor.fetchall()}
+
+    def get_done_files(self, move_id: int) -> Dict[str, Tuple[int, int]]:
+        """Get {rel_path: (size, mtime)} of the files a move has already copied."""
+        with sqlite3.connect(DB_FILE) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT rel_path, size, mtime FROM move_files WHERE move_id = ? AND done = 1", (move_id,))
+            return {rel: (size, mtime) for rel, size, mtime in cursor.fetchall()}
+
+    def get_move_progress(self, move_id: int) -> Tuple[int, int, int, int]:
+        """Get (files_done, files_total, bytes_done, bytes_total) from a move's journal."""
+        with sqlite3.connect(DB_FILE) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT COALESCE(SUM(done), 0), COUNT(*),
+                       COALESCE(SUM(CASE WHEN done = 1 THEN size ELSE 0 END), 0), COALESCE(SUM(size), 0)
+                FROM move_files WHERE move_id = ?
+            """, (move_id,))
+            return cursor.fetchone()
+
+    def clear_move_journal(self, move_id: int):
+        """Drop a move's file journal once it has finished."""
+        with sqlite3.connect(DB_FILE) as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM move_files WHERE move_id = ?", (move_id,))
+            conn.commit()
+
+    def log_verify_cost(self, move_id: int, level: str, files: int, bytes_read: int,
+                        verify_seconds: float, transfer_seconds: float):
+        """Record what verifying (one run of) a move cost."""
+        with sqlite3.connect(DB_FILE) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO move_verify_costs VALUES (?, ?, ?, ?, ?, ?)",
+                (move_id, level, files, bytes_read, verify_seconds, transfer_seconds)
+            )
+            conn.commit()
+
+    def get_verify_costs(self) -> List[Tuple]:
+        """Get (category, level, moves, files, bytes_read, verify_seconds, transfer_seconds) totals."""
+        with sqlite3.connect(DB_FILE) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT m.category, c.level, COUNT(DISTINCT c.move_id), SUM(c.files), SUM(c.bytes_read),
+                       SUM(c.verify_seconds), SUM(c.transfer_seconds)
+                FROM move_verify_costs c JOIN moves m ON m.id = c.move_id
+                GROUP BY m.category, c.level ORDER BY m.category, c.level
+            """)
+            return cursor.fetchall()
+
+    def log_transfer(self, move_id: int, method: str, level: str, files: int, nbytes: int, seconds: float):
+        """Record how long (one run of) a move took to copy files/bytes."""
+        with sqlite3.connect(DB_FILE) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO move_transfers VALUES (?, ?, ?, ?, ?, ?)",
+                (move_id, method, level, files, nbytes, seconds)
+            )
+            conn.commit()
+
+    def get_transfer_history(self, limit: int = 200) -> List[Tuple]:
+        """Get (target_path, method, level, files, bytes, seconds) of the most recent copies (renames left out)."""
+        with sqlite3.connect(DB_FILE) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT m.target_path, t.method, t.level, t.files, t.bytes, t.seconds
+                FROM move_transfers t JOIN moves m ON m.id = t.move_id
+                WHERE t.method != 'rename' AND t.bytes > 0 AND t.seconds > 0 ORDER BY t.rowid DESC LIMIT ?
+            """, (limit,))
+            return cursor.fetchall()
+
+    def get_dedup_blobs(self, store: str) -> Dict[str, int]:
+        """Get {digest: size} of the blobs in a dedup store."""
+        with sqlite3.connect(DB_FILE) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT digest, size FROM dedup_blobs WHERE store = ?", (store,))
+            return dict(cursor.fetchall())
+
+    def save_dedup(self, store: str, move_id: int, blobs: List[Tuple[str, int]], files: List[Tuple[str, str, int]]):
+        """Add (digest, size) blobs to a store and (rel_path, digest, size) files of a move linked to them, in one transaction."""
+        with sqlite3.connect(DB_FILE) as conn:
+            cursor = conn.cursor()
+            cursor.executemany("INSERT OR REPLACE INTO dedup_blobs VALUES (?, ?, ?)",
+                               [(store, digest, size) for digest, size in blobs])
+            cursor.executemany("INSERT OR REPLACE INTO dedup_files VALUES (?, ?, ?, ?, ?)",
+                               [(move_id, rel, store, digest, size) for rel, digest, size in files])
+            conn.commit()
+
+    def get_dedup_files(self, move_id: int) -> List[Tuple[str, str, str]]:
+        """Get (rel_path, store, digest) of a move's deduplicated files."""
+        with sqlite3.connect(DB_FILE) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT rel_path, store, digest FROM dedup_files WHERE move_id = ?", (move_id,))
+            return cursor.fetchall()
+
+    def release_dedup(self, move_id: int) -> List[Tuple[str, str]]:
+        """Forget a move's deduplicated files. Returns (store, digest) of the blobs no file uses any more, also forgotten."""
+        with sqlite3.connect(DB_FILE) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT DISTINCT store, digest FROM dedup_files WHERE move_id = ?", (move_id,))
+            touched = cursor.fetchall()
+            cursor.execute("DELETE FROM dedup_files WHERE move_id = ?", (move_id,))
+            orphans = []
+            for store, digest in touched:
+                cursor.execute("SELECT 1 FROM dedup_files WHERE store = ? AND digest = ? LIMIT 1", (store, digest))
+                if cursor.fetchone() is None:
+                    orphans.append((store, digest))
+            cursor.executemany("DELETE FROM dedup_blobs WHERE store = ? AND digest = ?", orphans)
+            conn.commit()
+            return orphans
+
+    def get_dedup_savings(self) -> Tuple[int, int]:
+        """Get (files, bytes) saved by deduplication: every file sharing a blob beyond the first."""
+        with sqlite3.connect(DB_FILE) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT COALESCE(SUM(n - 1), 0), COALESCE(SUM((n - 1) * size), 0)
+                FROM (SELECT size, COUNT(*) AS n FROM dedup_files GROUP BY store, digest)
+            """)
+            return cursor.fetchone()
+
+    def get_dir_sizes(self, roots: List[str]) -> List[Tuple]:
+        """Get cached (path, parent, mtime, own_bytes, subtree_bytes) rows for roots and everything below them."""
+        rows = []
+        with sqlite3.connect(DB_FILE) as conn:
+            cursor = conn.cursor()
+            for root in roots:
+                lo, hi = _subtree_range(root)
+                cursor.execute(
+                    "SELECT * FROM dir_sizes WHERE path = ? OR (path >= ? AND path < ?)",
+                    (root, lo, hi)
+                )
+                rows.extend(cursor.fetchall())
+        return rows
+
+    def get_dir_totals(self, paths: List[str]) -> Dict[str, int]:
+        """Get cached subtree_bytes for the given directories. Unknown paths are left out."""
+        totals = {}
+        with sqlite3.connect(DB_FILE) as conn:
+            cursor = conn.cursor()
+            for path in paths:
+                cursor.execute("SELECT subtree_bytes FROM dir_sizes WHERE path = ?", (path,))
+                row = cursor.fetchone()
+                if row:
+                    totals[path] = row[0]
+        return totals
+
+    def save_dir_sizes(self, rows: List[Tuple], removed: List[str]):
+        """Upsert (path, parent, mtime, own_bytes, subtree_bytes) rows and drop removed subtrees, in one transaction."""
+        with sqlite3.connect(DB_FILE) as conn:
+            cursor = conn.cursor()
+            for path in removed:
+                lo, hi = _subtree_range(path)
+                cursor.execute(
+                    "DELETE FROM dir_sizes WHERE path = ? OR (path >= ? AND path < ?)",
+                    (path, lo, hi)
+                )
+            cursor.executemany("INSERT OR REPLACE INTO dir_sizes VALUES (?, ?, ?, ?, ?)", rows)
+            conn.commit()
+
+def _subtree_range(path: str) -> Tuple[str, str]:
+    """Key range [lo, hi) covering every path strictly below path (index friendly, unlike LIKE)."""
+    prefix = path.rstrip(os.sep) + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
 # Singleton
 storage = Storage()
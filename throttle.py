@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+from typing import Optional
+from logger import get_logger
+
+log = get_logger("throttle")
+
+BURST_SECONDS = 0.25 # A bucket holds this much of its rate: short bursts pass, no long catch-up spurts
+IDLE_AFTER = 120 # Seconds without keyboard/mouse input before the machine counts as idle
+IDLE_CHECK_INTERVAL = 1.0
+MIN_CHUNK = 64 * 1024 # Smallest copy chunk when throttled
+CHUNKS_PER_SECOND = 10 # Throttled copies move about rate / CHUNKS_PER_SECOND bytes per call, so pauses stay short
+
+class TokenBucket:
+    """
+    rate tokens per second, at most burst banked. take() may overdraw: the caller
+    then waits until the debt is paid back, so requests larger than the burst work
+    and concurrent callers queue up fairly.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else rate * BURST_SECONDS
+        self.tokens = 0.0 # Starts empty: a new (or changed) limit holds from the first byte
+        self.last = time.monotonic()
+
+    def take(self, amount: float, now: float) -> float:
+        """Spend amount tokens; returns seconds to wait before going ahead."""
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        self.tokens -= amount
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+def user_idle_seconds() -> Optional[float]:
+    """Seconds since the last keyboard/mouse input (Windows GetLastInputInfo); None where unknown."""
+    if os.name != "nt":
+        return None
+    import ctypes
+    from ctypes import wintypes
+
+    class LASTINPUTINFO(ctypes.Structure):
+        _fields_ = [("cbSize", wintypes.UINT), ("dwTime", wintypes.DWORD)]
+
+    info = LASTINPUTINFO(ctypes.sizeof(LASTINPUTINFO))
+    if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+        return None
+    elapsed = (ctypes.windll.kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF # Tick count wraps after 49 days
+    return elapsed / 1000
+
+class Throttle:
+    """
+    Shared bandwidth (bytes/s) and IOPS cap for every copy thread, as two token
+    buckets. 0 means no limit. With idle_only the caps only hold while someone is
+    using the machine: after IDLE_AFTER seconds without input, copies run at full
+    speed until the user is back. Where idle time is unknown the caps always hold.
+
+    configure() may be called at any time (the Plan tab does, while moves run);
+    threads waiting under the old limits go ahead at once under the new ones.
+    """
+
+    def __init__(self, bytes_per_sec: float = 0, iops: float = 0, idle_only: bool = False):
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._idle_checked = 0.0
+        self._idle = False
+        self.configure(bytes_per_sec, iops, idle_only)
+
+    def configure(self, bytes_per_sec: float = 0, iops: float = 0, idle_only: bool = False):
+        with self._lock:
+            self.bytes_per_sec, self.iops, self.idle_only = max(0, bytes_per_sec), max(0, iops), idle_only
+            self._bytes = TokenBucket(self.bytes_per_sec) if self.bytes_per_sec else None
+            self._ops = TokenBucket(self.iops) if self.iops else None
+            self._changed.notify_all()
+        if self.limited:
+            log.info(f"Copy throttle: {self.bytes_per_sec / 1024**2:.1f} MB/s, {self.iops:.0f} IOPS"
+                     f"{', lifted when idle' if idle_only else ''} (0 = no limit)")
+
+    @property
+    def limited(self) -> bool:
+        return self._bytes is not None or self._ops is not None
+
+    def _user_idle(self, now: float) -> bool:
+        if now - self._idle_checked >= IDLE_CHECK_INTERVAL:
+            self._idle_checked = now
+            try:
+                idle = user_idle_seconds()
+            except Exception:
+                idle = None
+            self._idle = idle is not None and idle >= IDLE_AFTER
+        return self._idle
+
+    def chunk(self, default: int) -> int:
+        """Bytes to move per call: default, or smaller while throttled so each wait is short."""
+        rate = self.bytes_per_sec
+        if not rate or (self.idle_only and self._idle):
+            return default
+        return int(min(default, max(MIN_CHUNK, rate / CHUNKS_PER_SECOND)))
+
+    def consume(self, nbytes: int, ops: int = 1):
+        """Account for nbytes moved in ops I/O operations, sleeping as long as the caps require."""
+        if not self.limited:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if self.idle_only and self._user_idle(now):
+                return
+            wait = 0.0
+            if self._bytes is not None:
+                wait = self._bytes.take(nbytes, now)
+            if self._ops is not None:
+                wait = max(wait, self._ops.take(ops, now))
+            if wait > 0:
+                self._changed.wait(wait) # Returns early when configure() changes the limits
+
+# Applied to every native copy; the Plan tab sets it from the config
+throttle = Throttle()
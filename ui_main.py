@@ -1,75 +1,131 @@
 import sys
 import os
+import time
 import threading
 from PyQt6.QtGui import QPainter, QColor, QBrush, QPen, QIcon
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QPushButton, QLabel, QTableWidget, QTableWidgetItem, QTabWidget,
     QHeaderView, QMessageBox, QTextEdit, QComboBox, QLineEdit, QProgressBar,
-    QCheckBox, QFrame, QGridLayout
+    QCheckBox, QFrame, QGridLayout, QSpinBox, QTreeWidget, QTreeWidgetItem
 )
 import shutil
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QSize
 
-from scanner import scan_installed_apps, scan_folders
-from rules import classify_item
-from mover import move_item, rollback_move, MoverError
+from scanner import iter_scan, GB
+from rules import classify_items
+from sizing import ScanBudget, size_index
+from mover import resume_move, MoverError
+from scheduler import MoveScheduler, rollback_moves
+from planner import plan_moves
+from locks import describe_holders
+from throttle import throttle
 from storage import storage
 from config import cfg
 from ai_client import ai_client
 from models import AppItem, FolderItem, ClassifiedItem
 from logger import get_logger
 from themes import THEMES
-from cleaner import NvidiaCleaner
+from cleaner import JunkCleaner
 
 log = get_logger("UI")
 
 # Workers for heavy tasks
 class ScanWorker(QThread):
+    partial = pyqtSignal(list) # ClassifiedItems, in batches, as soon as they are found
+    sizes_updated = pyqtSignal(dict) # {path: size_gb} once an item's subtree is walked
+    dropped = pyqtSignal(list) # paths of folders that turned out too small to list
     finished = pyqtSignal(list)
 
+    SIZE_BATCH_INTERVAL = 0.1 # seconds; keeps the event loop from being flooded
+
+    def __init__(self):
+        super().__init__()
+        self.first_result_ms = None
+        self.budget = ScanBudget(seconds=cfg.scan_time_budget, max_files=cfg.scan_file_budget)
+
+    def cancel(self):
+        self.budget.cancel()
+
     def run(self):
         log.info("Starting ScanWorker")
-        apps = scan_installed_apps()
-        folders = scan_folders()
-        
+        start = time.perf_counter()
+        # One fresh index per scan: registry apps and AppData folders share the walk
+        size_index.clear()
+        size_index.workers = cfg.scan_workers
+
         results = []
-        for x in apps + folders:
-            c = classify_item(x)
-            results.append(c)
+        sizes = {}
+        last_flush = start
+        for event in iter_scan(size_index, self.budget):
+            kind = event[0]
+            if kind == "items":
+                batch = classify_items(event[1])
+                results.extend(batch)
+                if self.first_result_ms is None:
+                    self.first_result_ms = (time.perf_counter() - start) * 1000
+                    log.info(f"First scan results after {self.first_result_ms:.0f} ms")
+                self.partial.emit(batch)
+            elif kind == "size":
+                sizes[event[1]] = event[2]
+            elif kind == "drop":
+                results = [c for c in results if not (c.item.path == event[1] and c.item.source == "folder_scan")]
+                self.dropped.emit([event[1]])
+
+            now = time.perf_counter()
+            if sizes and now - last_flush >= self.SIZE_BATCH_INTERVAL:
+                self.sizes_updated.emit(sizes)
+                sizes = {}
+                last_flush = now
+        if sizes:
+            self.sizes_updated.emit(sizes)
         
-        log.info(f"Scan finished. Found {len(results)} items.")
+        if self.budget.cancelled:
+            log.info(f"Scan cancelled. Kept {len(results)} items.")
+        log.info(f"Scan finished. Found {len(results)} items in {time.perf_counter() - start:.1f}s.")
         self.finished.emit(results)
 
+def format_duration(seconds) -> str:
+    if seconds is None:
+        return "--"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
 class MoveWorker(QThread):
     progress = pyqtSignal(str)
     progress_percent = pyqtSignal(int)
+    progress_text = pyqtSignal(str) # "42% - Steam: 12.40 GB, 3120 files - 85.3 MB/s - ETA 3m 10s"
     finished = pyqtSignal(bool, str)
 
-    def __init__(self, items, target_root):
+    def __init__(self, items, targets, target_paths=None):
         super().__init__()
         self.items = items
-        self.target_root = target_root
+        self.targets = targets # Target root per item (planner placement)
+        self.target_paths = target_paths # Planned target folder per item (collision-free)
 
     def run(self):
         log.info(f"Starting MoveWorker for {len(self.items)} items")
         errors = []
-        total = len(self.items)
-        
-        for i, c_item in enumerate(self.items):
-            # Emit percent at start of item
-            pct = int((i / total) * 100)
-            self.progress_percent.emit(pct)
-            
-            self.progress.emit(f"Moving {c_item.item.name}...")
-            try:
-                move_item(c_item.item, self.target_root)
-                log.info(f"Moved {c_item.item.name} OK")
-                self.progress.emit(f"Moved {c_item.item.name} OK.")
-            except Exception as e:
-                log.error(f"Failed to move {c_item.item.name}: {e}")
-                errors.append(f"{c_item.item.name}: {str(e)}")
-                self.progress.emit(f"Failed {c_item.item.name}: {e}")
+
+        def job_done(item, error):
+            if error:
+                errors.append(f"{item.name}: {str(error)}")
+                self.progress.emit(f"Failed {item.name}: {error}")
+            else:
+                self.progress.emit(f"Moved {item.name} OK.")
+
+        # Several items at once, smallest first, within per-drive limits.
+        # Progress is weighted by scanned size so one huge folder doesn't sit at 0%.
+        scheduler = MoveScheduler(
+            cfg.target_root,
+            progress=lambda p: self.report(f"{len(self.items)} items", p),
+            on_job_done=job_done
+        )
+        scheduler.run([c.item for c in self.items], self.targets, self.target_paths)
         
         # Done
         self.progress_percent.emit(100)
@@ -79,6 +135,73 @@ class MoveWorker(QThread):
         else:
             self.finished.emit(True, "All moves completed successfully.")
 
+    def report(self, name, p):
+        """Called (throttled) from the copy threads with progress against the expected total."""
+        pct = int(p.fraction * 100)
+        self.progress_percent.emit(pct)
+        self.progress_text.emit(
+            f"{pct}% - {name}: {p.bytes_done / GB:.2f} GB, {p.files_done} files - "
+            f"{p.rate / 1024**2:.1f} MB/s - ETA {format_duration(p.eta)}")
+
+class ResumeWorker(MoveWorker):
+    """Finishes one interrupted move (mover.resume_move), reporting like MoveWorker."""
+
+    def __init__(self, move_id, name):
+        super().__init__([], None)
+        self.move_id = move_id
+        self.name = name
+
+    def run(self):
+        log.info(f"Resuming move {self.move_id}")
+        try:
+            resume_move(self.move_id, progress=lambda p: self.report(self.name, p))
+        except Exception as e:
+            log.error(f"Failed to resume move {self.move_id}: {e}")
+            self.finished.emit(False, f"{self.name}: {e}")
+            return
+        self.progress_percent.emit(100)
+        self.finished.emit(True, f"Resumed move of {self.name} completed successfully.")
+
+class RollbackWorker(MoveWorker):
+    """Rolls back many moves concurrently (scheduler.rollback_moves), reporting like MoveWorker."""
+
+    def __init__(self, move_ids):
+        super().__init__([], None)
+        self.move_ids = move_ids
+
+    def run(self):
+        log.info(f"Rolling back {len(self.move_ids)} moves")
+
+        def job_done(move_id, error):
+            self.progress.emit(f"Rollback of move {move_id} failed: {error}" if error else f"Rolled back move {move_id}.")
+
+        name = f"Rollback of {len(self.move_ids)} moves"
+        results = rollback_moves(self.move_ids, progress=lambda p: self.report(name, p), on_job_done=job_done)
+        errors = [f"Move {move_id}: {error}" for move_id, error in results if error]
+        self.progress_percent.emit(100)
+        if errors:
+            self.finished.emit(False, "\n".join(errors))
+        else:
+            self.finished.emit(True, f"Rolled back {len(results)} moves.")
+
+class PlanWorker(QThread):
+    """Dry run (planner.plan_moves) off the UI thread: walking big folders takes a while."""
+    finished = pyqtSignal(object, bool) # MovePlanReport (None on error), whether to ask to execute it
+
+    def __init__(self, items, target_roots, execute=False):
+        super().__init__()
+        self.items = items
+        self.target_roots = target_roots
+        self.execute = execute
+
+    def run(self):
+        try:
+            report = plan_moves([c.item for c in self.items], self.target_roots)
+        except Exception as e:
+            log.error(f"Dry run failed: {e}")
+            report = None
+        self.finished.emit(report, self.execute)
+
 class AIWorker(QThread):
     finished = pyqtSignal(str)
 
@@ -98,14 +221,37 @@ class NumericSortItem(QTableWidgetItem):
         except:
             return super().__lt__(other)
 
+class JunkScanWorker(QThread):
+    found = pyqtSignal(list) # JunkMatches, in batches, as each folder is sized
+    finished = pyqtSignal(list)
+
+    BATCH_INTERVAL = 0.1 # seconds; keeps the event loop from being flooded
+
+    def run(self):
+        log.info("Starting JunkScanWorker")
+        size_index.workers = cfg.scan_workers
+        results, batch = [], []
+        last_flush = time.perf_counter()
+        for match in JunkCleaner().iter_scan():
+            results.append(match)
+            batch.append(match)
+            now = time.perf_counter()
+            if now - last_flush >= self.BATCH_INTERVAL:
+                self.found.emit(batch)
+                batch = []
+                last_flush = now
+        if batch:
+            self.found.emit(batch)
+        self.finished.emit(results)
+
 class CleanWorker(QThread):
     progress = pyqtSignal(str)
-    finished = pyqtSignal(int, int, int) # deleted, failed, freed_bytes
+    finished = pyqtSignal(int, int, object) # deleted, failed, freed_bytes (object: a C int overflows at 2 GB)
 
     def __init__(self, items):
         super().__init__()
         self.items = items
-        self.cleaner = NvidiaCleaner()
+        self.cleaner = JunkCleaner(profiles=[]) # Deleting needs no profiles
 
     def run(self):
         log.info("Starting CleanWorker")
@@ -121,6 +267,12 @@ class MainWindow(QMainWindow):
         self.resize(1100, 750)
         
         self.classified_items = []
+        self.scan_running = False
+        self.moving = False # A dry run, move, resume or rollback is running
+        self.scan_pending = set() # paths whose size is still provisional
+        self.scan_size_cells = {} # path -> [(ClassifiedItem, size cell)] for in-place updates
+        self.junk_items = []
+        self.junk_groups = {}
         
         # Apply Base Styling
         self.apply_theme()
@@ -220,11 +372,17 @@ class MainWindow(QMainWindow):
         controls_layout.addWidget(QLabel("Units:"))
         controls_layout.addWidget(self.combo_unit)
 
-        btn_scan = QPushButton("SCAN C: DRIVE")
-        btn_scan.setProperty("cssClass", "primary")
-        btn_scan.setMinimumHeight(36)
-        btn_scan.clicked.connect(self.start_scan)
-        controls_layout.addWidget(btn_scan)
+        self.btn_scan = QPushButton("SCAN C: DRIVE")
+        self.btn_scan.setProperty("cssClass", "primary")
+        self.btn_scan.setMinimumHeight(36)
+        self.btn_scan.clicked.connect(self.start_scan)
+        controls_layout.addWidget(self.btn_scan)
+
+        self.btn_cancel_scan = QPushButton("CANCEL")
+        self.btn_cancel_scan.setMinimumHeight(36)
+        self.btn_cancel_scan.setEnabled(False)
+        self.btn_cancel_scan.clicked.connect(self.cancel_scan)
+        controls_layout.addWidget(self.btn_cancel_scan)
         
         layout.addLayout(controls_layout)
         
@@ -263,12 +421,37 @@ class MainWindow(QMainWindow):
         
         # Target Selector
         target_box = QHBoxLayout()
-        target_box.addWidget(QLabel("Target Root:"))
-        self.entry_root_display = QLineEdit(cfg.target_root)
+        target_box.addWidget(QLabel("Target Roots:"))
+        self.entry_root_display = QLineEdit("; ".join(cfg.target_roots))
         self.entry_root_display.setReadOnly(True)
         target_box.addWidget(self.entry_root_display)
         # Browse button could go here
         layout.addLayout(target_box)
+
+        # Copy speed limit; takes effect immediately, also during a move
+        throttle_box = QHBoxLayout()
+        throttle_box.addWidget(QLabel("Speed Limit:"))
+        self.spin_throttle_mbps = QSpinBox()
+        self.spin_throttle_mbps.setRange(0, 10000)
+        self.spin_throttle_mbps.setSuffix(" MB/s")
+        self.spin_throttle_mbps.setSpecialValueText("No MB/s limit")
+        self.spin_throttle_mbps.setValue(cfg.throttle_mbps)
+        throttle_box.addWidget(self.spin_throttle_mbps)
+        self.spin_throttle_iops = QSpinBox()
+        self.spin_throttle_iops.setRange(0, 100000)
+        self.spin_throttle_iops.setSuffix(" IOPS")
+        self.spin_throttle_iops.setSpecialValueText("No IOPS limit")
+        self.spin_throttle_iops.setValue(cfg.throttle_iops)
+        throttle_box.addWidget(self.spin_throttle_iops)
+        self.chk_throttle_idle = QCheckBox("Full speed when the PC is idle")
+        self.chk_throttle_idle.setChecked(cfg.throttle_idle_only)
+        throttle_box.addWidget(self.chk_throttle_idle)
+        throttle_box.addStretch()
+        self.spin_throttle_mbps.valueChanged.connect(self.on_throttle_changed)
+        self.spin_throttle_iops.valueChanged.connect(self.on_throttle_changed)
+        self.chk_throttle_idle.toggled.connect(self.on_throttle_changed)
+        layout.addLayout(throttle_box)
+        self.apply_throttle()
         
         # Table
         self.plan_table = QTableWidget()
@@ -278,6 +461,12 @@ class MainWindow(QMainWindow):
         self.plan_table.verticalHeader().setVisible(False)
         self.plan_table.setAlternatingRowColors(True)
         layout.addWidget(self.plan_table)
+
+        # Dry run result: sizes, free space, collisions, estimated time
+        self.plan_summary = QLabel("Run a dry run to see sizes, free space and estimated time.")
+        self.plan_summary.setProperty("cssClass", "subtitle")
+        self.plan_summary.setWordWrap(True)
+        layout.addWidget(self.plan_summary)
         
         # Footer Actions
         footer = QHBoxLayout()
@@ -287,12 +476,17 @@ class MainWindow(QMainWindow):
         self.move_progress.setValue(0)
         footer.addWidget(self.move_progress)
         
-        btn_exec = QPushButton("EXECUTE MOVE PLAN")
-        btn_exec.setProperty("cssClass", "primary")
-        btn_exec.setMinimumHeight(40)
-        btn_exec.setMinimumWidth(200)
-        btn_exec.clicked.connect(self.execute_moves)
-        footer.addWidget(btn_exec)
+        self.btn_dry = QPushButton("DRY RUN")
+        self.btn_dry.setMinimumHeight(40)
+        self.btn_dry.clicked.connect(self.preview_moves)
+        footer.addWidget(self.btn_dry)
+
+        self.btn_exec = QPushButton("EXECUTE MOVE PLAN")
+        self.btn_exec.setProperty("cssClass", "primary")
+        self.btn_exec.setMinimumHeight(40)
+        self.btn_exec.setMinimumWidth(200)
+        self.btn_exec.clicked.connect(self.execute_moves)
+        footer.addWidget(self.btn_exec)
         
         layout.addLayout(footer)
         self.tabs.addTab(tab, "  Plan & Move")
@@ -308,10 +502,31 @@ class MainWindow(QMainWindow):
         h_ctrl = QHBoxLayout()
         h_ctrl.addWidget(QLabel("Move History Log"))
         h_ctrl.addStretch()
+        self.lbl_dedup = QLabel("")
+        h_ctrl.addWidget(self.lbl_dedup)
         btn_ref = QPushButton("Refresh")
         btn_ref.clicked.connect(self.load_history)
         h_ctrl.addWidget(btn_ref)
         layout.addLayout(h_ctrl)
+
+        # Batch rollback: the selected rows, or every active move matching the filters
+        h_batch = QHBoxLayout()
+        self.btn_rb_selected = QPushButton("Rollback Selected")
+        self.btn_rb_selected.clicked.connect(self.rollback_selected)
+        h_batch.addWidget(self.btn_rb_selected)
+        h_batch.addStretch()
+        h_batch.addWidget(QLabel("Target under:"))
+        self.entry_rb_target = QLineEdit()
+        self.entry_rb_target.setPlaceholderText("e.g. D:\\")
+        h_batch.addWidget(self.entry_rb_target)
+        h_batch.addWidget(QLabel("Moved since:"))
+        self.entry_rb_since = QLineEdit()
+        self.entry_rb_since.setPlaceholderText("YYYY-MM-DD")
+        h_batch.addWidget(self.entry_rb_since)
+        self.btn_rb_matching = QPushButton("Rollback Matching")
+        self.btn_rb_matching.clicked.connect(self.rollback_matching)
+        h_batch.addWidget(self.btn_rb_matching)
+        layout.addLayout(h_batch)
         
         self.history_table = QTableWidget()
         self.history_table.setColumnCount(5)
@@ -319,7 +534,15 @@ class MainWindow(QMainWindow):
         self.history_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
         self.history_table.verticalHeader().setVisible(False)
         self.history_table.setAlternatingRowColors(True)
+        self.history_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.history_table.setSelectionMode(QTableWidget.SelectionMode.ExtendedSelection)
         layout.addWidget(self.history_table)
+
+        # What verification cost so far, per category and level (Settings picks the level)
+        self.lbl_verify_cost = QLabel("")
+        self.lbl_verify_cost.setWordWrap(True)
+        self.lbl_verify_cost.setStyleSheet("color: #8D99AE;")
+        layout.addWidget(self.lbl_verify_cost)
         
         self.tabs.addTab(tab, "  History")
 
@@ -366,7 +589,7 @@ class MainWindow(QMainWindow):
         banner = QFrame()
         banner.setStyleSheet("background-color: #331100; border: 1px solid #FF5500; border-radius: 6px;")
         bloc = QHBoxLayout()
-        lbl_warn = QLabel("⚠️  NVIDIA Junk Cleaner: Removes old driver installers and cache files.")
+        lbl_warn = QLabel("⚠️  Junk Cleaner: Removes old driver installers, browser and developer caches, temp files and crash dumps.")
         lbl_warn.setStyleSheet("color: #FF8800; font-weight: bold; border: none;")
         bloc.addWidget(lbl_warn)
         banner.setLayout(bloc)
@@ -380,15 +603,15 @@ class MainWindow(QMainWindow):
         ctrl.addStretch()
         
         btn_scan = QPushButton("Scan Junk")
-        btn_scan.clicked.connect(self.scan_nvidia_junk)
+        btn_scan.clicked.connect(self.scan_junk)
         ctrl.addWidget(btn_scan)
         layout.addLayout(ctrl)
         
-        # List
-        self.clean_list = QTableWidget()
+        # Matches grouped by profile; unchecked profiles are left alone
+        self.clean_list = QTreeWidget()
         self.clean_list.setColumnCount(3)
-        self.clean_list.setHorizontalHeaderLabels(["Path", "Size", "Status"])
-        self.clean_list.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.clean_list.setHeaderLabels(["Profile / Path", "Size", "Status"])
+        self.clean_list.header().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
         layout.addWidget(self.clean_list)
         
         # Action
@@ -396,9 +619,9 @@ class MainWindow(QMainWindow):
         self.clean_progress = QProgressBar()
         act_box.addWidget(self.clean_progress)
         
-        btn_clean = QPushButton("CLEAN ALL")
+        btn_clean = QPushButton("CLEAN SELECTED")
         btn_clean.setProperty("cssClass", "danger")
-        btn_clean.clicked.connect(self.clean_nvidia_junk)
+        btn_clean.clicked.connect(self.clean_junk)
         act_box.addWidget(btn_clean)
         
         layout.addLayout(act_box)
@@ -418,11 +641,58 @@ class MainWindow(QMainWindow):
         l_store.setContentsMargins(0,0,0,0)
         grp_store.setLayout(l_store)
         
-        l_store.addWidget(QLabel("Target Drive Root"))
+        l_store.addWidget(QLabel("Target Drive Roots (separate several with ;)"))
         self.entry_root = QLineEdit()
         l_store.addWidget(self.entry_root)
         layout.addWidget(grp_store)
         
+        # Group: Performance
+        layout.addWidget(QLabel("Scan Threads"))
+        self.spin_workers = QSpinBox()
+        self.spin_workers.setRange(1, 32)
+        layout.addWidget(self.spin_workers)
+        
+        budget_grid = QGridLayout()
+        budget_grid.addWidget(QLabel("Scan Time Limit (s, 0 = none):"), 0, 0)
+        self.spin_time_budget = QSpinBox()
+        self.spin_time_budget.setRange(0, 24 * 3600)
+        budget_grid.addWidget(self.spin_time_budget, 0, 1)
+        budget_grid.addWidget(QLabel("Scan File Limit (0 = none):"), 1, 0)
+        self.spin_file_budget = QSpinBox()
+        self.spin_file_budget.setRange(0, 2_000_000_000)
+        self.spin_file_budget.setSingleStep(100000)
+        budget_grid.addWidget(self.spin_file_budget, 1, 1)
+        layout.addLayout(budget_grid)
+        
+        copy_grid = QGridLayout()
+        copy_grid.addWidget(QLabel("Copy Engine:"), 0, 0)
+        self.combo_copy_backend = QComboBox()
+        self.combo_copy_backend.addItems(["native", "robocopy"])
+        copy_grid.addWidget(self.combo_copy_backend, 0, 1)
+        copy_grid.addWidget(QLabel("Copy Threads:"), 1, 0)
+        self.spin_copy_workers = QSpinBox()
+        self.spin_copy_workers.setRange(1, 64)
+        copy_grid.addWidget(self.spin_copy_workers, 1, 1)
+        copy_grid.addWidget(QLabel("Parallel Moves:"), 2, 0)
+        self.spin_move_jobs = QSpinBox()
+        self.spin_move_jobs.setRange(1, 16)
+        copy_grid.addWidget(self.spin_move_jobs, 2, 1)
+        copy_grid.addWidget(QLabel("Parallel Moves per SSD:"), 3, 0)
+        self.spin_jobs_per_device = QSpinBox()
+        self.spin_jobs_per_device.setRange(1, 16)
+        copy_grid.addWidget(self.spin_jobs_per_device, 3, 1)
+        copy_grid.addWidget(QLabel("Verify Copies:"), 4, 0)
+        self.combo_verify = QComboBox()
+        self.combo_verify.addItems(["full", "sampled", "fast"])
+        copy_grid.addWidget(self.combo_verify, 4, 1)
+        copy_grid.addWidget(QLabel("Files In Use:"), 5, 0)
+        self.combo_locked = QComboBox()
+        self.combo_locked.addItems(["reject", "defer", "ignore"])
+        copy_grid.addWidget(self.combo_locked, 5, 1)
+        self.chk_dedup = QCheckBox("Store identical files once per target drive (hardlinks)")
+        copy_grid.addWidget(self.chk_dedup, 6, 0, 1, 2)
+        layout.addLayout(copy_grid)
+        
         # Group: AI
         layout.addWidget(QLabel("AI Configuration"))
         self.combo_mode = QComboBox()
@@ -460,7 +730,14 @@ class MainWindow(QMainWindow):
     # --- LOGIC METHODS (Mostly unchanged, just linked to new UI elements) ---
     def update_dashboard(self):
         try:
-            total, used, free = shutil.disk_usage(cfg.target_root if os.path.exists(cfg.target_root) else "C:\\")
+            # Every target drive counted once, however many roots it holds
+            usage = {}
+            for root in cfg.target_roots:
+                if os.path.exists(root):
+                    usage[os.stat(root).st_dev] = shutil.disk_usage(root)
+            if not usage:
+                usage[None] = shutil.disk_usage("C:\\")
+            total, used, free = (sum(u[n] for u in usage.values()) for n in range(3))
             u = cfg.size_unit
             div = 1024**3 if u == "GB" else 1024**2
             
@@ -471,18 +748,70 @@ class MainWindow(QMainWindow):
             log.error(f"Dash Error: {e}")
 
     def start_scan(self):
-        self.setEnabled(False)
+        # Only the scan button is locked; rows stream into the table while the scan runs
+        self.btn_scan.setEnabled(False)
+        self.btn_cancel_scan.setEnabled(True)
+        self.scan_running = True
+        self.classified_items = []
+        self.scan_pending = set()
+        self.scan_size_cells = {}
+        self.scan_table.setSortingEnabled(False)
         self.scan_table.setRowCount(0)
         self.scan_worker = ScanWorker()
+        self.scan_worker.partial.connect(self.on_scan_partial)
+        self.scan_worker.sizes_updated.connect(self.on_scan_sizes)
+        self.scan_worker.dropped.connect(self.on_scan_dropped)
         self.scan_worker.finished.connect(self.on_scan_finished)
         self.scan_worker.start()
 
+    def cancel_scan(self):
+        # Cooperative: the walk stops at the next folder and keeps what it has
+        self.btn_cancel_scan.setEnabled(False)
+        self.scan_worker.cancel()
+
+    def on_scan_partial(self, batch):
+        self.classified_items.extend(batch)
+        for c in batch:
+            self.scan_pending.add(c.item.path)
+            row = self.scan_table.rowCount()
+            self.scan_table.insertRow(row)
+            self.fill_scan_row(row, c)
+        self.filter_scan_table(self.search_bar.text())
+
+    def on_scan_sizes(self, sizes):
+        for path, size_gb in sizes.items():
+            self.scan_pending.discard(path)
+            for c, cell in self.scan_size_cells.get(path, []):
+                self.set_size_cell(cell, c.item.size_gb, lower_bound=c.item.size_is_lower_bound)
+
+    def on_scan_dropped(self, paths):
+        for path in paths:
+            self.scan_pending.discard(path)
+            keep = []
+            for c, cell in self.scan_size_cells.pop(path, []):
+                if c.item.source == "folder_scan":
+                    self.scan_table.removeRow(self.scan_table.row(cell))
+                    self.classified_items.remove(c)
+                else:
+                    keep.append((c, cell))
+            if keep:
+                self.scan_size_cells[path] = keep
+
     def on_scan_finished(self, results):
-        self.setEnabled(True)
+        self.btn_scan.setEnabled(True)
+        self.btn_cancel_scan.setEnabled(False)
+        self.scan_running = False
+        self.scan_pending = set()
         self.classified_items = results
         self.refresh_scan_table()
         self.refresh_plan_table()
-        QMessageBox.information(self, "Scan Complete", f"Found {len(results)} items.")
+        first_ms = self.scan_worker.first_result_ms
+        first = f"\nFirst results appeared after {first_ms / 1000:.1f}s." if first_ms is not None else ""
+        partial = sum(1 for c in results if c.item.size_is_lower_bound)
+        if partial:
+            first += f"\n{partial} sizes are lower bounds (≥), the scan stopped before walking them fully."
+        title = "Scan Cancelled" if self.scan_worker.budget.cancelled else "Scan Complete"
+        QMessageBox.information(self, title, f"Found {len(results)} items.{first}")
 
     def on_unit_changed(self, text):
         cfg.size_unit = text
@@ -492,31 +821,48 @@ class MainWindow(QMainWindow):
 
     def refresh_scan_table(self):
         self.scan_table.setSortingEnabled(False)
+        self.scan_size_cells = {}
         self.scan_table.setRowCount(len(self.classified_items))
         for i, c in enumerate(self.classified_items):
-            # Name
-            self.scan_table.setItem(i, 0, QTableWidgetItem(c.item.name))
-            
-            # Size
-            size_item = NumericSortItem(self.format_size(c.item.size_gb))
-            size_item.setData(Qt.ItemDataRole.UserRole, c.item.size_gb)
-            self.scan_table.setItem(i, 1, size_item)
-            
-            # Type
-            self.scan_table.setItem(i, 2, QTableWidgetItem(c.item.type))
-            
-            # Category (Pill)
-            cat_item = QTableWidgetItem(c.category)
-            # Simple colorizing for now (Advanced pill needs Delegate)
-            if c.category == "SAFE":
-                cat_item.setForeground(QColor("#06D6A0")) # Green
-            elif c.category == "FORBIDDEN":
-                cat_item.setForeground(QColor("#E63946")) # Red
-            self.scan_table.setItem(i, 3, cat_item)
-            
-            # Reason
-            self.scan_table.setItem(i, 4, QTableWidgetItem(c.reason))
-        self.scan_table.setSortingEnabled(True)
+            self.fill_scan_row(i, c)
+        # Sorting would move rows under our feet while results are still streaming in
+        self.scan_table.setSortingEnabled(not self.scan_running)
+        self.filter_scan_table(self.search_bar.text())
+
+    def fill_scan_row(self, i, c):
+        # Name
+        self.scan_table.setItem(i, 0, QTableWidgetItem(c.item.name))
+        
+        # Size
+        size_item = NumericSortItem()
+        self.set_size_cell(size_item, c.item.size_gb, c.item.path in self.scan_pending, c.item.size_is_lower_bound)
+        self.scan_table.setItem(i, 1, size_item)
+        self.scan_size_cells.setdefault(c.item.path, []).append((c, size_item))
+        
+        # Type
+        self.scan_table.setItem(i, 2, QTableWidgetItem(c.item.type))
+        
+        # Category (Pill)
+        cat_item = QTableWidgetItem(c.category)
+        # Simple colorizing for now (Advanced pill needs Delegate)
+        if c.category == "SAFE":
+            cat_item.setForeground(QColor("#06D6A0")) # Green
+        elif c.category == "FORBIDDEN":
+            cat_item.setForeground(QColor("#E63946")) # Red
+        self.scan_table.setItem(i, 3, cat_item)
+        
+        # Reason
+        self.scan_table.setItem(i, 4, QTableWidgetItem(c.reason))
+
+    def set_size_cell(self, cell, size_gb, provisional=False, lower_bound=False):
+        # Provisional sizes come from the previous scan and are refined once the folder is walked
+        if provisional:
+            cell.setText(f"≈ {self.format_size(size_gb)}")
+            cell.setForeground(QColor("#888888"))
+        else:
+            cell.setText(self.format_item_size(size_gb, lower_bound))
+            cell.setData(Qt.ItemDataRole.ForegroundRole, None)
+        cell.setData(Qt.ItemDataRole.UserRole, size_gb)
 
     def refresh_plan_table(self):
         self.plan_table.setSortingEnabled(False)
@@ -529,7 +875,7 @@ class MainWindow(QMainWindow):
             chk.setData(Qt.ItemDataRole.UserRole, c)
             self.plan_table.setItem(i, 0, chk)
             self.plan_table.setItem(i, 1, QTableWidgetItem(c.item.name))
-            self.plan_table.setItem(i, 2, QTableWidgetItem(self.format_size(c.item.size_gb)))
+            self.plan_table.setItem(i, 2, QTableWidgetItem(self.format_item_size(c.item.size_gb, c.item.size_is_lower_bound)))
             self.plan_table.setItem(i, 3, QTableWidgetItem(c.item.path))
         self.plan_table.setSortingEnabled(True)
     
@@ -543,34 +889,144 @@ class MainWindow(QMainWindow):
             else:
                 self.scan_table.setRowHidden(i, True)
 
-    def execute_moves(self):
+    def apply_throttle(self):
+        throttle.configure(cfg.throttle_mbps * 1024**2, cfg.throttle_iops, cfg.throttle_idle_only)
+
+    def on_throttle_changed(self, *_):
+        cfg.throttle_mbps = self.spin_throttle_mbps.value()
+        cfg.throttle_iops = self.spin_throttle_iops.value()
+        cfg.throttle_idle_only = self.chk_throttle_idle.isChecked()
+        self.apply_throttle()
+
+    def selected_plan_items(self):
         items = []
         for i in range(self.plan_table.rowCount()):
             it = self.plan_table.item(i, 0)
             if it.checkState() == Qt.CheckState.Checked:
                 items.append(it.data(Qt.ItemDataRole.UserRole))
-        
+        return items
+
+    def preview_moves(self):
+        self.start_plan(execute=False)
+
+    def execute_moves(self):
+        # Always dry run first; the confirmation shows its result
+        self.start_plan(execute=True)
+
+    def start_plan(self, execute):
+        items = self.selected_plan_items()
         if not items:
             QMessageBox.warning(self, "No Selection", "Select items to move.")
             return
+        self.set_moving(True)
+        self.plan_summary.setText(f"Dry run: measuring {len(items)} items...")
+        self.plan_items = items
+        self.plan_worker = PlanWorker(items, cfg.target_roots, execute)
+        self.plan_worker.finished.connect(self.on_plan_ready)
+        self.plan_worker.start()
 
-        if QMessageBox.question(self, "Confirm", f"Move {len(items)} items?") != QMessageBox.StandardButton.Yes:
+    def describe_plan(self, report):
+        lines = []
+        for p in report.items:
+            if p.blocked:
+                lines.append(f"SKIP {p.item.name}: {p.blocked}")
+                continue
+            how = {"rename": "rename (same drive)", "resume": f"resume move #{p.resume_of}"}.get(p.method, "copy")
+            line = (f"{p.item.name}: {p.files:,} files, {self.format_size(p.bytes / GB)} -> {p.target_path} "
+                    f"[{how}, ~{format_duration(p.seconds)}]")
+            if p.collision:
+                line += " (name taken, renamed)"
+            if p.unreadable:
+                line += f" ({p.unreadable} unreadable entries)"
+            if p.holders:
+                line += f" - IN USE by {describe_holders(p.holders)}"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def set_moving(self, busy):
+        """Only the move and rollback actions are locked while one runs; the throttle stays adjustable."""
+        self.moving = busy
+        for btn in (self.btn_dry, self.btn_exec, self.btn_rb_selected, self.btn_rb_matching):
+            btn.setEnabled(not busy)
+        for i in range(self.history_table.rowCount()):
+            btn = self.history_table.cellWidget(i, 4)
+            if btn:
+                btn.setEnabled(not busy)
+
+    def on_plan_ready(self, report, execute):
+        self.set_moving(False)
+        if report is None:
+            self.plan_summary.setText("Dry run failed, see the log.")
+            QMessageBox.critical(self, "Error", "Dry run failed, see the log.")
+            return
+        model = report.model
+        basis = f"{model.samples} past copies" if model.samples >= model.MIN_SAMPLES else "default speed, no move history yet"
+        summary = f"{report.summary()}. Estimated time: ~{format_duration(report.seconds)} ({basis})."
+        if report.collisions:
+            summary += f" {len(report.collisions)} name collisions."
+        if report.locked:
+            how = {"defer": "will be retried later", "reject": "will be refused"}.get(cfg.locked_files, "")
+            summary += f" {len(report.locked)} items have files in use ({how}): " + \
+                ", ".join(p.item.name for p in report.locked) + "."
+        if not report.fits:
+            summary += " NOT ENOUGH FREE SPACE on the target."
+        self.plan_summary.setText(summary)
+        if not execute:
             return
 
-        self.setEnabled(False)
+        if not report.movable:
+            QMessageBox.warning(self, "Nothing to Move", self.describe_plan(report))
+            return
+        if not report.fits:
+            QMessageBox.critical(self, "Not Enough Space",
+                                 f"{summary}\n\nFree up space on {', '.join(report.short_roots())}, "
+                                 f"add another target root or deselect some items.")
+            return
+
+        box = QMessageBox(self)
+        box.setWindowTitle("Confirm")
+        box.setIcon(QMessageBox.Icon.Question)
+        box.setText(f"Move {len(report.movable)} items?\n\n{summary}")
+        box.setDetailedText(self.describe_plan(report))
+        box.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if box.exec() != QMessageBox.StandardButton.Yes:
+            return
+
+        roots = {id(p.item): p.target_root for p in report.movable}
+        paths = {id(p.item): p.target_path for p in report.movable}
+        items = [c for c in self.plan_items if id(c.item) in roots]
+
+        self.set_moving(True)
         self.move_progress.setValue(0)
-        self.move_worker = MoveWorker(items, cfg.target_root)
+        self.move_progress.setFormat("%p%")
+        self.move_progress.setTextVisible(True)
+        self.move_worker = MoveWorker(items, [roots[id(c.item)] for c in items], [paths[id(c.item)] for c in items])
         self.move_worker.progress_percent.connect(self.move_progress.setValue)
+        self.move_worker.progress_text.connect(self.move_progress.setFormat)
         self.move_worker.finished.connect(self.on_move_finished)
         self.move_worker.start()
 
     def on_move_finished(self, success, msg):
-        self.setEnabled(True)
+        self.set_moving(False)
         if success: QMessageBox.information(self, "Done", msg)
         else: QMessageBox.critical(self, "Error", msg)
         self.load_history()
 
+    def describe_verify_costs(self, costs):
+        if not costs:
+            return ""
+        parts = []
+        for category, level, moves, files, bytes_read, verify_seconds, transfer_seconds in costs:
+            # verify_seconds is summed over the verify threads, so it can exceed the move time
+            share = f", {verify_seconds / transfer_seconds * 100:.0f}% of move time" if transfer_seconds else ""
+            parts.append(f"{category or 'Other'} ({level}): {moves} moves, {files} files, "
+                         f"{self.format_size((bytes_read or 0) / GB)} read{share}")
+        return "Verification cost: " + "; ".join(parts)
+
     def load_history(self):
+        files, saved = storage.get_dedup_savings()
+        self.lbl_dedup.setText(f"Dedup saved {self.format_size(saved / GB)} ({files} files)" if files else "")
+        self.lbl_verify_cost.setText(self.describe_verify_costs(storage.get_verify_costs()))
         moves = storage.get_history()
         self.history_table.setRowCount(len(moves))
         for i, row in enumerate(moves):
@@ -583,6 +1039,10 @@ class MainWindow(QMainWindow):
             # status item styling
             s_item = QTableWidgetItem(stat)
             if stat == "OK": s_item.setForeground(QColor("#06D6A0"))
+            elif stat == "INTERRUPTED":
+                files_done, files_total, _, _ = storage.get_move_progress(row[0])
+                s_item.setText(f"INTERRUPTED ({files_done}/{files_total} files)")
+                s_item.setForeground(QColor("#FFB703"))
             else: s_item.setForeground(QColor("#E63946"))
             self.history_table.setItem(i, 3, s_item)
 
@@ -590,18 +1050,65 @@ class MainWindow(QMainWindow):
                 btn = QPushButton("Rollback")
                 btn.setFlat(True)
                 btn.setStyleSheet("color: #E63946; font-weight: bold; text-decoration: underline;")
-                btn.clicked.connect(lambda _, m=row[0]: self.do_rollback(m))
+                btn.clicked.connect(lambda _, m=row[0]: self.do_rollback([m]))
+                btn.setEnabled(not self.moving)
+                self.history_table.setCellWidget(i, 4, btn)
+            elif stat == "INTERRUPTED":
+                btn = QPushButton("Resume")
+                btn.setFlat(True)
+                btn.setStyleSheet("color: #FFB703; font-weight: bold; text-decoration: underline;")
+                btn.clicked.connect(lambda _, m=row[0], src=row[1]: self.do_resume(m, os.path.basename(src)))
+                btn.setEnabled(not self.moving)
                 self.history_table.setCellWidget(i, 4, btn)
             else:
                 self.history_table.setItem(i, 4, QTableWidgetItem("-"))
 
-    def do_rollback(self, mid):
-        try:
-            rollback_move(mid)
-            QMessageBox.information(self, "Success", "Rollback complete.")
-            self.load_history()
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+    def do_resume(self, mid, name):
+        if QMessageBox.question(self, "Confirm", f"Resume moving {name}?") != QMessageBox.StandardButton.Yes:
+            return
+        self.set_moving(True)
+        self.move_progress.setValue(0)
+        self.move_progress.setFormat("%p%")
+        self.move_progress.setTextVisible(True)
+        self.move_worker = ResumeWorker(mid, name)
+        self.move_worker.progress_percent.connect(self.move_progress.setValue)
+        self.move_worker.progress_text.connect(self.move_progress.setFormat)
+        self.move_worker.finished.connect(self.on_move_finished)
+        self.move_worker.start()
+
+    def rollback_selected(self):
+        rows = sorted({index.row() for index in self.history_table.selectedIndexes()})
+        ids = [int(self.history_table.item(r, 0).text()) for r in rows]
+        if not ids:
+            QMessageBox.warning(self, "No Selection", "Select moves to roll back.")
+            return
+        self.do_rollback(ids)
+
+    def rollback_matching(self):
+        target = self.entry_rb_target.text().strip() or None
+        since = self.entry_rb_since.text().strip() or None
+        if not target and not since:
+            QMessageBox.warning(self, "No Filter", "Enter a target folder and/or a date.")
+            return
+        ids = [row[0] for row in storage.find_moves(status="OK", target_root=target, since=since)]
+        if not ids:
+            QMessageBox.information(self, "Nothing Found", "No active moves match these filters.")
+            return
+        self.do_rollback(ids)
+
+    def do_rollback(self, ids):
+        what = f"move {ids[0]}" if len(ids) == 1 else f"{len(ids)} moves"
+        if QMessageBox.question(self, "Confirm", f"Roll back {what}?") != QMessageBox.StandardButton.Yes:
+            return
+        self.set_moving(True)
+        self.move_progress.setValue(0)
+        self.move_progress.setFormat("%p%")
+        self.move_progress.setTextVisible(True)
+        self.move_worker = RollbackWorker(ids)
+        self.move_worker.progress_percent.connect(self.move_progress.setValue)
+        self.move_worker.progress_text.connect(self.move_progress.setFormat)
+        self.move_worker.finished.connect(self.on_move_finished)
+        self.move_worker.start()
 
     def ask_ai_scan(self):
         if not self.classified_items:
@@ -617,21 +1124,50 @@ class MainWindow(QMainWindow):
         self.setEnabled(True)
         self.chat_area.append(f"\n{resp}\n")
 
-    def scan_nvidia_junk(self):
-        cleaner = NvidiaCleaner()
-        self.nvidia_junk_items, size = cleaner.scan()
-        self.clean_list.setRowCount(len(self.nvidia_junk_items))
-        for i, it in enumerate(self.nvidia_junk_items):
-            self.clean_list.setItem(i, 0, QTableWidgetItem(it["path"]))
-            self.clean_list.setItem(i, 1, QTableWidgetItem(self.format_size(it["size"]/(1024**3))))
-            self.clean_list.setItem(i, 2, QTableWidgetItem("Found"))
-        self.lbl_clean_summary.setText(f"Found {len(self.nvidia_junk_items)} items ({self.format_size(size/(1024**3))}).")
-
-    def clean_nvidia_junk(self):
-        if not self.nvidia_junk_items: return
+    def scan_junk(self):
+        self.junk_items = []
+        self.junk_groups = {} # profile -> (tree item, [matches])
+        self.clean_list.clear()
+        self.lbl_clean_summary.setText("Scanning junk profiles...")
+        self.junk_worker = JunkScanWorker()
+        self.junk_worker.found.connect(self.on_junk_found)
+        self.junk_worker.finished.connect(self.on_junk_scan_finished)
+        self.junk_worker.start()
+
+    def on_junk_found(self, batch):
+        for m in batch:
+            if m.profile not in self.junk_groups:
+                group = QTreeWidgetItem([m.profile, "", ""])
+                group.setFlags(group.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+                group.setCheckState(0, Qt.CheckState.Checked)
+                self.clean_list.addTopLevelItem(group)
+                group.setExpanded(True)
+                self.junk_groups[m.profile] = (group, [])
+            group, matches = self.junk_groups[m.profile]
+            matches.append(m)
+            group.addChild(QTreeWidgetItem([m.path, self.format_item_size(m.size / GB, not m.exact), "Found"]))
+            group.setText(1, self.format_size(sum(x.size for x in matches) / GB))
+            group.setText(2, f"{len(matches)} items")
+        self.junk_items.extend(batch)
+        total = sum(m.size for m in self.junk_items)
+        self.lbl_clean_summary.setText(f"Scanning... {len(self.junk_items)} items ({self.format_size(total / GB)}).")
+
+    def on_junk_scan_finished(self, results):
+        self.junk_items = results
+        total = sum(m.size for m in results)
+        self.lbl_clean_summary.setText(f"Found {len(results)} items in {len(self.junk_groups)} profiles "
+                                       f"({self.format_size(total / GB)}).")
+
+    def selected_junk(self):
+        return [m for group, matches in self.junk_groups.values()
+                if group.checkState(0) == Qt.CheckState.Checked for m in matches]
+
+    def clean_junk(self):
+        items = self.selected_junk()
+        if not items: return
         self.setEnabled(False)
         self.clean_progress.setRange(0, 0)
-        self.clean_worker = CleanWorker(self.nvidia_junk_items)
+        self.clean_worker = CleanWorker(items)
         self.clean_worker.finished.connect(self.on_clean_finished)
         self.clean_worker.start()
 
@@ -639,22 +1175,46 @@ class MainWindow(QMainWindow):
         self.setEnabled(True)
         self.clean_progress.setRange(0, 100)
         self.clean_progress.setValue(100)
-        QMessageBox.information(self, "Cleaned", f"Deleted {d}, Failed {f}")
-        self.scan_nvidia_junk()
+        QMessageBox.information(self, "Cleaned", f"Deleted {d}, Failed {f}, Freed {self.format_size(b / GB)}")
+        self.scan_junk()
 
     def on_theme_changed(self, t):
         cfg.theme = t
         self.apply_theme()
 
     def load_config_to_ui(self):
-        self.entry_root.setText(cfg.target_root)
+        self.entry_root.setText("; ".join(cfg.target_roots))
+        self.spin_workers.setValue(cfg.scan_workers)
+        self.spin_time_budget.setValue(cfg.scan_time_budget)
+        self.spin_file_budget.setValue(cfg.scan_file_budget)
+        idx = self.combo_copy_backend.findText(cfg.copy_backend)
+        if idx >= 0: self.combo_copy_backend.setCurrentIndex(idx)
+        self.spin_copy_workers.setValue(cfg.copy_workers)
+        self.spin_move_jobs.setValue(cfg.move_jobs)
+        idx = self.combo_verify.findText(cfg.verify_level)
+        if idx >= 0: self.combo_verify.setCurrentIndex(idx)
+        self.spin_jobs_per_device.setValue(cfg.move_jobs_per_device)
+        idx = self.combo_locked.findText(cfg.locked_files)
+        if idx >= 0: self.combo_locked.setCurrentIndex(idx)
+        self.chk_dedup.setChecked(cfg.dedup)
         self.entry_key.setText(cfg.cloud_config.get("api_key", ""))
         self.entry_url.setText(cfg.local_config.get("base_url", ""))
         idx = self.combo_mode.findText(cfg.llm_mode)
         if idx >= 0: self.combo_mode.setCurrentIndex(idx)
 
     def save_config(self):
-        cfg.target_root = self.entry_root.text()
+        cfg.target_roots = self.entry_root.text().split(";")
+        self.entry_root_display.setText("; ".join(cfg.target_roots))
+        cfg.scan_workers = self.spin_workers.value()
+        cfg.scan_time_budget = self.spin_time_budget.value()
+        cfg.scan_file_budget = self.spin_file_budget.value()
+        cfg.copy_backend = self.combo_copy_backend.currentText()
+        cfg.copy_workers = self.spin_copy_workers.value()
+        cfg.move_jobs = self.spin_move_jobs.value()
+        cfg.verify_level = self.combo_verify.currentText()
+        cfg.move_jobs_per_device = self.spin_jobs_per_device.value()
+        cfg.locked_files = self.combo_locked.currentText()
+        cfg.dedup = self.chk_dedup.isChecked()
         cfg.llm_mode = self.combo_mode.currentText()
         cfg.theme = self.theme_combo.currentText()
         cfg.set("cloud", {**cfg.cloud_config, "api_key": self.entry_key.text()})
@@ -664,3 +1224,7 @@ class MainWindow(QMainWindow):
     def format_size(self, size_gb):
         if cfg.size_unit == "MB": return f"{size_gb*1024:.1f} MB"
         return f"{size_gb:.2f} GB"
+
+    def format_item_size(self, size_gb, lower_bound=False):
+        # Budgeted scans may stop inside a folder; its real size is at least this much
+        return f"≥ {self.format_size(size_gb)}" if lower_bound else self.format_size(size_gb)